@@ -1,11 +1,21 @@
 """API routes for roster generation."""
 
-import asyncio
 import uuid
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
-from solver.model import RosterSolver, validate_input_data
+
+from services.executors import cpu_executor, run_in_executor, solver_executor
+from services.metrics import JOBS_TOTAL, SOLVE_DURATION, registry
+from services.tracing import tracer
+from solver.calendar_index import adjacent_day
+from solver.transitions import transition_matrix
+
+# The solver stack (OR-Tools, NumPy) and the LLM client are imported on first
+# use, so the app starts and answers /health without loading them
+if TYPE_CHECKING:
+    from solver.qualifications import EligibilityMatrix
 
 from .schemas import (
     JobResponse,
@@ -27,6 +37,22 @@ router = APIRouter()
 jobs: dict[str, JobStatusResponse] = {}
 
 
+def _count_jobs(status: JobStatus) -> int:
+    return sum(1 for job in list(jobs.values()) if job.status == status)
+
+
+registry.gauge(
+    "roster_jobs_queued",
+    "Plan generation jobs waiting to start (queue depth)",
+    callback=lambda: _count_jobs(JobStatus.PENDING),
+)
+registry.gauge(
+    "roster_jobs_running",
+    "Plan generation jobs currently running",
+    callback=lambda: _count_jobs(JobStatus.RUNNING),
+)
+
+
 def get_time_limit(mode: OptimizationMode, custom_limit: int) -> int:
     """Get time limit based on optimization mode."""
     if mode == OptimizationMode.QUICK:
@@ -37,48 +63,149 @@ def get_time_limit(mode: OptimizationMode, custom_limit: int) -> int:
         return custom_limit
 
 
-async def run_solver_task(job_id: str, data: dict, time_limit: int):
-    """Background task to run the solver."""
-    try:
-        jobs[job_id].status = JobStatus.RUNNING
-        jobs[job_id].progress = 0.1
+def _validate(data: dict) -> tuple[bool, list[str]]:
+    from solver.model import validate_input_data
 
-        # Validate input data
-        is_valid, errors = validate_input_data(data)
-        if not is_valid:
-            jobs[job_id].status = JobStatus.FAILED
-            jobs[job_id].error = f"Validation errors: {', '.join(errors)}"
-            return
+    return validate_input_data(data)
 
-        jobs[job_id].progress = 0.2
 
-        # Create and run solver
-        solver = RosterSolver(data)
-        jobs[job_id].progress = 0.3
+def _check_capacity(data: dict) -> tuple[list[dict], bool]:
+    from solver.precheck import check_capacity, has_errors
 
-        # Run solver (this is CPU-bound, ideally run in thread pool)
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: solver.solve(time_limit_seconds=time_limit)
-        )
+    shortages = check_capacity(data)
+    return shortages, has_errors(shortages)
 
-        jobs[job_id].progress = 0.9
 
-        # Check result
-        if result["status"] in ["OPTIMAL", "FEASIBLE"]:
-            jobs[job_id].status = JobStatus.COMPLETED
-            jobs[job_id].result = result
-            jobs[job_id].progress = 1.0
-        else:
-            jobs[job_id].status = JobStatus.FAILED
-            jobs[job_id].error = f"Solver returned status: {result['status']}"
+def _solve_rolling_horizon(data: dict, time_limit: int) -> dict:
+    from solver.horizon import DEFAULT_STEP_DAYS, solve_rolling_horizon
 
-        jobs[job_id].completed_at = datetime.now().isoformat()
+    return solve_rolling_horizon(
+        data,
+        time_limit_seconds=time_limit,
+        window_days=data["window_days"],
+        step_days=data.get("window_step_days") or DEFAULT_STEP_DAYS,
+    )
+
+
+def _solve_weekly_decomposition(data: dict, time_limit: int) -> dict:
+    from solver.decomposition import solve_weekly_decomposition
+
+    return solve_weekly_decomposition(data, time_limit_seconds=time_limit)
+
+
+def _build_and_solve(job_id: str, data: dict, time_limit: int) -> dict:
+    from solver.model import RosterSolver
+
+    timings = jobs[job_id].timings
+    solver = RosterSolver(data)
+    timings["build"] = solver.timings["build"]
+    jobs[job_id].progress = 0.3
+
+    result = solver.solve(time_limit_seconds=time_limit)
+    for phase in ("solve", "disaggregate", "analyze", "explain", "alternatives"):
+        if phase in solver.timings:
+            timings[phase] = solver.timings[phase]
+    return result
+
+
+async def run_solver_task(job_id: str, data: dict, time_limit: int, mode: str = "custom"):
+    """Background task to run the solver.
+
+    Validation, the capacity check, model construction and solving run in
+    the executors (services/executors.py), never on the event loop; the
+    solver stack is imported there on first use.
+    """
+    timings = jobs[job_id].timings
+    job_span = None
+    try:
+        with tracer.start_as_current_span(
+            "job.run", attributes={"job.id": job_id, "job.time_limit": time_limit}
+        ) as job_span:
+            jobs[job_id].status = JobStatus.RUNNING
+            jobs[job_id].progress = 0.1
+
+            # Validate input data
+            with tracer.start_as_current_span("job.validate") as span:
+                is_valid, errors = await run_in_executor(cpu_executor(), _validate, data)
+            timings["validate"] = span.duration_ms
+            if not is_valid:
+                jobs[job_id].status = JobStatus.FAILED
+                jobs[job_id].error = f"Validation errors: {', '.join(errors)}"
+                jobs[job_id].completed_at = datetime.now().isoformat()
+                return
+
+            # Fast capacity check before building the model
+            with tracer.start_as_current_span("job.precheck") as span:
+                shortages, has_errors = await run_in_executor(cpu_executor(), _check_capacity, data)
+                span.set_attribute("precheck.shortages", len(shortages))
+            timings["precheck"] = span.duration_ms
+            # In soft coverage mode shortages become understaffing in the plan
+            if has_errors and not data.get("soft_coverage"):
+                errors = [s["message"] for s in shortages if s["severity"] == "error"]
+                jobs[job_id].status = JobStatus.FAILED
+                jobs[job_id].error = f"Capacity shortage: {'; '.join(errors)}"
+                jobs[job_id].result = {"status": "CAPACITY_SHORTAGE", "shortages": shortages}
+                jobs[job_id].completed_at = datetime.now().isoformat()
+                return
+
+            jobs[job_id].progress = 0.2
+
+            if data.get("window_days"):
+                # Rolling horizon: every window is built and solved in turn
+                with tracer.start_as_current_span("job.rolling_horizon") as span:
+                    result = await run_in_executor(
+                        solver_executor(), _solve_rolling_horizon, data, time_limit
+                    )
+                timings["solve"] = span.duration_ms
+            elif data.get("decompose_weeks"):
+                # Weekly quotas from a coarse model, then the weeks in parallel
+                with tracer.start_as_current_span("job.weekly_decomposition") as span:
+                    result = await run_in_executor(
+                        solver_executor(), _solve_weekly_decomposition, data, time_limit
+                    )
+                timings["solve"] = span.duration_ms
+            else:
+                # Build and run the solver
+                result = await run_in_executor(
+                    solver_executor(), _build_and_solve, job_id, data, time_limit
+                )
+
+            jobs[job_id].progress = 0.9
+            job_span.set_attribute("solver.status", result["status"])
+            SOLVE_DURATION.observe(
+                result["statistics"]["wall_time"], mode=mode, status=result["status"]
+            )
+
+            result["shortages"] = shortages
+
+            # Check result
+            if result["status"] in ["OPTIMAL", "FEASIBLE"]:
+                jobs[job_id].status = JobStatus.COMPLETED
+                jobs[job_id].result = result
+                jobs[job_id].progress = 1.0
+            else:
+                jobs[job_id].status = JobStatus.FAILED
+                jobs[job_id].error = f"Solver returned status: {result['status']}"
+                conflicts = result.get("infeasibility_explanation")
+                if conflicts:
+                    jobs[job_id].error += ". Conflicting constraints: " + "; ".join(
+                        c["description"] for c in conflicts
+                    )
+                jobs[job_id].result = result
+
+            jobs[job_id].completed_at = datetime.now().isoformat()
 
     except Exception as e:
         jobs[job_id].status = JobStatus.FAILED
         jobs[job_id].error = str(e)
         jobs[job_id].completed_at = datetime.now().isoformat()
 
+    finally:
+        # Also for jobs that failed validation, the capacity check or with an error
+        if job_span is not None:
+            timings["total"] = job_span.duration_ms
+        JOBS_TOTAL.inc(status=jobs[job_id].status.value)
+
 
 @router.post("/generate-plan", response_model=JobResponse)
 async def generate_plan(request: SolverRequest, background_tasks: BackgroundTasks):
@@ -96,20 +223,40 @@ async def generate_plan(request: SolverRequest, background_tasks: BackgroundTask
     )
 
     # Prepare data for solver
-    solver_data = {
-        "employees": [emp.model_dump() for emp in request.employees],
-        "shifts": [shift.model_dump() for shift in request.shifts],
-        "days": [str(d) for d in request.days],
-        "rules": [rule.model_dump() for rule in request.rules],
-        "availability": request.availability,
-        "fixed_assignments": [fa.model_dump() for fa in request.fixed_assignments],
-    }
+    with tracer.start_as_current_span("job.prepare", attributes={"job.id": job_id}) as span:
+        solver_data = {
+            "employees": [emp.model_dump() for emp in request.employees],
+            "shifts": [shift.model_dump() for shift in request.shifts],
+            "days": [str(d) for d in request.days],
+            "month": request.month,
+            "holiday_region": request.holiday_region,
+            "rules": [rule.model_dump() for rule in request.rules],
+            "availability": request.availability,
+            "fixed_assignments": [fa.model_dump() for fa in request.fixed_assignments],
+            "soft_coverage": request.soft_coverage,
+            "objective_strategy": request.objective_strategy.value,
+            "stage_time_split": request.stage_time_split,
+            "num_alternatives": request.num_alternatives,
+            "min_hamming_distance": request.min_hamming_distance,
+            "symmetry_breaking": (
+                request.symmetry_breaking.value if request.symmetry_breaking else None
+            ),
+            "model_mode": request.model_mode.value,
+            "window_days": request.window_days,
+            "window_step_days": request.window_step_days,
+            "decompose_weeks": request.decompose_weeks,
+            "boundary_state": request.boundary_state,
+            "week_start_offset": request.week_start_offset,
+        }
+    jobs[job_id].timings["prepare"] = span.duration_ms
 
     # Get time limit
     time_limit = get_time_limit(request.optimization_mode, request.time_limit or 30)
 
     # Start background task
-    background_tasks.add_task(run_solver_task, job_id, solver_data, time_limit)
+    background_tasks.add_task(
+        run_solver_task, job_id, solver_data, time_limit, request.optimization_mode.value
+    )
 
     return JobResponse(
         job_id=job_id, message=f"Plan generation started with {time_limit}s time limit"
@@ -150,17 +297,7 @@ async def find_replacement(request: ReplacementRequest):
     - Fairness (previous shift counts)
     - Preferences
     """
-    candidates = []
-
-    for emp in request.available_employees:
-        score, factors = calculate_replacement_score(
-            emp.model_dump(), request.shift.model_dump(), request.day, request.current_schedule
-        )
-
-        candidates.append(ReplacementCandidate(employee=emp, score=score, factors=factors))
-
-    # Sort by score descending
-    candidates.sort(key=lambda x: x.score, reverse=True)
+    candidates = await run_in_executor(cpu_executor(), _rank_candidates, request)
 
     # Return top 3
     return ReplacementResponse(
@@ -173,8 +310,41 @@ async def find_replacement(request: ReplacementRequest):
     )
 
 
+def _rank_candidates(request: ReplacementRequest) -> list[ReplacementCandidate]:
+    """Score the available employees, best first."""
+    from solver.qualifications import eligibility_matrix
+
+    candidates = []
+    shifts = [shift.model_dump() for shift in request.shifts]
+    if request.shift.name not in {shift["name"] for shift in shifts}:
+        shifts.append(request.shift.model_dump())
+    employees = [emp.model_dump() for emp in request.available_employees]
+    eligibility = eligibility_matrix(employees, [request.shift.model_dump()])
+
+    for emp, employee in zip(request.available_employees, employees, strict=True):
+        score, factors = calculate_replacement_score(
+            employee,
+            request.shift.model_dump(),
+            request.day,
+            request.current_schedule,
+            shifts,
+            eligibility,
+        )
+
+        candidates.append(ReplacementCandidate(employee=emp, score=score, factors=factors))
+
+    # Sort by score descending; candidates without 11h rest come last
+    candidates.sort(key=lambda x: (not x.factors["rest_violation"], x.score), reverse=True)
+    return candidates
+
+
 def calculate_replacement_score(
-    employee: dict, shift: dict, day: str, current_schedule: dict
+    employee: dict,
+    shift: dict,
+    day: str,
+    current_schedule: dict,
+    shifts: list[dict] | None = None,
+    eligibility: "EligibilityMatrix | None" = None,
 ) -> tuple[float, dict]:
     """
     Calculate score for an employee as a replacement.
@@ -186,7 +356,7 @@ def calculate_replacement_score(
     total_score = 0.0
 
     # 1. Qualification match (40% weight)
-    qual_score = check_qualification_match(employee, shift)
+    qual_score = check_qualification_match(employee, shift, eligibility)
     factors["qualification_match"] = qual_score
     total_score += qual_score * 0.4
 
@@ -201,39 +371,23 @@ def calculate_replacement_score(
     total_score += availability_score * 0.2
 
     # 4. Recent rest (10% weight) - check if had enough rest
-    rest_score = calculate_rest_score(employee, day, current_schedule)
+    rest_score = calculate_rest_score(employee, day, current_schedule, shift, shifts or [shift])
     factors["rest_compliance"] = rest_score
+    factors["rest_violation"] = rest_score == 0.0
     total_score += rest_score * 0.1
 
     return round(total_score, 1), factors
 
 
-def check_qualification_match(employee: dict, shift: dict) -> float:
-    """Check if employee has required qualifications."""
-    required = set()
-    for req in shift.get("requirements", []):
-        # Extract qualification keywords
-        for qual in [
-            "Facharzt",
-            "Oberarzt",
-            "Chefarzt",
-            "ABS-zertifiziert",
-            "Notfallzertifizierung",
-            "Intensivmedizin",
-        ]:
-            if qual.lower() in req.lower():
-                required.add(qual)
-
-    if not required:
-        return 100.0
-
-    emp_quals = set(employee.get("qualifications", []))
-    matched = required.intersection(emp_quals)
-
-    if len(required) == 0:
-        return 100.0
+def check_qualification_match(
+    employee: dict, shift: dict, eligibility: "EligibilityMatrix | None" = None
+) -> float:
+    """Share of the shift's required qualifications the employee holds (0-100)."""
+    if eligibility is None:
+        from solver.qualifications import eligibility_matrix
 
-    return (len(matched) / len(required)) * 100
+        eligibility = eligibility_matrix([employee], [shift])
+    return eligibility.match_ratio(employee["initials"], shift["name"]) * 100
 
 
 def calculate_workload_score(employee: dict, current_schedule: dict) -> float:
@@ -255,26 +409,27 @@ def calculate_workload_score(employee: dict, current_schedule: dict) -> float:
         return 40.0
 
 
-def calculate_rest_score(employee: dict, day: str, current_schedule: dict) -> float:
-    """Check if employee had sufficient rest before this shift."""
-    emp_initials = employee.get("initials")
-    emp_schedule = current_schedule.get(emp_initials, {})
+def calculate_rest_score(
+    employee: dict, day: str, current_schedule: dict, shift: dict, shifts: list[dict]
+) -> float:
+    """Check if employee has 11h rest before and after this shift."""
+    emp_schedule = current_schedule.get(employee.get("initials"), {})
+    transitions = transition_matrix(shifts)
 
-    # Check previous day
-    try:
-        day_num = int(day)
-        prev_day = str(day_num - 1)
+    def shift_on(delta):
+        neighbour = adjacent_day(day, delta)
+        return (emp_schedule.get(neighbour) or {}).get("shift") if neighbour else None
 
-        if prev_day in emp_schedule:
-            prev_shift = emp_schedule[prev_day].get("shift")
-            if prev_shift:
-                # Had a shift yesterday - might not have enough rest
-                # In production, check actual shift times
-                return 70.0
+    previous_shift, next_shift = shift_on(-1), shift_on(1)
+    if transitions.is_forbidden(previous_shift, shift["name"]) or transitions.is_forbidden(
+        shift["name"], next_shift
+    ):
+        return 0.0
 
-        return 100.0
-    except ValueError:
-        return 100.0
+    # Shift yesterday without a known time: might not have enough rest
+    if previous_shift and previous_shift not in transitions.forbidden_after:
+        return 70.0
+    return 100.0
 
 
 @router.post("/parse-rules", response_model=RuleParsingResponse)
@@ -288,7 +443,7 @@ async def parse_rules(request: RuleParsingRequest):
     try:
         from services.rule_parser import (
             RuleParserContext,
-            parse_rules_with_llm,
+            parse_rules_with_llm_async,
             validate_rule_references,
         )
 
@@ -299,11 +454,20 @@ async def parse_rules(request: RuleParsingRequest):
             availability_codes=request.availability_codes,
         )
 
-        # Parse rules with LLM
-        parsed_rules = parse_rules_with_llm(request.rule_texts, context)
+        # Parse rules (fast path, cache, then LLM)
+        statistics = {}
+        with tracer.start_as_current_span(
+            "rules.parse", attributes={"rules.count": len(request.rule_texts)}
+        ):
+            parsed_rules = await parse_rules_with_llm_async(
+                request.rule_texts, context, statistics=statistics
+            )
 
-        # Additional validation
-        validated_rules = [validate_rule_references(rule, context) for rule in parsed_rules]
+        # Additional validation (resolves every reference; off the event loop)
+        validated_rules = await run_in_executor(
+            cpu_executor(),
+            lambda: [validate_rule_references(rule, context) for rule in parsed_rules],
+        )
 
         # Convert to response format
         response_rules = []
@@ -327,6 +491,7 @@ async def parse_rules(request: RuleParsingRequest):
                     ambiguities=rule.ambiguities,
                     suggestions=rule.suggestions,
                     llm_feedback=rule.llm_feedback,
+                    parameters={"compiled": rule.compiled} if rule.compiled else {},
                 )
             )
             total_warnings += len(rule.warnings)
@@ -343,6 +508,7 @@ async def parse_rules(request: RuleParsingRequest):
             total_warnings=total_warnings,
             total_ambiguities=total_ambiguities,
             has_critical_issues=has_critical,
+            statistics=statistics,
         )
 
     except ValueError as e:
@@ -12,6 +12,22 @@ class OptimizationMode(str, Enum):
     CUSTOM = "custom"
 
 
+class ObjectiveStrategy(str, Enum):
+    WEIGHTED = "weighted"
+    LEXICOGRAPHIC = "lexicographic"
+
+
+class SymmetryBreaking(str, Enum):
+    COUNT = "count"
+    LEXICOGRAPHIC = "lexicographic"
+
+
+class ModelMode(str, Enum):
+    AUTO = "auto"
+    AGGREGATE = "aggregate"
+    PER_PERSON = "per_person"
+
+
 class Employee(BaseModel):
     name: str
     initials: str
@@ -54,12 +70,39 @@ class SolverRequest(BaseModel):
     employees: list[Employee]
     shifts: list[Shift]
     days: list[int | str]
+    # Month of the day numbers ("YYYY-MM"); days may also be ISO dates
+    month: str | None = Field(default=None, pattern=r"^\d{4}-\d{2}$")
+    # Federal state for regional public holidays (e.g. "BY")
+    holiday_region: str | None = None
     rules: list[Rule] = []
     availability: dict[str, dict[str, str]] = {}
     fixed_assignments: list[FixedAssignment] = []
     optimization_mode: OptimizationMode = OptimizationMode.QUICK
     time_limit: int | None = Field(default=30, ge=5, le=600)
     stations: list[str] = []
+    # Penalise understaffing instead of returning INFEASIBLE
+    soft_coverage: bool = False
+    # Optimise priority, fairness and preference stages one after the other
+    objective_strategy: ObjectiveStrategy = ObjectiveStrategy.WEIGHTED
+    # Share of time_limit per stage, e.g. {"priority": 0.5, "fairness": 0.3, "preferences": 0.2}
+    stage_time_split: dict[str, float] | None = None
+    # Diverse near-optimal plans returned from one model build
+    num_alternatives: int = Field(default=1, ge=1, le=5)
+    min_hamming_distance: int = Field(default=4, ge=1)
+    # Order interchangeable employees (see solver/symmetry.py; default off)
+    symmetry_breaking: SymmetryBreaking | None = None
+    # Aggregated count model for large staff pools (see solver/aggregate.py)
+    model_mode: ModelMode = ModelMode.AUTO
+    # Rolling horizon: solve window_days at a time, committing window_step_days per window
+    window_days: int | None = Field(default=None, ge=7)
+    window_step_days: int = Field(default=7, ge=1)
+    # Coarse weekly quotas, then the weeks in parallel processes (long horizons)
+    decompose_weeks: bool = False
+    # Context from the previous planning period:
+    # initials -> {"last_shift", "consecutive_days", "week_hours"}
+    boundary_state: dict[str, dict[str, Any]] = {}
+    # Days of the first week that lie before the first planning day
+    week_start_offset: int = Field(default=0, ge=0, le=6)
 
 
 class JobStatus(str, Enum):
@@ -86,6 +129,7 @@ class JobStatusResponse(BaseModel):
     error: str | None = None
     created_at: str | None = None
     completed_at: str | None = None
+    timings: dict[str, float] = {}  # Per-phase durations in milliseconds
 
 
 class ReplacementCandidate(BaseModel):
@@ -104,6 +148,8 @@ class ReplacementRequest(BaseModel):
     current_employee: str | None = None
     available_employees: list[Employee]
     current_schedule: dict[str, dict[str, Any]] = {}
+    # All shift definitions, to check rest time against neighbouring shifts
+    shifts: list[Shift] = []
 
 
 class ReplacementResponse(BaseModel):
@@ -155,6 +201,8 @@ class ParsedRuleResponse(BaseModel):
     ambiguities: list[str] = []
     suggestions: list[str] = []
     llm_feedback: str | None = None  # LLM's feedback about issues
+    # Store as parameters of the rule; contains the compiled solver IR
+    parameters: dict[str, Any] = {}
 
 
 class RuleParsingResponse(BaseModel):
@@ -164,3 +212,5 @@ class RuleParsingResponse(BaseModel):
     total_warnings: int
     total_ambiguities: int
     has_critical_issues: bool
+    # Rules answered by the fast path, the cache and the LLM, with latencies (ms)
+    statistics: dict[str, Any] = {}
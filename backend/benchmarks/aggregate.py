@@ -0,0 +1,78 @@
+"""Compare the aggregated and the per-person model on large staff pools.
+
+Usage:
+    python -m benchmarks.aggregate [--staff 300 400] [--days 14]
+        [--time-limit 120] [--workers 8]
+
+Every instance is solved with model_mode "aggregate" and "per_person". The
+report lists status, build/solve time, model size and the spread of shifts
+per employee of both runs.
+"""
+
+import argparse
+import sys
+import time
+
+from solver.model import RosterSolver
+
+from .instances import assistant_pool_instance
+
+
+def run(data: dict, model_mode: str, time_limit: float, num_workers: int) -> dict:
+    """Build and solve one instance and return the figures for the report."""
+    started = time.perf_counter()
+    solver = RosterSolver({**data, "model_mode": model_mode})
+    result = solver.solve(time_limit_seconds=time_limit, num_workers=num_workers)
+    elapsed = time.perf_counter() - started
+
+    if solver.aggregate_model is not None:
+        proto = solver.aggregate_model.model.Proto()
+    else:
+        proto = solver.model.Proto()
+
+    fairness = (result["analysis"] or {}).get("fairness_metrics", {})
+    return {
+        "model": result["statistics"].get("model", model_mode),
+        "status": result["status"],
+        "variables": len(proto.variables),
+        "build_ms": solver.timings["build"],
+        "solve_ms": solver.timings.get("solve", 0.0),
+        "total_s": elapsed,
+        "shift_variance": fairness.get("total_shift_variance"),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Aggregated vs. per-person model benchmark")
+    parser.add_argument("--staff", type=int, nargs="+", default=[300])
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--time-limit", type=float, default=120)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    header = (
+        f"{'staff':>6} {'model':>10} {'status':>9} {'variables':>10} {'build':>10} "
+        f"{'solve':>10} {'total':>9} {'variance':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for staff in args.staff:
+        num_specialists = max(staff // 15, 1)
+        data = assistant_pool_instance(
+            num_assistants=staff - num_specialists,
+            num_specialists=num_specialists,
+            num_days=args.days,
+        )
+        for model_mode in ("aggregate", "per_person"):
+            row = run(data, model_mode, args.time_limit, args.workers)
+            variance = "-" if row["shift_variance"] is None else f"{row['shift_variance']:.2f}"
+            print(
+                f"{staff:>6} {row['model']:>10} {row['status']:>9} {row['variables']:>10} "
+                f"{row['build_ms']:>8.0f}ms {row['solve_ms']:>8.0f}ms {row['total_s']:>8.1f}s "
+                f"{variance:>9}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
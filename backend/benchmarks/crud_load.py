@@ -0,0 +1,197 @@
+"""Load benchmark of the CRUD routers: sync Session vs. AsyncSession.
+
+Usage:
+    python -m benchmarks.crud_load [--db-url URL] [--employees 200]
+        [--requests 2000] [--concurrency 50]
+
+Seeds employees into the database (a temporary SQLite file unless --db-url
+points to PostgreSQL), then serves it with uvicorn twice: once with the
+former sync handlers (a threadpool-bound Session per request, sync_app) and
+once with main:app (AsyncSession via asyncpg or aiosqlite). Each server gets
+the same concurrent mix of GET /employees/ and GET /employees/{id}; the
+benchmark reports requests per second and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Annotated
+from uuid import UUID
+
+import httpx
+
+from benchmarks.startup import BACKEND_DIR, _free_port
+
+
+def sync_app():
+    """The employee read endpoints as served before the async routers (uvicorn --factory)."""
+    from fastapi import Depends, FastAPI, HTTPException
+    from sqlalchemy.orm import Session, sessionmaker
+
+    from database import get_engine
+    from models.employee import Employee
+    from schemas.employee import EmployeeResponse
+
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+    def get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    DbSession = Annotated[Session, Depends(get_db)]
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    @app.get("/employees/", response_model=list[EmployeeResponse])
+    def get_employees(db: DbSession):
+        return db.query(Employee).filter(Employee.is_active.is_(True)).all()
+
+    @app.get("/employees/{employee_id}", response_model=EmployeeResponse)
+    def get_employee(employee_id: UUID, db: DbSession):
+        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        if not employee:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        return employee
+
+    return app
+
+
+def seed(url: str, employees: int) -> list[str]:
+    """Create the tables, replace all employees by new ones and return their ids."""
+    from sqlalchemy import delete
+    from sqlalchemy.orm import Session
+
+    from database import Base, get_engine
+    from models.employee import Employee
+
+    engine = get_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.execute(delete(Employee))
+        rows = [
+            Employee(
+                name=f"Mitarbeiter {i}",
+                initials=f"M{i:03d}",
+                contract_type="Vollzeit",
+                qualifications=["OP", "Ambulanz"],
+            )
+            for i in range(employees)
+        ]
+        db.add_all(rows)
+        db.commit()
+        ids = [str(row.id) for row in rows]
+    engine.dispose()
+    return ids
+
+
+def _serve(app: str, url: str, factory: bool = False) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    command = [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"]
+    if factory:
+        command.append("--factory")
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, "DATABASE_URL": url})
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                return server, base_url
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError(f"{app} did not start within 30s")
+
+
+async def _load(base_url: str, ids: list[str], requests: int, concurrency: int) -> dict:
+    # Every tenth request lists all employees, the others fetch one
+    paths = [
+        "/employees/" if i % 10 == 0 else f"/employees/{ids[i % len(ids)]}" for i in range(requests)
+    ]
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker(worker_paths: list[str]):
+            nonlocal errors
+            for path in worker_paths:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    errors += response.status_code != 200
+                except httpx.TransportError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(paths[i::concurrency]) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests_per_second": requests / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "errors": errors,
+    }
+
+
+def run(url: str, employees: int, requests: int, concurrency: int) -> dict[str, dict]:
+    """Seed the database and load both servers; results keyed by "sync" and "async"."""
+    ids = seed(url, employees)
+    results = {}
+    for name, app, factory in (
+        ("sync", "benchmarks.crud_load:sync_app", True),
+        ("async", "main:app", False),
+    ):
+        server, base_url = _serve(app, url, factory)
+        try:
+            # Warm up connections and caches before measuring
+            asyncio.run(_load(base_url, ids, concurrency * 2, concurrency))
+            results[name] = asyncio.run(_load(base_url, ids, requests, concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="CRUD load benchmark (sync vs. async sessions)")
+    parser.add_argument("--db-url", default=None, help="Database URL (default: temporary SQLite)")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.db_url or f"sqlite:///{Path(tmp) / 'crud_load.db'}"
+        results = run(url, args.employees, args.requests, args.concurrency)
+
+    print(f"{'':<6} {'req/s':>8} {'p50':>9} {'p99':>9} {'errors':>7}")
+    for name, result in results.items():
+        print(
+            f"{name:<6} {result['requests_per_second']:>8.1f} {result['p50_ms']:>7.1f}ms "
+            f"{result['p99_ms']:>7.1f}ms {result['errors']:>7}"
+        )
+    speedup = results["async"]["requests_per_second"] / results["sync"]["requests_per_second"]
+    print(f"\nasync/sync throughput: {speedup:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Compare the weekly decomposition with the monolithic model on long horizons.
+
+Usage:
+    python -m benchmarks.decomposition [--weeks 8 12] [--assistants 20]
+        [--time-limit 120] [--workers 8] [--processes 4]
+
+Every instance is solved once with the weekly decomposition and once as a
+single per-person model. The report lists status, total time, the number of
+relaxed and repaired weeks and the spread of shifts per employee.
+"""
+
+import argparse
+import sys
+import time
+
+from solver.decomposition import solve_weekly_decomposition
+from solver.model import RosterSolver
+
+from .instances import assistant_pool_instance
+
+
+def run(data: dict, method: str, args: argparse.Namespace) -> dict:
+    """Solve one instance and return the figures for the report."""
+    started = time.perf_counter()
+    if method == "decomposed":
+        result = solve_weekly_decomposition(
+            data, args.time_limit, num_workers=args.workers, processes=args.processes
+        )
+    else:
+        solver = RosterSolver({**data, "model_mode": "per_person"})
+        result = solver.solve(time_limit_seconds=args.time_limit, num_workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    weeks = result["statistics"].get("weeks", [])
+    fairness = (result["analysis"] or {}).get("fairness_metrics", {})
+    return {
+        "status": result["status"],
+        "total_s": elapsed,
+        "relaxed": sum(1 for week in weeks if week["quotas_relaxed"]),
+        "repaired": sum(1 for week in weeks if week["repaired"]),
+        "shift_variance": fairness.get("total_shift_variance"),
+        "weekend_variance": fairness.get("weekend_variance"),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Weekly decomposition benchmark")
+    parser.add_argument("--weeks", type=int, nargs="+", default=[8, 12])
+    parser.add_argument("--assistants", type=int, default=20)
+    parser.add_argument("--time-limit", type=float, default=120)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    header = (
+        f"{'weeks':>5} {'method':>10} {'status':>9} {'total':>9} {'relaxed':>7} "
+        f"{'repaired':>8} {'variance':>9} {'weekends':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for weeks in args.weeks:
+        data = assistant_pool_instance(num_assistants=args.assistants, num_days=weeks * 7)
+        for method in ("decomposed", "monolithic"):
+            row = run(data, method, args)
+            variance = "-" if row["shift_variance"] is None else f"{row['shift_variance']:.2f}"
+            weekends = "-" if row["weekend_variance"] is None else f"{row['weekend_variance']:.2f}"
+            print(
+                f"{weeks:>5} {method:>10} {row['status']:>9} {row['total_s']:>8.1f}s "
+                f"{row['relaxed']:>7} {row['repaired']:>8} {variance:>9} {weekends:>9}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
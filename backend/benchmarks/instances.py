@@ -0,0 +1,80 @@
+"""Synthetic benchmark instances.
+
+Instances are plain solver input dictionaries, so they can be passed to
+RosterSolver directly or posted to /api/generate-plan.
+"""
+
+
+def assistant_pool_instance(
+    num_assistants: int = 60,
+    num_specialists: int = 6,
+    num_days: int = 14,
+    staff_per_shift: int | None = None,
+) -> dict:
+    """
+    Build a ward with a large pool of identical assistants.
+
+    All assistants share qualifications, contract and availability and no
+    personal rule refers to them, so they form one equivalence class. A few
+    specialists cover the night shifts, which require a Facharzt.
+
+    Args:
+        num_assistants: Number of interchangeable assistants
+        num_specialists: Number of specialists (Facharzt)
+        num_days: Length of the planning period
+        staff_per_shift: Minimum staff for day shifts (default: sized so that
+            roughly 70% of the assistants work each day)
+    """
+    if staff_per_shift is None:
+        staff_per_shift = max(1, int(num_assistants * 0.7) // 2)
+
+    employees = [
+        {
+            "name": f"Assistenzarzt {i:03d}",
+            "initials": f"A{i:03d}",
+            "contract": "Assistenzarzt",
+            "hours": 40,
+            "qualifications": ["Assistenzarzt"],
+        }
+        for i in range(1, num_assistants + 1)
+    ]
+    employees += [
+        {
+            "name": f"Facharzt {i:02d}",
+            "initials": f"F{i:02d}",
+            "contract": "Facharzt",
+            "hours": 40,
+            "qualifications": ["Facharzt"],
+        }
+        for i in range(1, num_specialists + 1)
+    ]
+
+    shifts = [
+        {
+            "name": "Früh",
+            "requirements": [f"Min. {staff_per_shift} Personen"],
+            "station": "Station",
+            "time": "06:00-14:00",
+        },
+        {
+            "name": "Spät",
+            "requirements": [f"Min. {staff_per_shift} Personen"],
+            "station": "Station",
+            "time": "14:00-22:00",
+        },
+        {
+            "name": "Nacht",
+            "requirements": ["Min. 1 Person", "Facharzt"],
+            "station": "Station",
+            "time": "22:00-06:00",
+        },
+    ]
+
+    return {
+        "employees": employees,
+        "shifts": shifts,
+        "days": [str(d) for d in range(1, num_days + 1)],
+        "rules": [],
+        "availability": {},
+        "fixed_assignments": [],
+    }
@@ -0,0 +1,127 @@
+"""Measure application startup: import profile and time to the first healthcheck.
+
+Usage:
+    python -m benchmarks.startup [--runs 3] [--top 15] [--max-seconds 3]
+
+Imports main with `python -X importtime` and lists the slowest modules
+(cumulative time), then starts uvicorn several times and measures the time
+until GET /health answers. With --max-seconds the benchmark fails (exit code
+1) if the median time to the first healthcheck exceeds the limit.
+"""
+
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Modules the app must not import before their first use
+HEAVY_MODULES = ("ortools", "anthropic", "numpy", "pandas")
+
+
+def profile_imports(module: str = "main", top: int = 15) -> list[tuple[float, float, str]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        (cumulative ms, self ms, module) of the slowest imports, slowest first
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def loaded_heavy_modules(module: str = "main") -> list[str]:
+    """HEAVY_MODULES loaded after importing module in a fresh interpreter."""
+    code = (
+        f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return completed.stdout.split()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_healthcheck(timeout: float = 30.0) -> float:
+    """Seconds from starting uvicorn (main:app) until /health answers with 200."""
+    port = _free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"/health did not answer within {timeout:g}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Startup benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-seconds", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    print(f"{'cumulative':>10} {'self':>8}  module")
+    print("-" * 40)
+    for cumulative, own, name in profile_imports(top=args.top):
+        print(f"{cumulative:>8.1f}ms {own:>6.1f}ms  {name}")
+    heavy = loaded_heavy_modules()
+    print(f"\nHeavy modules loaded by 'import main': {', '.join(heavy) or 'none'}")
+
+    times = [time_to_first_healthcheck() for _ in range(args.runs)]
+    median = statistics.median(times)
+    print(
+        f"Time to first healthcheck: median {median:.2f}s "
+        f"(runs: {', '.join(f'{t:.2f}s' for t in times)})"
+    )
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAILED: median exceeds {args.max_seconds:g}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""Measure the effect of symmetry breaking on large assistant pools.
+
+Usage:
+    python -m benchmarks.symmetry [--assistants 50 80] [--days 14]
+        [--time-limit 60] [--workers 8]
+
+Every instance is solved without symmetry breaking and with the count and
+lexicographic orderings. The report lists status, objective, wall time and
+search effort of each run.
+"""
+
+import argparse
+import sys
+
+from solver.model import RosterSolver
+
+from .instances import assistant_pool_instance
+
+
+def run(data: dict, symmetry_breaking: bool | str, time_limit: float, num_workers: int) -> dict:
+    """Solve one instance and return the figures for the report."""
+    solver = RosterSolver({**data, "symmetry_breaking": symmetry_breaking})
+    result = solver.solve(time_limit_seconds=time_limit, num_workers=num_workers)
+    statistics = result["statistics"]
+    return {
+        "symmetry_breaking": symmetry_breaking,
+        "classes": len(solver.equivalence_classes),
+        "status": result["status"],
+        "objective": statistics["objective_value"] if result["solution"] else None,
+        "wall_time": statistics["wall_time"],
+        "conflicts": statistics["num_conflicts"],
+        "branches": statistics["num_branches"],
+        "build_ms": solver.timings["build"],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Symmetry breaking benchmark")
+    parser.add_argument("--assistants", type=int, nargs="+", default=[50, 80])
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--time-limit", type=float, default=60)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    header = (
+        f"{'assistants':>10} {'symmetry':>13} {'classes':>7} {'status':>9} {'objective':>10} "
+        f"{'wall':>8} {'conflicts':>10} {'branches':>10} {'build':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for num_assistants in args.assistants:
+        data = assistant_pool_instance(num_assistants=num_assistants, num_days=args.days)
+        for symmetry_breaking in (False, "count", "lexicographic"):
+            row = run(data, symmetry_breaking, args.time_limit, args.workers)
+            objective = "-" if row["objective"] is None else f"{row['objective']:.0f}"
+            print(
+                f"{num_assistants:>10} {symmetry_breaking or 'off':>13} "
+                f"{row['classes']:>7} {row['status']:>9} {objective:>10} "
+                f"{row['wall_time']:>7.2f}s {row['conflicts']:>10} {row['branches']:>10} "
+                f"{row['build_ms']:>7.0f}ms"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
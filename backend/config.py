@@ -12,6 +12,38 @@ class Settings(BaseSettings):
     ]
     # LLM Integration
     ANTHROPIC_API_KEY: str | None = None
+    # Alternative API endpoint (e.g. a proxy); None uses the public API
+    ANTHROPIC_BASE_URL: str | None = None
+    # Rule parsing: requests in flight, seconds per request, retries per rule
+    LLM_MAX_CONCURRENCY: int = 5
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_RETRIES: int = 3
+    # Send several rules per request, up to this many estimated tokens
+    LLM_BATCH_PARSING: bool = False
+    LLM_BATCH_TOKEN_BUDGET: int = 8000
+    # LLM communication log (services/llm_logging.py): rotated by size;
+    # payloads (prompts, responses, names) "full", "redacted" or "none",
+    # "full" keeps LLM_LOG_SAMPLE_RATE of them
+    LLM_LOG_FILE: str = "logs/llm_communication.log"
+    LLM_LOG_LEVEL: str = "INFO"
+    LLM_LOG_PAYLOADS: str = "redacted"
+    LLM_LOG_SAMPLE_RATE: float = 1.0
+    LLM_LOG_MAX_BYTES: int = 5 * 1024 * 1024
+    LLM_LOG_BACKUP_COUNT: int = 3
+    # SQLite file caching parsed rules; None disables the cache
+    RULE_PARSE_CACHE_PATH: str | None = "cache/rule_parse_cache.sqlite3"
+    # Threads building/solving models and for shorter CPU-bound handler work
+    SOLVER_EXECUTOR_WORKERS: int = 2
+    CPU_EXECUTOR_WORKERS: int = 4
+    # Log event loop stalls longer than this (with the blocking stack); 0 disables
+    EVENT_LOOP_STALL_MS: float = 100
+    # Tracing: None (spans only feed job timings), "console" or "file"
+    TRACING_EXPORTER: str | None = None
+    TRACING_FILE: str = "logs/traces.jsonl"
+    # Solver capture: write replay archives (scrubbed request + model) to this directory
+    SOLVER_CAPTURE_DIR: str | None = None
+    # Only capture solves slower than this (solves without a solution are always kept)
+    SOLVER_CAPTURE_MIN_SECONDS: float = 0.0
 
     class Config:
         env_file = ".env"
@@ -10,7 +10,7 @@ from pathlib import Path
 # Add backend directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from database import Base, engine
+from database import Base, get_engine
 
 
 def create_all_tables():
@@ -19,7 +19,7 @@ def create_all_tables():
 
     # This will create all tables defined in the Base metadata
     # It's safe to run multiple times - existing tables won't be recreated
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
     print("Database tables created successfully!")
     print("\nTables created:")
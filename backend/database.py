@@ -1,22 +1,100 @@
-from config import settings
+"""Database engines and the session dependency of the CRUD routers.
+
+The routers use an async engine and AsyncSession (get_async_db). The async
+driver follows from settings.DATABASE_URL: postgresql:// uses asyncpg,
+sqlite:// uses aiosqlite (tests). A sync engine remains for scripts such as
+create_tables.py. Engines are created on first use, so importing the
+routers neither needs a database driver nor connects.
+"""
+
+import time
+from functools import cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-)
+from config import settings
+from services.metrics import DB_CHECKOUT_WAIT, registry
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Sync engines of all engines created so far (pool gauge)
+_engines: list[Engine] = []
+
+# Async drivers per backend
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+SYNC_DRIVERS = {"postgresql": "psycopg2", "sqlite": "pysqlite"}
+
+
+def _with_driver(url: str, drivers: dict[str, str]) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in drivers:
+        return url
+    return parsed.set(drivername=f"{backend}+{drivers[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def async_database_url(url: str) -> str:
+    """URL with the async driver of its backend (postgresql+asyncpg, sqlite+aiosqlite)."""
+    return _with_driver(url, ASYNC_DRIVERS)
+
+
+def sync_database_url(url: str) -> str:
+    """URL with the sync driver of its backend (postgresql+psycopg2, sqlite+pysqlite)."""
+    return _with_driver(url, SYNC_DRIVERS)
+
+
+def _engine_options(url: str) -> dict:
+    # SQLite has no server-side connection limit to size a pool for
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {"pool_size": 10, "max_overflow": 20, "pool_pre_ping": True}
+
+
+@cache
+def get_engine(url: str | None = None) -> Engine:
+    """Sync engine (scripts; defaults to settings.DATABASE_URL)."""
+    url = sync_database_url(url or settings.DATABASE_URL)
+    engine = create_engine(url, **_engine_options(url))
+    _engines.append(engine)
+    return engine
+
+
+@cache
+def get_async_engine(url: str | None = None) -> AsyncEngine:
+    """Async engine of the routers (defaults to settings.DATABASE_URL)."""
+    url = async_database_url(url or settings.DATABASE_URL)
+    engine = create_async_engine(url, **_engine_options(url))
+    _engines.append(engine.sync_engine)
+    return engine
+
+
+@cache
+def async_session_factory(url: str | None = None) -> async_sessionmaker[AsyncSession]:
+    # Objects stay readable after commit; responses are built from them
+    return async_sessionmaker(get_async_engine(url), autoflush=False, expire_on_commit=False)
+
+
+registry.gauge(
+    "roster_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    callback=lambda: sum(engine.pool.checkedout() for engine in _engines),  # type: ignore[attr-defined]
+)
+
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_async_db():
+    async with async_session_factory()() as db:
+        # Check out the connection up front so pool waits are measured
+        start = time.perf_counter()
+        await db.connection()
+        DB_CHECKOUT_WAIT.observe(time.perf_counter() - start)
         yield db
-    finally:
-        db.close()
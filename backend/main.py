@@ -1,7 +1,16 @@
 """Main FastAPI application for Hospital Roster Planning."""
 
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from services.executors import shutdown_executors
+from services.loop_watchdog import LoopLagWatchdog
+from services.metrics import REQUEST_LATENCY, registry
+from services.tracing import SpanKind, tracer
 
 # Try to import both configurations
 try:
@@ -27,10 +36,31 @@ try:
 except ImportError:
     HAS_SOLVER_ROUTER = False
 
+watchdog: LoopLagWatchdog | None = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Watch the event loop for stalls while the app runs; stop the executors afterwards."""
+    global watchdog
+    stall_ms = settings.EVENT_LOOP_STALL_MS if HAS_SETTINGS else 100
+    if stall_ms:
+        watchdog = LoopLagWatchdog(threshold=stall_ms / 1000)
+        watchdog.start()
+    try:
+        yield
+    finally:
+        if watchdog is not None:
+            await watchdog.stop()
+            watchdog = None
+        shutdown_executors(wait=False)
+
+
 app = FastAPI(
     title="Hospital Roster API",
     description="Backend API for hospital shift scheduling and automatic roster generation",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration - combined for development
@@ -52,6 +82,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+def _route_template(request: Request) -> str:
+    """Template of the matched route (e.g. /plans/{plan_id}), "unmatched" without one.
+
+    Unmatched paths (404 scans) share one label, so the label set stays bounded.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # FastAPI resolves included routers on request; their route paths lack the
+    # include prefix (/api), which the effective route context carries
+    context = request.scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(context, "path", None) or route.path
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Wrap every request (validation, handler, serialization) in a server span
+    and record its latency per route."""
+    start = time.perf_counter()
+    with tracer.start_as_current_span(
+        f"{request.method} {request.url.path}",
+        attributes={"http.method": request.method, "http.target": request.url.path},
+        kind=SpanKind.SERVER,
+    ) as span:
+        response = await call_next(request)
+        route = _route_template(request)
+        span.name = f"{request.method} {route}"
+        span.set_attribute("http.route", route)
+        span.set_attribute("http.status_code", response.status_code)
+    REQUEST_LATENCY.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=route,
+        status=str(response.status_code),
+    )
+    return response
+
+
 # Include CRUD routers for persistence
 if HAS_CRUD_ROUTERS:
     app.include_router(employees.router)
@@ -77,15 +146,26 @@ def health_check():
             "solver": HAS_SOLVER_ROUTER,
             "settings": HAS_SETTINGS,
         },
+        "event_loop": {
+            "max_lag_ms": round(watchdog.max_lag * 1000, 1) if watchdog else None,
+            "stalls": len(watchdog.stalls) if watchdog else None,
+        },
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of solver and API metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def root():
     """Root endpoint with API information."""
     endpoints = {
         "docs": "/docs",
         "health": "/health",
+        "metrics": "/metrics",
     }
 
     if HAS_CRUD_ROUTERS:
@@ -1,11 +1,13 @@
 import uuid
 from datetime import datetime
 
-from database import Base
-from sqlalchemy import ARRAY, Boolean, Column, Date, DateTime, ForeignKey, String, Text
+from sqlalchemy import Boolean, Column, Date, DateTime, ForeignKey, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from database import Base
+from models.types import string_array
+
 
 class ShiftAssignment(Base):
     __tablename__ = "shift_assignments"
@@ -20,7 +22,7 @@ class ShiftAssignment(Base):
     station = Column(String(100), nullable=False)
     is_locked = Column(Boolean, default=False)
     has_violation = Column(Boolean, default=False)
-    violations: Column[list[str]] = Column(ARRAY(String), default=[])
+    violations: Column[list[str]] = Column(string_array(), default=[])
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
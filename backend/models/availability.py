@@ -1,10 +1,11 @@
 import uuid
 from datetime import datetime
 
-from database import Base
 from sqlalchemy import JSON, Column, DateTime, String
 from sqlalchemy.dialects.postgresql import UUID
 
+from database import Base
+
 
 class MonthlyAvailability(Base):
     __tablename__ = "monthly_availabilities"
@@ -1,11 +1,13 @@
 import uuid
 from datetime import datetime
 
-from database import Base
-from sqlalchemy import ARRAY, Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from database import Base
+from models.types import string_array
+
 
 class Employee(Base):
     __tablename__ = "employees"
@@ -15,7 +17,7 @@ class Employee(Base):
     initials = Column(String(10), nullable=False, unique=True)
     contract_type = Column(String(50), nullable=False)
     weekly_hours = Column(Integer, nullable=False, default=40)
-    qualifications: Column[list[str]] = Column(ARRAY(String), default=[])
+    qualifications: Column[list[str]] = Column(string_array(), default=[])
     email = Column(String(255))
     phone = Column(String(50))
     employee_number = Column(String(50))
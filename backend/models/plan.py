@@ -1,11 +1,12 @@
 import uuid
 from datetime import datetime
 
-from database import Base
 from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from database import Base
+
 
 class Plan(Base):
     __tablename__ = "plans"
@@ -1,9 +1,11 @@
 import uuid
 from datetime import datetime
 
-from database import Base
 from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import UUID
+
+from database import Base
+from models.types import json_document
 
 
 class SchedulingRule(Base):
@@ -17,6 +19,6 @@ class SchedulingRule(Base):
     source = Column(String(50), default="form")
     weight = Column(Integer, default=5)
     is_active = Column(Boolean, default=True)
-    parameters = Column(JSONB, default={})
+    parameters = Column(json_document(), default={})
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     created_by = Column(String(255))
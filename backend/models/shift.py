@@ -1,11 +1,13 @@
 import uuid
 from datetime import datetime
 
-from database import Base
-from sqlalchemy import ARRAY, Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
+from database import Base
+from models.types import string_array
+
 
 class Shift(Base):
     __tablename__ = "shifts"
@@ -19,8 +21,8 @@ class Shift(Base):
     time_start = Column(String(10))
     time_end = Column(String(10))
     duration_minutes = Column(Integer)
-    requirements: Column[list[str]] = Column(ARRAY(String), default=[])
-    rules: Column[list[str]] = Column(ARRAY(String), default=[])
+    requirements: Column[list[str]] = Column(string_array(), default=[])
+    rules: Column[list[str]] = Column(string_array(), default=[])
     color = Column(String(50))
     is_active = Column(Boolean, default=True)
     sort_order = Column(Integer, default=0)
@@ -0,0 +1,14 @@
+"""Column types portable between PostgreSQL and SQLite (aiosqlite in tests)."""
+
+from sqlalchemy import ARRAY, JSON, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+def string_array():
+    """text[] on PostgreSQL, a JSON list on SQLite."""
+    return ARRAY(String).with_variant(JSON(), "sqlite")
+
+
+def json_document():
+    """JSONB on PostgreSQL, JSON on SQLite."""
+    return JSONB().with_variant(JSON(), "sqlite")
@@ -1,47 +1,49 @@
 from datetime import date
 from uuid import UUID
 
-from database import get_db
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
 from models.assignment import ShiftAssignment
 from schemas.assignment import AssignmentCreate, AssignmentResponse, AssignmentUpdate
-from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/assignments", tags=["assignments"])
 
 
 @router.get("/", response_model=list[AssignmentResponse])
-def get_assignments(
+async def get_assignments(
     start_date: date = Query(...),
     end_date: date = Query(...),
     employee_id: UUID | None = Query(None),
     shift_id: UUID | None = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(ShiftAssignment).filter(
+    query = select(ShiftAssignment).where(
         ShiftAssignment.assignment_date >= start_date,
         ShiftAssignment.assignment_date <= end_date,
     )
 
     if employee_id:
-        query = query.filter(ShiftAssignment.employee_id == employee_id)
+        query = query.where(ShiftAssignment.employee_id == employee_id)
 
     if shift_id:
-        query = query.filter(ShiftAssignment.shift_id == shift_id)
+        query = query.where(ShiftAssignment.shift_id == shift_id)
 
-    return query.order_by(ShiftAssignment.assignment_date).all()
+    return (await db.scalars(query.order_by(ShiftAssignment.assignment_date))).all()
 
 
 @router.post("/", response_model=AssignmentResponse)
-def create_assignment(assignment: AssignmentCreate, db: Session = Depends(get_db)):
+async def create_assignment(assignment: AssignmentCreate, db: AsyncSession = Depends(get_async_db)):
     # Check for double booking
-    existing = (
-        db.query(ShiftAssignment)
-        .filter(
+    existing = await db.scalar(
+        select(ShiftAssignment)
+        .where(
             ShiftAssignment.employee_id == assignment.employee_id,
             ShiftAssignment.assignment_date == assignment.assignment_date,
         )
-        .first()
+        .limit(1)
     )
 
     if existing:
@@ -52,31 +54,33 @@ def create_assignment(assignment: AssignmentCreate, db: Session = Depends(get_db
 
     db_assignment = ShiftAssignment(**assignment.model_dump())
     db.add(db_assignment)
-    db.commit()
-    db.refresh(db_assignment)
+    await db.commit()
+    await db.refresh(db_assignment)
     return db_assignment
 
 
 @router.post("/bulk", response_model=list[AssignmentResponse])
-def create_assignments_bulk(assignments: list[AssignmentCreate], db: Session = Depends(get_db)):
+async def create_assignments_bulk(
+    assignments: list[AssignmentCreate], db: AsyncSession = Depends(get_async_db)
+):
     created = []
     for assignment_data in assignments:
         db_assignment = ShiftAssignment(**assignment_data.model_dump())
         db.add(db_assignment)
         created.append(db_assignment)
 
-    db.commit()
+    await db.commit()
     for assignment in created:
-        db.refresh(assignment)
+        await db.refresh(assignment)
 
     return created
 
 
 @router.put("/{assignment_id}", response_model=AssignmentResponse)
-def update_assignment(
-    assignment_id: UUID, assignment: AssignmentUpdate, db: Session = Depends(get_db)
+async def update_assignment(
+    assignment_id: UUID, assignment: AssignmentUpdate, db: AsyncSession = Depends(get_async_db)
 ):
-    db_assignment = db.query(ShiftAssignment).filter(ShiftAssignment.id == assignment_id).first()
+    db_assignment = await db.get(ShiftAssignment, assignment_id)
 
     if not db_assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
@@ -88,14 +92,14 @@ def update_assignment(
     for key, value in update_data.items():
         setattr(db_assignment, key, value)
 
-    db.commit()
-    db.refresh(db_assignment)
+    await db.commit()
+    await db.refresh(db_assignment)
     return db_assignment
 
 
 @router.delete("/{assignment_id}")
-def delete_assignment(assignment_id: UUID, db: Session = Depends(get_db)):
-    db_assignment = db.query(ShiftAssignment).filter(ShiftAssignment.id == assignment_id).first()
+async def delete_assignment(assignment_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    db_assignment = await db.get(ShiftAssignment, assignment_id)
 
     if not db_assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
@@ -103,6 +107,6 @@ def delete_assignment(assignment_id: UUID, db: Session = Depends(get_db)):
     if db_assignment.is_locked:
         raise HTTPException(status_code=400, detail="Assignment is locked")
 
-    db.delete(db_assignment)
-    db.commit()
+    await db.delete(db_assignment)
+    await db.commit()
     return {"message": "Assignment deleted"}
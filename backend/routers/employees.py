@@ -1,39 +1,41 @@
 from uuid import UUID
 
-from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
 from models.employee import Employee
 from schemas.employee import EmployeeCreate, EmployeeResponse, EmployeeUpdate
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/employees", tags=["employees"])
 
 
 @router.get("/", response_model=list[EmployeeResponse])
-def get_employees(db: Session = Depends(get_db)):
-    return db.query(Employee).filter(Employee.is_active.is_(True)).all()
+async def get_employees(db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(Employee).where(Employee.is_active.is_(True)))).all()
 
 
 @router.get("/{employee_id}", response_model=EmployeeResponse)
-def get_employee(employee_id: UUID, db: Session = Depends(get_db)):
-    employee = db.query(Employee).filter(Employee.id == employee_id).first()
+async def get_employee(employee_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    employee = await db.get(Employee, employee_id)
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     return employee
 
 
 @router.post("/", response_model=EmployeeResponse)
-def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
+async def create_employee(employee: EmployeeCreate, db: AsyncSession = Depends(get_async_db)):
     db_employee = Employee(**employee.model_dump())
     db.add(db_employee)
     try:
-        db.commit()
-        db.refresh(db_employee)
+        await db.commit()
+        await db.refresh(db_employee)
         return db_employee
     except IntegrityError as e:
-        db.rollback()
-        if "employees_initials_key" in str(e):
+        await db.rollback()
+        if "employees_initials_key" in str(e) or "employees.initials" in str(e):
             raise HTTPException(
                 status_code=409,
                 detail=f"Employee with initials '{employee.initials}' already exists",
@@ -42,8 +44,10 @@ def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
 
 
 @router.put("/{employee_id}", response_model=EmployeeResponse)
-def update_employee(employee_id: UUID, employee: EmployeeUpdate, db: Session = Depends(get_db)):
-    db_employee = db.query(Employee).filter(Employee.id == employee_id).first()
+async def update_employee(
+    employee_id: UUID, employee: EmployeeUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    db_employee = await db.get(Employee, employee_id)
     if not db_employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
@@ -51,17 +55,17 @@ def update_employee(employee_id: UUID, employee: EmployeeUpdate, db: Session = D
     for key, value in update_data.items():
         setattr(db_employee, key, value)
 
-    db.commit()
-    db.refresh(db_employee)
+    await db.commit()
+    await db.refresh(db_employee)
     return db_employee
 
 
 @router.delete("/{employee_id}")
-def delete_employee(employee_id: UUID, db: Session = Depends(get_db)):
-    db_employee = db.query(Employee).filter(Employee.id == employee_id).first()
+async def delete_employee(employee_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    db_employee = await db.get(Employee, employee_id)
     if not db_employee:
         raise HTTPException(status_code=404, detail="Employee not found")
 
     db_employee.is_active = False  # type: ignore[assignment]
-    db.commit()
+    await db.commit()
     return {"message": "Employee deactivated"}
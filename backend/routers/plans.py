@@ -1,49 +1,52 @@
 from uuid import UUID
 
-from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
 from models.plan import Plan
 from schemas.plan import PlanCreate, PlanResponse, PlanUpdate
-from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/plans", tags=["plans"])
 
 
 @router.get("/", response_model=list[PlanResponse])
-def get_plans(db: Session = Depends(get_db)):
+async def get_plans(db: AsyncSession = Depends(get_async_db)):
     """Get all plans, ordered by most recently updated"""
-    return db.query(Plan).order_by(Plan.updated_at.desc()).all()
+    return (await db.scalars(select(Plan).order_by(Plan.updated_at.desc()))).all()
 
 
 @router.get("/month/{month}", response_model=list[PlanResponse])
-def get_plans_by_month(month: str, db: Session = Depends(get_db)):
+async def get_plans_by_month(month: str, db: AsyncSession = Depends(get_async_db)):
     """Get all plans for a specific month (format: YYYY-MM)"""
-    return db.query(Plan).filter(Plan.month == month).order_by(Plan.updated_at.desc()).all()
+    query = select(Plan).where(Plan.month == month).order_by(Plan.updated_at.desc())
+    return (await db.scalars(query)).all()
 
 
 @router.get("/{plan_id}", response_model=PlanResponse)
-def get_plan(plan_id: UUID, db: Session = Depends(get_db)):
+async def get_plan(plan_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Get a specific plan by ID"""
-    plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    plan = await db.get(Plan, plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     return plan
 
 
 @router.post("/", response_model=PlanResponse)
-def create_plan(plan: PlanCreate, db: Session = Depends(get_db)):
+async def create_plan(plan: PlanCreate, db: AsyncSession = Depends(get_async_db)):
     """Create a new plan"""
     db_plan = Plan(**plan.model_dump())
     db.add(db_plan)
-    db.commit()
-    db.refresh(db_plan)
+    await db.commit()
+    await db.refresh(db_plan)
     return db_plan
 
 
 @router.put("/{plan_id}", response_model=PlanResponse)
-def update_plan(plan_id: UUID, plan: PlanUpdate, db: Session = Depends(get_db)):
+async def update_plan(plan_id: UUID, plan: PlanUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update an existing plan (e.g., when user manually edits assignments)"""
-    db_plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    db_plan = await db.get(Plan, plan_id)
     if not db_plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
@@ -51,51 +54,55 @@ def update_plan(plan_id: UUID, plan: PlanUpdate, db: Session = Depends(get_db)):
     for key, value in update_data.items():
         setattr(db_plan, key, value)
 
-    db.commit()
-    db.refresh(db_plan)
+    await db.commit()
+    await db.refresh(db_plan)
     return db_plan
 
 
 @router.patch("/{plan_id}/schedule", response_model=PlanResponse)
-def update_plan_schedule(plan_id: UUID, schedule_data: dict, db: Session = Depends(get_db)):
+async def update_plan_schedule(
+    plan_id: UUID, schedule_data: dict, db: AsyncSession = Depends(get_async_db)
+):
     """Update only the schedule data of a plan (for manual edits)"""
-    db_plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    db_plan = await db.get(Plan, plan_id)
     if not db_plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
     db_plan.schedule_data = schedule_data  # type: ignore[assignment]
     db_plan.is_auto_generated = False  # type: ignore[assignment]
-    db.commit()
-    db.refresh(db_plan)
+    await db.commit()
+    await db.refresh(db_plan)
     return db_plan
 
 
 @router.delete("/{plan_id}")
-def delete_plan(plan_id: UUID, db: Session = Depends(get_db)):
+async def delete_plan(plan_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Delete a plan"""
-    db_plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    db_plan = await db.get(Plan, plan_id)
     if not db_plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    db.delete(db_plan)
-    db.commit()
+    await db.delete(db_plan)
+    await db.commit()
     return {"message": "Plan deleted"}
 
 
 @router.post("/{plan_id}/activate", response_model=PlanResponse)
-def activate_plan(plan_id: UUID, db: Session = Depends(get_db)):
+async def activate_plan(plan_id: UUID, db: AsyncSession = Depends(get_async_db)):
     """Mark a plan as active (and deactivate other plans for the same month)"""
-    db_plan = db.query(Plan).filter(Plan.id == plan_id).first()
+    db_plan = await db.get(Plan, plan_id)
     if not db_plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
     # Deactivate other plans for the same month
-    db.query(Plan).filter(Plan.month == db_plan.month, Plan.status == "active").update(
-        {"status": "draft"}
+    await db.execute(
+        update(Plan)
+        .where(Plan.month == db_plan.month, Plan.status == "active")
+        .values(status="draft")
     )
 
     # Activate this plan
     db_plan.status = "active"  # type: ignore[assignment]
-    db.commit()
-    db.refresh(db_plan)
+    await db.commit()
+    await db.refresh(db_plan)
     return db_plan
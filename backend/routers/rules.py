@@ -1,62 +1,80 @@
 from uuid import UUID
 
-from database import get_db
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
 from models.rule import SchedulingRule
 from schemas.rule import RuleCreate, RuleResponse, RuleUpdate
-from sqlalchemy.orm import Session
+from solver.rule_ir import compile_rule_parameters
 
 router = APIRouter(prefix="/rules", tags=["rules"])
 
 
 @router.get("/", response_model=list[RuleResponse])
-def get_rules(db: Session = Depends(get_db)):
-    return db.query(SchedulingRule).filter(SchedulingRule.is_active.is_(True)).all()
+async def get_rules(db: AsyncSession = Depends(get_async_db)):
+    query = select(SchedulingRule).where(SchedulingRule.is_active.is_(True))
+    return (await db.scalars(query)).all()
 
 
 @router.get("/all", response_model=list[RuleResponse])
-def get_all_rules(db: Session = Depends(get_db)):
-    return db.query(SchedulingRule).all()
+async def get_all_rules(db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(SchedulingRule))).all()
 
 
 @router.get("/{rule_id}", response_model=RuleResponse)
-def get_rule(rule_id: UUID, db: Session = Depends(get_db)):
-    rule = db.query(SchedulingRule).filter(SchedulingRule.id == rule_id).first()
+async def get_rule(rule_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    rule = await db.get(SchedulingRule, rule_id)
     if not rule:
         raise HTTPException(status_code=404, detail="Rule not found")
     return rule
 
 
 @router.post("/", response_model=RuleResponse)
-def create_rule(rule: RuleCreate, db: Session = Depends(get_db)):
+async def create_rule(rule: RuleCreate, db: AsyncSession = Depends(get_async_db)):
     db_rule = SchedulingRule(**rule.model_dump())
+    _compile(db_rule)
     db.add(db_rule)
-    db.commit()
-    db.refresh(db_rule)
+    await db.commit()
+    await db.refresh(db_rule)
     return db_rule
 
 
 @router.put("/{rule_id}", response_model=RuleResponse)
-def update_rule(rule_id: UUID, rule: RuleUpdate, db: Session = Depends(get_db)):
-    db_rule = db.query(SchedulingRule).filter(SchedulingRule.id == rule_id).first()
+async def update_rule(rule_id: UUID, rule: RuleUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_rule = await db.get(SchedulingRule, rule_id)
     if not db_rule:
         raise HTTPException(status_code=404, detail="Rule not found")
 
     update_data = rule.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_rule, key, value)
+    _compile(db_rule)
 
-    db.commit()
-    db.refresh(db_rule)
+    await db.commit()
+    await db.refresh(db_rule)
     return db_rule
 
 
 @router.delete("/{rule_id}")
-def delete_rule(rule_id: UUID, db: Session = Depends(get_db)):
-    db_rule = db.query(SchedulingRule).filter(SchedulingRule.id == rule_id).first()
+async def delete_rule(rule_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    db_rule = await db.get(SchedulingRule, rule_id)
     if not db_rule:
         raise HTTPException(status_code=404, detail="Rule not found")
 
-    db.delete(db_rule)
-    db.commit()
+    await db.delete(db_rule)
+    await db.commit()
     return {"message": "Rule deleted"}
+
+
+def _compile(db_rule: SchedulingRule):
+    """Store the rule's compiled IR in its parameters (see solver/rule_ir.py)."""
+    # Assign a new dict so the JSONB change is detected
+    db_rule.parameters = compile_rule_parameters(
+        db_rule.parameters,
+        db_rule.rule_type,
+        db_rule.rule_text,
+        db_rule.category,
+        db_rule.applies_to,
+    )
@@ -0,0 +1,74 @@
+"""Executors for CPU-bound and blocking work of async routes.
+
+Nothing that takes more than a few milliseconds may run on the event loop:
+while it runs, no other request (not even /health) is served. Routes hand
+such work to one of two thread pools:
+
+    - solver_executor(): model construction and CP-SAT solves, at most
+      settings.SOLVER_EXECUTOR_WORKERS jobs at a time
+    - cpu_executor(): shorter work such as validation, the capacity check,
+      rule validation and replacement scoring
+
+CP-SAT releases the GIL while solving; Python model construction holds it,
+but the interpreter switches threads every few milliseconds, so the event
+loop keeps answering requests. services/loop_watchdog.py reports stalls.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+DEFAULT_SOLVER_WORKERS = 2
+DEFAULT_CPU_WORKERS = 4
+
+_lock = threading.Lock()
+_executors: dict[str, ThreadPoolExecutor] = {}
+
+
+def _workers(setting: str, default: int) -> int:
+    try:
+        from config import settings
+    except ImportError:
+        return default
+    return getattr(settings, setting, default)
+
+
+def _executor(name: str, setting: str, default: int) -> ThreadPoolExecutor:
+    with _lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=_workers(setting, default), thread_name_prefix=name
+            )
+        return _executors[name]
+
+
+def solver_executor() -> ThreadPoolExecutor:
+    """Thread pool building and solving models."""
+    return _executor("solver", "SOLVER_EXECUTOR_WORKERS", DEFAULT_SOLVER_WORKERS)
+
+
+def cpu_executor() -> ThreadPoolExecutor:
+    """Thread pool for shorter CPU-bound work of request handlers."""
+    return _executor("cpu", "CPU_EXECUTOR_WORKERS", DEFAULT_CPU_WORKERS)
+
+
+async def run_in_executor(
+    executor: ThreadPoolExecutor, func: Callable[..., Any], *args, **kwargs
+) -> Any:
+    """Run func in executor; the copied context keeps spans inside the current trace."""
+    ctx = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(ctx.run, func, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut the executors down (they are created again on next use)."""
+    with _lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,231 @@
+"""Deterministic local parser for formulaic rules.
+
+Rules like "AM arbeitet nicht am Sonntag", "Maximal 5 aufeinanderfolgende
+Arbeitstage" or "Müller bevorzugt Frühdienst" are recognised by regular
+expressions and turned into StructuredParsedRules in microseconds, without
+an LLM call. Employee and shift references are resolved with the solver's
+resolver (solver/resolver.py); a rule is only taken when every reference
+resolves to exactly one employee or shift without fuzzy matching, so the
+result reaches FAST_PATH_CONFIDENCE. Everything else falls through to the LLM.
+
+Recognised patterns (case-insensitive, trailing period ignored):
+
+    <employee> arbeitet nicht <days>             hard, unavailable
+    <employee> kann|arbeitet <days> nicht [arbeiten]
+    Maximal|Max.|Höchstens <n> aufeinanderfolgende Arbeitstage [für <employee>]
+                                                 hard, consecutive_limit
+    <employee> bevorzugt <shifts>                soft, preferred
+    <employee> möchte|will <shifts> vermeiden    soft, avoid
+    <employee> vermeidet <shifts>
+
+<days> lists weekdays ("Montag", "montags", "Samstag und Sonntag"),
+"Wochenende" or "Feiertag(en)"; <shifts> lists shift names ("Frühdienst",
+"Spät- oder Nachtdienst" is not split and falls through).
+"""
+
+import re
+import time
+from typing import NamedTuple
+
+from services.rule_parser import (
+    ConstraintDetails,
+    ConstraintType,
+    RecurrencePattern,
+    RuleHardness,
+    RuleParserContext,
+    RuleScope,
+    StructuredParsedRule,
+    TimeFrame,
+    Weekday,
+)
+from solver.resolver import MATCH_FUZZY, resolver_for
+
+FAST_PATH_CONFIDENCE = 0.95
+
+_NO_WORK_PATTERNS = (
+    re.compile(r"^(?P<employee>.+?)\s+arbeitet\s+nicht\s+(?P<days>.+)$", re.IGNORECASE),
+    re.compile(
+        r"^(?P<employee>.+?)\s+(?:kann|arbeitet)\s+(?P<days>.+?)\s+nicht(?:\s+arbeiten)?$",
+        re.IGNORECASE,
+    ),
+)
+_CONSECUTIVE_PATTERN = re.compile(
+    r"^(?:maximal|max\.?|höchstens)\s+(?P<count>\d+)\s+aufeinanderfolgende\s+arbeitstage"
+    r"(?:\s+für\s+(?P<employee>.+))?$",
+    re.IGNORECASE,
+)
+_PREFERRED_PATTERN = re.compile(r"^(?P<employee>.+?)\s+bevorzugt\s+(?P<shifts>.+)$", re.IGNORECASE)
+_AVOID_PATTERNS = (
+    re.compile(
+        r"^(?P<employee>.+?)\s+(?:möchte|will)\s+(?P<shifts>.+?)\s+vermeiden$", re.IGNORECASE
+    ),
+    re.compile(r"^(?P<employee>.+?)\s+vermeidet\s+(?P<shifts>.+)$", re.IGNORECASE),
+)
+
+# Weekday words (stems; "montags", "Montagen" match too)
+_WEEKDAYS = {
+    "montag": [Weekday.MONDAY],
+    "dienstag": [Weekday.TUESDAY],
+    "mittwoch": [Weekday.WEDNESDAY],
+    "donnerstag": [Weekday.THURSDAY],
+    "freitag": [Weekday.FRIDAY],
+    "samstag": [Weekday.SATURDAY],
+    "sonnabend": [Weekday.SATURDAY],
+    "sonntag": [Weekday.SUNDAY],
+    "wochenende": [Weekday.SATURDAY, Weekday.SUNDAY],
+    # Holidays have no weekday; the rule compiler reads them from the text
+    "feiertag": [],
+}
+_FILLER_WORDS = {"am", "an", "den", "dem", "der", "die", "das", "jeden", "jedem", "immer", "und"}
+_LIST_SEPARATOR = re.compile(r"\s*,\s*|\s+und\s+|\s+sowie\s+", re.IGNORECASE)
+
+
+class FastPathStats(NamedTuple):
+    """Fast path results of one batch of rules."""
+
+    rules: int
+    hits: int
+    latency_ms: float
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.rules if self.rules else 0.0
+
+
+def _parse_days(text: str) -> list[Weekday] | None:
+    """Weekdays of a day list, or None if a word is not a day."""
+    weekdays: list[Weekday] = []
+    words = [word for word in re.split(r"[\s,]+", text.lower()) if word]
+    days = [word for word in words if word not in _FILLER_WORDS]
+    if not days:
+        return None
+    for word in days:
+        stem = next((stem for stem in _WEEKDAYS if word.startswith(stem)), None)
+        if stem is None or len(word) > len(stem) + 2:
+            return None
+        weekdays.extend(day for day in _WEEKDAYS[stem] if day not in weekdays)
+    return weekdays
+
+
+def _resolve_employee(resolver, reference: str) -> dict | None:
+    """The single employee a reference denotes without fuzzy matching, else None."""
+    match = resolver.employee(reference)
+    if not match.found or match.ambiguous or match.method == MATCH_FUZZY:
+        return None
+    return match.items[0]
+
+
+def _resolve_shifts(resolver, text: str) -> list[str] | None:
+    """Shift names of a shift list, or None if a reference does not resolve cleanly."""
+    names = []
+    for reference in _LIST_SEPARATOR.split(text):
+        words = [word for word in reference.split() if word.lower() not in _FILLER_WORDS]
+        if not words:
+            return None
+        match = resolver.shift(" ".join(words))
+        if not match.found or match.ambiguous or match.method == MATCH_FUZZY:
+            return None
+        names.append(match.items[0]["name"])
+    return names
+
+
+def _structured(
+    rule_text: str,
+    hardness: RuleHardness,
+    category: str,
+    constraint: ConstraintDetails,
+    employee: dict | None = None,
+    weekdays: list[Weekday] | None = None,
+) -> StructuredParsedRule:
+    return StructuredParsedRule(
+        original_text=rule_text,
+        rule_hardness=hardness,
+        category=category,
+        scope=RuleScope.SPECIFIC_EMPLOYEE if employee else RuleScope.ALL,
+        employee_names=[employee["name"]] if employee else None,
+        employee_initials=[employee["initials"]] if employee else None,
+        time_frame=TimeFrame(
+            is_recurring=bool(weekdays),
+            recurrence_pattern=RecurrencePattern.WEEKLY if weekdays else RecurrencePattern.ONCE,
+            specific_weekdays=weekdays or None,
+            is_permanent=True,
+        ),
+        constraint=constraint,
+        confidence=FAST_PATH_CONFIDENCE,
+    )
+
+
+def fast_parse(rule_text: str, context: RuleParserContext) -> StructuredParsedRule | None:
+    """Parse a formulaic rule locally (None if it needs the LLM)."""
+    text = rule_text.strip().rstrip(".!").strip()
+    resolver = resolver_for(context.employees, context.shifts)
+
+    if match := _CONSECUTIVE_PATTERN.match(text):
+        employee = None
+        if match["employee"]:
+            employee = _resolve_employee(resolver, match["employee"])
+            if employee is None:
+                return None
+        count = int(match["count"])
+        return _structured(
+            rule_text,
+            RuleHardness.HARD,
+            "Arbeitszeitgesetz",
+            ConstraintDetails(
+                constraint_type=ConstraintType.CONSECUTIVE_LIMIT,
+                days_value=count,
+                description=f"Maximal {count} aufeinanderfolgende Arbeitstage",
+            ),
+            employee,
+        )
+
+    for pattern in _NO_WORK_PATTERNS:
+        if (match := pattern.match(text)) and (weekdays := _parse_days(match["days"])) is not None:
+            employee = _resolve_employee(resolver, match["employee"])
+            if employee is None:
+                return None
+            return _structured(
+                rule_text,
+                RuleHardness.HARD,
+                "Mitarbeiter-Einschränkung",
+                ConstraintDetails(
+                    constraint_type=ConstraintType.UNAVAILABLE,
+                    description=f"{employee['name']} arbeitet nicht {match['days']}",
+                ),
+                employee,
+                weekdays,
+            )
+
+    for pattern, constraint_type, verb in (
+        (_PREFERRED_PATTERN, ConstraintType.PREFERRED, "bevorzugt"),
+        *((pattern, ConstraintType.AVOID, "vermeidet") for pattern in _AVOID_PATTERNS),
+    ):
+        if match := pattern.match(text):
+            employee = _resolve_employee(resolver, match["employee"])
+            shift_names = _resolve_shifts(resolver, match["shifts"])
+            if employee is None or shift_names is None:
+                return None
+            return _structured(
+                rule_text,
+                RuleHardness.SOFT,
+                "Mitarbeiter-Einschränkung",
+                ConstraintDetails(
+                    constraint_type=constraint_type,
+                    shift_names=shift_names,
+                    description=f"{employee['name']} {verb} {', '.join(shift_names)}",
+                ),
+                employee,
+            )
+
+    return None
+
+
+def fast_parse_batch(
+    rule_texts: list[str], context: RuleParserContext
+) -> tuple[list[StructuredParsedRule | None], FastPathStats]:
+    """Fast-parse a batch of rules; None marks rules that need the LLM."""
+    started = time.perf_counter()
+    results = [fast_parse(rule_text, context) for rule_text in rule_texts]
+    latency_ms = (time.perf_counter() - started) * 1000
+    hits = sum(1 for result in results if result is not None)
+    return results, FastPathStats(len(rule_texts), hits, latency_ms)
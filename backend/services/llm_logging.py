@@ -0,0 +1,131 @@
+"""Logging of the LLM communication off the request path.
+
+The "llm_communication" logger is configured on first use, not on import:
+records go through a QueueHandler to a QueueListener thread, which writes
+them to a size-rotated file (settings.LLM_LOG_FILE), so parsing never waits
+for file I/O.
+
+Records carrying payloads (prompts, responses, rule texts and employee
+names; logged with extra=PAYLOAD) are handled by settings.LLM_LOG_PAYLOADS:
+
+    - "full": logged as is, a share of settings.LLM_LOG_SAMPLE_RATE of them
+    - "redacted": logged with every argument replaced by its length
+    - "none": dropped
+"""
+
+import atexit
+import logging
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOGGER_NAME = "llm_communication"
+
+PAYLOADS_FULL = "full"
+PAYLOADS_REDACTED = "redacted"
+PAYLOADS_NONE = "none"
+
+# Defaults without config
+DEFAULT_LOG_FILE = "logs/llm_communication.log"
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+
+# extra= of log calls whose arguments are payloads
+PAYLOAD = {"payload": True}
+
+llm_logger = logging.getLogger(LOGGER_NAME)
+llm_logger.propagate = False
+
+_lock = threading.Lock()
+_listener: QueueListener | None = None
+
+
+class PayloadFilter(logging.Filter):
+    """Drops, samples or redacts payload records (see module docstring)."""
+
+    def __init__(self, payloads: str = PAYLOADS_REDACTED, sample_rate: float = 1.0):
+        super().__init__()
+        if payloads not in (PAYLOADS_FULL, PAYLOADS_REDACTED, PAYLOADS_NONE):
+            raise ValueError(f"Unknown LLM log payload mode: {payloads}")
+        self.payloads = payloads
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "payload", False):
+            return True
+        if self.payloads == PAYLOADS_NONE:
+            return False
+        if self.payloads == PAYLOADS_REDACTED:
+            args = record.args if isinstance(record.args, tuple) else (record.args,)
+            record.args = tuple(f"<{len(str(arg))} Zeichen>" for arg in args)
+            return True
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+
+def _logging_settings() -> dict:
+    try:
+        from config import settings
+    except ImportError:
+        settings = None
+    return {
+        "path": getattr(settings, "LLM_LOG_FILE", DEFAULT_LOG_FILE),
+        "level": getattr(settings, "LLM_LOG_LEVEL", "INFO"),
+        "payloads": getattr(settings, "LLM_LOG_PAYLOADS", PAYLOADS_REDACTED),
+        "sample_rate": getattr(settings, "LLM_LOG_SAMPLE_RATE", 1.0),
+        "max_bytes": getattr(settings, "LLM_LOG_MAX_BYTES", DEFAULT_MAX_BYTES),
+        "backup_count": getattr(settings, "LLM_LOG_BACKUP_COUNT", DEFAULT_BACKUP_COUNT),
+    }
+
+
+def configure_llm_logging(**overrides) -> logging.Logger:
+    """
+    Set up the LLM logger on first call (later calls return it unchanged).
+
+    Args:
+        overrides: path, level, payloads, sample_rate, max_bytes or
+            backup_count instead of the settings
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return llm_logger
+        options = {**_logging_settings(), **overrides}
+
+        path = Path(options["path"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            path,
+            maxBytes=options["max_bytes"],
+            backupCount=options["backup_count"],
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(PayloadFilter(options["payloads"], options["sample_rate"]))
+
+        llm_logger.handlers.clear()
+        llm_logger.addHandler(queue_handler)
+        llm_logger.setLevel(options["level"])
+        _listener = QueueListener(log_queue, file_handler)
+        _listener.start()
+        return llm_logger
+
+
+def shutdown_llm_logging():
+    """Write pending records and close the log file; the next use configures it again."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        llm_logger.handlers.clear()
+        _listener = None
+
+
+atexit.register(shutdown_llm_logging)
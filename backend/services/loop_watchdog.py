@@ -0,0 +1,105 @@
+"""Event loop lag watchdog.
+
+A heartbeat task on the event loop wakes up every interval and records how
+late it woke up (roster_event_loop_lag_seconds). A watchdog thread checks
+the heartbeat; when the loop has not run for longer than the threshold, it
+captures the stack of the event loop thread, i.e. the code blocking it, and
+records the stall (roster_event_loop_stalls_total, a warning in the log and
+LoopLagWatchdog.stalls) once its duration is known.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from services.metrics import LOOP_LAG, LOOP_STALLS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD_SECONDS = 0.1
+DEFAULT_INTERVAL_SECONDS = 0.02
+MAX_RECORDED_STALLS = 50
+
+
+class LoopLagWatchdog:
+    """Heartbeat task plus watchdog thread for one event loop."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD_SECONDS,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        # Recorded stalls: {"started_at", "duration", "stack"}, newest last
+        self.stalls: deque[dict] = deque(maxlen=MAX_RECORDED_STALLS)
+
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._stall: dict | None = None
+
+    def start(self):
+        """Start watching the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        """Stop the heartbeat and the watchdog thread."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+            self._last_beat = now
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval / 2):
+            blocked = time.monotonic() - self._last_beat - self.interval
+            if blocked > self.threshold and self._stall is None:
+                self._stall = {
+                    "started_at": time.time() - blocked,
+                    "duration": blocked,
+                    "stack": self._loop_stack(),
+                }
+            elif self._stall is not None and blocked <= self.threshold:
+                # The loop runs again; the stall lasted until the last heartbeat
+                self._record(self._stall)
+                self._stall = None
+            elif self._stall is not None:
+                self._stall["duration"] = blocked
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        return "".join(traceback.format_stack(frame)) if frame else ""
+
+    def _record(self, stall: dict):
+        self.stalls.append(stall)
+        LOOP_STALLS.inc()
+        logger.warning(
+            "Event loop blocked for %.0f ms in:\n%s", stall["duration"] * 1000, stall["stack"]
+        )
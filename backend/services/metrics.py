@@ -0,0 +1,287 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms support labels and are safe to update from
+the event loop and from solver worker threads alike.
+"""
+
+import math
+import threading
+from collections.abc import Callable, Iterable
+
+# Default histogram buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SOLVE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def collect(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self.collect(),
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed on scrape via a callback."""
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], float] | None = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels: str) -> float:
+        if self.callback is not None:
+            return self.callback()
+        return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> list[str]:
+        if self.callback is not None:
+            return [f"{self.name} {_format_value(self.callback())}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> (bucket counts, sum, count)
+        self._values: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def get_count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted((key, (list(c), s, n)) for key, (c, s, n) in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        callback: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, callback))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ==================== SOLVER METRICS ====================
+
+JOBS_TOTAL = registry.counter(
+    "roster_jobs_total", "Plan generation jobs by final status", ["status"]
+)
+SOLVE_DURATION = registry.histogram(
+    "roster_solve_duration_seconds",
+    "CP-SAT solve wall time by optimization mode and solver status",
+    ["mode", "status"],
+    buckets=SOLVE_BUCKETS,
+)
+MODEL_VARIABLES = registry.histogram(
+    "roster_model_variables",
+    "Number of variables in built CP-SAT models",
+    buckets=(100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000),
+)
+MODEL_CONSTRAINTS = registry.histogram(
+    "roster_model_constraints",
+    "Number of constraints in built CP-SAT models",
+    buckets=(100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000),
+)
+SOLUTIONS_PER_SECOND = registry.histogram(
+    "roster_solutions_per_second",
+    "Improving solutions found per second of solve time",
+    buckets=(0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 50.0, 100.0),
+)
+
+# ==================== CACHE METRICS ====================
+
+CACHE_REQUESTS = registry.counter(
+    "roster_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+
+# ==================== RULE PARSING METRICS ====================
+
+RULES_PARSED = registry.counter(
+    "roster_rules_parsed_total",
+    "Parsed rules by source (fast_path/cache/llm)",
+    ["source"],
+)
+FAST_PATH_DURATION = registry.histogram(
+    "roster_rule_fast_path_seconds",
+    "Time the local fast-path parser spends on a batch of rules",
+    buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 1.0),
+)
+
+# ==================== API / DATABASE METRICS ====================
+
+REQUEST_LATENCY = registry.histogram(
+    "roster_http_request_duration_seconds",
+    "HTTP request latency by method, route and status code",
+    ["method", "route", "status"],
+)
+DB_CHECKOUT_WAIT = registry.histogram(
+    "roster_db_pool_checkout_seconds", "Time spent waiting for a database pool connection"
+)
+LOOP_LAG = registry.histogram(
+    "roster_event_loop_lag_seconds",
+    "Delay of the event loop heartbeat behind its schedule",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+LOOP_STALLS = registry.counter(
+    "roster_event_loop_stalls_total", "Event loop stalls above the watchdog threshold"
+)
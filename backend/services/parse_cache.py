@@ -0,0 +1,187 @@
+"""Persistent SQLite cache for LLM-parsed rules.
+
+Parsed rules are stored by normalised rule text and by fingerprints of the
+parts of the parser context they depend on:
+
+    - employees: names, initials and qualifications
+    - shifts: names, times, descriptions and requirements
+    - codes: availability codes
+
+A rule only records the fingerprints of the parts it depends on (an empty
+fingerprint matches any context), so invalidation is selective: adding an
+employee invalidates the rules that refer to employees, while "Maximal 5
+aufeinanderfolgende Arbeitstage" stays cached. Entries also carry
+CACHE_VERSION and the model name; bumping either drops all entries.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import time
+import unicodedata
+from collections.abc import Iterable
+from contextlib import closing
+from functools import lru_cache
+from pathlib import Path
+
+# Increase when the prompt or the structured schema changes
+CACHE_VERSION = 1
+
+DEPENDS_ON_EMPLOYEES = "employees"
+DEPENDS_ON_SHIFTS = "shifts"
+DEPENDS_ON_CODES = "codes"
+CONTEXT_PARTS = (DEPENDS_ON_EMPLOYEES, DEPENDS_ON_SHIFTS, DEPENDS_ON_CODES)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed_rules (
+    text_key TEXT NOT NULL,
+    model TEXT NOT NULL,
+    employees_fp TEXT NOT NULL,
+    shifts_fp TEXT NOT NULL,
+    codes_fp TEXT NOT NULL,
+    structured TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (text_key, model, employees_fp, shifts_fp, codes_fp)
+)
+"""
+
+
+def normalize_rule_text(text: str) -> str:
+    """Cache key of a rule text: Unicode-normalised, case-folded, single spaces."""
+    return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+
+def _fingerprint(value) -> str:
+    encoded = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+def context_fingerprints(
+    employees: list[dict], shifts: list[dict], availability_codes: dict[str, str]
+) -> dict[str, str]:
+    """Fingerprints of the context parts that go into the parser prompt."""
+    return {
+        DEPENDS_ON_EMPLOYEES: _fingerprint(
+            sorted(
+                (emp.get("name"), emp.get("initials"), sorted(emp.get("qualifications") or []))
+                for emp in employees
+            )
+        ),
+        DEPENDS_ON_SHIFTS: _fingerprint(
+            sorted(
+                (
+                    shift.get("name"),
+                    shift.get("time"),
+                    shift.get("description"),
+                    list(shift.get("requirements") or []),
+                )
+                for shift in shifts
+            )
+        ),
+        DEPENDS_ON_CODES: _fingerprint(sorted(availability_codes.items())),
+    }
+
+
+def mentions_code(rule_text: str, availability_codes: Iterable[str]) -> bool:
+    """Whether the rule text contains one of the availability codes as a word."""
+    return any(re.search(rf"\b{re.escape(code)}\b", rule_text) for code in availability_codes)
+
+
+class RuleParseCache:
+    """Parsed rules (StructuredParsedRule JSON) in a SQLite file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get_many(
+        self, rule_texts: list[str], fingerprints: dict[str, str], model: str
+    ) -> dict[str, str]:
+        """
+        Cached results valid for the given context.
+
+        Returns:
+            Normalised rule text -> StructuredParsedRule JSON, for hits only
+        """
+        keys = sorted({normalize_rule_text(text) for text in rule_texts})
+        if not keys:
+            return {}
+        placeholders = ", ".join("?" for _ in keys)
+        query = f"""
+            SELECT text_key, structured FROM parsed_rules
+            WHERE text_key IN ({placeholders}) AND model = ?
+              AND employees_fp IN ('', ?) AND shifts_fp IN ('', ?) AND codes_fp IN ('', ?)
+            ORDER BY created_at
+        """
+        parameters = [*keys, _model_key(model), *(fingerprints[part] for part in CONTEXT_PARTS)]
+        with closing(self._connect()) as connection:
+            # Newest entry wins
+            return dict(connection.execute(query, parameters).fetchall())
+
+    def put_many(
+        self,
+        entries: list[tuple[str, set[str], str]],
+        fingerprints: dict[str, str],
+        model: str,
+    ):
+        """
+        Store parsed rules.
+
+        Args:
+            entries: (rule text, context parts the result depends on,
+                StructuredParsedRule JSON) per rule
+            fingerprints: Fingerprints of the current context
+            model: Model that parsed the rules
+        """
+        rows = [
+            (
+                normalize_rule_text(text),
+                _model_key(model),
+                *(fingerprints[part] if part in depends_on else "" for part in CONTEXT_PARTS),
+                structured,
+                time.time(),
+            )
+            for text, depends_on, structured in entries
+        ]
+        if not rows:
+            return
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO parsed_rules VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def invalidate(self, rule_text: str | None = None) -> int:
+        """Drop the entries of one rule text (all entries if None); returns the count."""
+        with closing(self._connect()) as connection, connection:
+            if rule_text is None:
+                cursor = connection.execute("DELETE FROM parsed_rules")
+            else:
+                cursor = connection.execute(
+                    "DELETE FROM parsed_rules WHERE text_key = ?", (normalize_rule_text(rule_text),)
+                )
+            return cursor.rowcount
+
+
+def _model_key(model: str) -> str:
+    return f"{model}#{CACHE_VERSION}"
+
+
+@lru_cache(maxsize=4)
+def _cache_at(path: str) -> RuleParseCache:
+    return RuleParseCache(path)
+
+
+def default_parse_cache() -> RuleParseCache | None:
+    """Cache at settings.RULE_PARSE_CACHE_PATH, or None if disabled."""
+    try:
+        from config import settings
+    except ImportError:
+        return None
+    path = getattr(settings, "RULE_PARSE_CACHE_PATH", None)
+    return _cache_at(path) if path else None
@@ -1,38 +1,46 @@
 """LLM-based natural language rule parser using Anthropic Claude."""
 
+import asyncio
 import json
-import logging
 import os
+import random
+import time
 from enum import Enum
-from pathlib import Path
 from typing import Any
 
 import anthropic
 from pydantic import BaseModel, Field
 
-# ==================== LOGGING SETUP ====================
-
-# Create logs directory if it doesn't exist
-LOGS_DIR = Path(__file__).parent.parent / "logs"
-LOGS_DIR.mkdir(exist_ok=True)
-
-# Configure LLM communication logger
-llm_logger = logging.getLogger("llm_communication")
-llm_logger.setLevel(logging.DEBUG)
-
-# Clear existing handlers to avoid duplicates
-llm_logger.handlers.clear()
-
-# File handler - overwrites log file each session
-llm_log_file = LOGS_DIR / "llm_communication.log"
-file_handler = logging.FileHandler(llm_log_file, mode="w", encoding="utf-8")
-file_handler.setLevel(logging.DEBUG)
-file_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(file_formatter)
-llm_logger.addHandler(file_handler)
-
-# Prevent propagation to root logger
-llm_logger.propagate = False
+from services.llm_logging import PAYLOAD, configure_llm_logging, llm_logger
+from services.metrics import CACHE_REQUESTS, FAST_PATH_DURATION, RULES_PARSED
+from services.parse_cache import (
+    DEPENDS_ON_CODES,
+    DEPENDS_ON_EMPLOYEES,
+    DEPENDS_ON_SHIFTS,
+    RuleParseCache,
+    context_fingerprints,
+    default_parse_cache,
+    mentions_code,
+    normalize_rule_text,
+)
+from services.tracing import SpanKind, tracer
+from solver.resolver import MATCH_FUZZY, resolver_for
+from solver.rule_ir import compile_structured_rule
+
+LLM_MODEL = "claude-sonnet-4-20250514"
+
+# Defaults for settings.LLM_MAX_CONCURRENCY, LLM_TIMEOUT_SECONDS and LLM_MAX_RETRIES
+DEFAULT_MAX_CONCURRENCY = 5
+DEFAULT_TIMEOUT_SECONDS = 30.0
+DEFAULT_MAX_RETRIES = 3
+# First retry waits this long (plus jitter), doubling per further retry
+RETRY_BASE_DELAY_SECONDS = 1.0
+# Batched parsing (settings.LLM_BATCH_PARSING): estimated tokens of rule texts
+# plus expected output per request; output tokens reserved per rule
+DEFAULT_BATCH_TOKEN_BUDGET = 8000
+OUTPUT_TOKENS_PER_RULE = 600
+# Rough token estimate for German text
+CHARS_PER_TOKEN = 4
 
 
 # ==================== STRUCTURED SCHEMA FOR LLM OUTPUT ====================
@@ -285,6 +293,7 @@ class ParsedRule(BaseModel):
     ambiguities: list[str] = Field(default_factory=list)
     suggestions: list[str] = Field(default_factory=list)
     llm_feedback: str | None = None  # LLM's feedback about issues
+    compiled: dict[str, Any] | None = None  # Solver IR (see solver/rule_ir.py)
 
 
 class RuleParserContext(BaseModel):
@@ -436,6 +445,7 @@ def convert_structured_to_legacy(structured: StructuredParsedRule) -> ParsedRule
         ambiguities=structured.ambiguities,
         suggestions=structured.suggestions,
         llm_feedback=structured.llm_feedback,
+        compiled=compile_structured_rule(structured),
     )
 
 
@@ -532,174 +542,531 @@ def parse_structured_response(rule_text: str, parsed_data: dict) -> StructuredPa
     )
 
 
-def parse_rules_with_llm(
-    rule_texts: list[str], context: RuleParserContext, api_key: str | None = None
+def _resolve_api_key(api_key: str | None) -> str:
+    """API key from the argument, settings or environment."""
+    if not api_key:
+        # Try to get from settings first, then env var
+        try:
+            from config import settings
+
+            api_key = settings.ANTHROPIC_API_KEY
+        except ImportError:
+            pass
+
+        if not api_key:
+            api_key = os.getenv("ANTHROPIC_API_KEY")
+
+    if not api_key:
+        llm_logger.error("ANTHROPIC_API_KEY not configured")
+        raise ValueError(
+            "ANTHROPIC_API_KEY nicht gesetzt. Bitte in .env Datei oder Umgebungsvariable konfigurieren."
+        )
+    return api_key
+
+
+def _llm_settings() -> dict[str, Any]:
+    """Concurrency, timeout, retry and endpoint settings (defaults without config)."""
+    try:
+        from config import settings
+    except ImportError:
+        settings = None
+    return {
+        "base_url": getattr(settings, "ANTHROPIC_BASE_URL", None),
+        "max_concurrency": getattr(settings, "LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY),
+        "timeout": getattr(settings, "LLM_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS),
+        "max_retries": getattr(settings, "LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES),
+        "batch": getattr(settings, "LLM_BATCH_PARSING", False),
+        "batch_token_budget": getattr(
+            settings, "LLM_BATCH_TOKEN_BUDGET", DEFAULT_BATCH_TOKEN_BUDGET
+        ),
+    }
+
+
+def _failed_rule(rule_text: str, description: str, confidence: float, warnings: list[str]):
+    """Placeholder result for a rule that could not be parsed."""
+    return ParsedRule(
+        original_text=rule_text,
+        rule_type="soft",
+        category="Allgemeine Regel",
+        applies_to="all",
+        constraint_description=description,
+        confidence=confidence,
+        warnings=warnings,
+    )
+
+
+def _extract_json(response_text: str) -> str:
+    """JSON part of a response, which might be wrapped in a markdown code block."""
+    if "```json" in response_text:
+        json_start = response_text.find("```json") + 7
+        json_end = response_text.find("```", json_start)
+        llm_logger.debug("Extracted JSON from ```json block")
+        return response_text[json_start:json_end].strip()
+    if "```" in response_text:
+        json_start = response_text.find("```") + 3
+        json_end = response_text.find("```", json_start)
+        llm_logger.debug("Extracted JSON from ``` block")
+        return response_text[json_start:json_end].strip()
+    llm_logger.debug("Using raw response as JSON")
+    return response_text.strip()
+
+
+def _parse_response(rule_text: str, response_text: str) -> StructuredParsedRule | ParsedRule:
+    """Turn the LLM's response to one rule into a StructuredParsedRule.
+
+    Returns a placeholder ParsedRule with warnings if the response is invalid.
+    """
+    try:
+        json_str = _extract_json(response_text)
+        llm_logger.debug("JSON string to parse:\n%s", json_str, extra=PAYLOAD)
+
+        parsed_data = json.loads(json_str)
+        llm_logger.info("JSON parsed successfully")
+        llm_logger.debug("Parsed data keys: %s", list(parsed_data.keys()))
+
+        # Parse into new structured format first
+        structured_rule = parse_structured_response(rule_text, parsed_data)
+        llm_logger.info(
+            f"Structured rule created - Scope: {structured_rule.scope.value}, Confidence: {structured_rule.confidence}"
+        )
+
+        if structured_rule.warnings:
+            llm_logger.warning("LLM warnings: %s", structured_rule.warnings, extra=PAYLOAD)
+        if structured_rule.ambiguities:
+            llm_logger.warning("LLM ambiguities: %s", structured_rule.ambiguities, extra=PAYLOAD)
+        if structured_rule.llm_feedback:
+            llm_logger.info("LLM feedback: %s", structured_rule.llm_feedback, extra=PAYLOAD)
+        return structured_rule
+
+    except json.JSONDecodeError as e:
+        llm_logger.error(f"JSON parsing error: {e!s}")
+        llm_logger.error("Raw response that failed: %s", response_text[:500], extra=PAYLOAD)
+        # If JSON parsing fails, create a rule with warning
+        return _failed_rule(
+            rule_text,
+            "Regel konnte nicht vollständig analysiert werden",
+            0.1,
+            [f"JSON-Parsing-Fehler: {e!s}", f"Rohantwort: {response_text[:200]}"],
+        )
+    except (ValueError, KeyError) as e:
+        llm_logger.error(f"Schema validation error: {e!s}")
+        # If enum parsing fails or structure is wrong
+        return _failed_rule(
+            rule_text,
+            "Regel konnte nicht vollständig analysiert werden",
+            0.2,
+            [f"Schema-Validierungsfehler: {e!s}"],
+        )
+
+
+def _parse_batch_response(
+    rule_texts: list[str], response_text: str
+) -> list[StructuredParsedRule | None]:
+    """Turn the LLM's JSON array for a batch of rules into StructuredParsedRules.
+
+    Entries are matched to rules by their "index" (1-based, position if
+    missing); rules without a valid entry are None and get parsed on their own.
+    """
+    results: list[StructuredParsedRule | None] = [None] * len(rule_texts)
+    try:
+        entries = json.loads(_extract_json(response_text))
+    except json.JSONDecodeError as e:
+        llm_logger.error(f"Batch JSON parsing error: {e!s}")
+        return results
+    if not isinstance(entries, list):
+        llm_logger.error("Batch response is not a JSON array")
+        return results
+
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("index", position + 1)
+        if not isinstance(index, int) or not 1 <= index <= len(rule_texts):
+            llm_logger.warning(f"Batch entry with invalid index {index!r} ignored")
+            continue
+        try:
+            results[index - 1] = parse_structured_response(rule_texts[index - 1], entry)
+        except (ValueError, KeyError, TypeError) as e:
+            llm_logger.warning(f"Batch entry {index}: schema validation error: {e!s}")
+    return results
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text (no tokenizer round trip)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def chunk_by_token_budget(rule_texts: list[str], token_budget: int) -> list[list[int]]:
+    """
+    Split rules into batches whose estimated rule and output tokens fit the budget.
+
+    Returns:
+        Indices into rule_texts per batch, in input order; a rule exceeding
+        the budget on its own gets a batch of its own
+    """
+    batches: list[list[int]] = []
+    used = token_budget
+    for index, rule_text in enumerate(rule_texts):
+        cost = estimate_tokens(rule_text) + OUTPUT_TOKENS_PER_RULE
+        if used + cost > token_budget:
+            batches.append([])
+            used = 0
+        batches[-1].append(index)
+        used += cost
+    return batches
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Timeouts, connection errors, rate limits and server errors are retried."""
+    if isinstance(
+        error, (asyncio.TimeoutError, anthropic.APIConnectionError, anthropic.RateLimitError)
+    ):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code >= 500
+
+
+async def _create_message(
+    client: anthropic.AsyncAnthropic,
+    system_prompt: str,
+    user_message: str,
+    timeout: float,
+    max_retries: int,
+    max_tokens: int = 1024,
+):
+    """Call the messages API with a per-call timeout and exponential backoff.
+
+    The system prompt (employees, shifts, schema) is the same for every rule
+    of a request and is marked for prompt caching.
+    """
+    system = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+    for attempt in range(max_retries + 1):
+        try:
+            return await asyncio.wait_for(
+                client.messages.create(
+                    model=LLM_MODEL,
+                    max_tokens=max_tokens,
+                    system=system,
+                    messages=[{"role": "user", "content": user_message}],
+                ),
+                timeout,
+            )
+        except Exception as e:
+            if attempt == max_retries or not _is_retryable(e):
+                raise
+            delay = RETRY_BASE_DELAY_SECONDS * 2**attempt
+            delay += random.uniform(0, RETRY_BASE_DELAY_SECONDS)
+            llm_logger.warning(
+                f"LLM call failed ({type(e).__name__}: {e}), retry {attempt + 1}/{max_retries} "
+                f"in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+async def parse_rules_with_llm_async(
+    rule_texts: list[str],
+    context: RuleParserContext,
+    api_key: str | None = None,
+    max_concurrency: int | None = None,
+    timeout: float | None = None,
+    max_retries: int | None = None,
+    base_url: str | None = None,
+    cache: RuleParseCache | None = None,
+    statistics: dict[str, Any] | None = None,
+    batch: bool | None = None,
+    batch_token_budget: int | None = None,
 ) -> list[ParsedRule]:
-    """Parse natural language rules using Claude LLM.
+    """Parse natural language rules using Claude LLM, several rules at a time.
+
+    Formulaic rules are parsed locally by the fast path
+    (services/fast_parser.py), and rules found in the parse cache for the
+    current context are returned without calling the LLM; newly parsed rules
+    are added to the cache.
 
     Args:
         rule_texts: List of natural language rule descriptions
         context: Context with employees, shifts, availability codes
         api_key: Optional API key (falls back to settings or env var)
+        max_concurrency: Maximum number of requests in flight
+        timeout: Seconds per API call before it is cancelled (and retried)
+        max_retries: Retries per rule after timeouts, rate limits or server errors
+        base_url: API endpoint (falls back to settings, then the public API)
+        cache: Parse cache (falls back to settings.RULE_PARSE_CACHE_PATH)
+        statistics: Filled with the rules answered by the fast path, the
+            cache and the LLM, the fast path hit rate and the latencies (ms)
+        batch: Send several rules per request (falls back to
+            settings.LLM_BATCH_PARSING); rules missing from a batch answer
+            are parsed on their own
+        batch_token_budget: Estimated rule and output tokens per batch
 
     Returns:
-        List of parsed rules with structured information
+        List of parsed rules with structured information, in input order
     """
+    defaults = _llm_settings()
+    max_concurrency = max_concurrency or defaults["max_concurrency"]
+    timeout = timeout or defaults["timeout"]
+    max_retries = defaults["max_retries"] if max_retries is None else max_retries
+    base_url = base_url or defaults["base_url"]
+    batch = defaults["batch"] if batch is None else batch
+    batch_token_budget = batch_token_budget or defaults["batch_token_budget"]
+
     # Log session start
+    configure_llm_logging()
     llm_logger.info("=" * 80)
     llm_logger.info("NEW LLM PARSING SESSION STARTED")
     llm_logger.info("=" * 80)
     llm_logger.info(f"Number of rules to parse: {len(rule_texts)}")
-    llm_logger.info(f"Context - Employees: {[e.get('name') for e in context.employees]}")
+    llm_logger.info(
+        "Context - Employees: %s", [e.get("name") for e in context.employees], extra=PAYLOAD
+    )
     llm_logger.info(f"Context - Shifts: {[s.get('name') for s in context.shifts]}")
     llm_logger.info(f"Context - Availability codes: {list(context.availability_codes.keys())}")
+    llm_logger.info(f"Concurrency: {max_concurrency}, timeout: {timeout}s, retries: {max_retries}")
+
+    # Imported here: the fast parser builds on the models of this module
+    from services.fast_parser import fast_parse_batch
+
+    started = time.perf_counter()
+    results: list[StructuredParsedRule | ParsedRule | None]
+    results, fast_path = fast_parse_batch(rule_texts, context)
+    FAST_PATH_DURATION.observe(fast_path.latency_ms / 1000)
+    RULES_PARSED.inc(fast_path.hits, source="fast_path")
+    llm_logger.info(
+        f"Fast path: {fast_path.hits}/{fast_path.rules} rules "
+        f"({fast_path.hit_rate:.0%}) in {fast_path.latency_ms:.2f} ms"
+    )
 
-    if not api_key:
-        # Try to get from settings first, then env var
-        try:
-            from config import settings
+    cache = cache or default_parse_cache()
+    fingerprints = context_fingerprints(
+        context.employees, context.shifts, context.availability_codes
+    )
+    misses = [index for index, result in enumerate(results) if result is None]
+    if cache is not None and misses:
+        cached = await asyncio.to_thread(
+            cache.get_many, [rule_texts[index] for index in misses], fingerprints, LLM_MODEL
+        )
+        for index in misses:
+            rule_text = rule_texts[index]
+            results[index] = _from_cache(rule_text, cached.get(normalize_rule_text(rule_text)))
+            CACHE_REQUESTS.inc(
+                cache="rule_parse", result="miss" if results[index] is None else "hit"
+            )
+    cache_hits = len(misses)
+    misses = [index for index, result in enumerate(results) if result is None]
+    cache_hits -= len(misses)
+    RULES_PARSED.inc(cache_hits, source="cache")
+    RULES_PARSED.inc(len(misses), source="llm")
+    llm_logger.info(f"Parse cache: {cache_hits} hits, {len(misses)} misses")
+    if misses:
+        parsed = await _parse_uncached(
+            [rule_texts[index] for index in misses],
+            context,
+            api_key,
+            max_concurrency,
+            timeout,
+            max_retries,
+            base_url,
+            batch_token_budget if batch else None,
+        )
+        for index, result in zip(misses, parsed, strict=True):
+            results[index] = result
+
+        if cache is not None:
+            entries = [
+                (rule_texts[index], _cache_dependencies(result, context), result.model_dump_json())
+                for index, result in zip(misses, parsed, strict=True)
+                if isinstance(result, StructuredParsedRule)
+            ]
+            await asyncio.to_thread(cache.put_many, entries, fingerprints, LLM_MODEL)
+
+    parsed_rules = [
+        convert_structured_to_legacy(result) if isinstance(result, StructuredParsedRule) else result
+        for result in results
+    ]
+
+    if statistics is not None:
+        statistics.update(
+            rules=len(rule_texts),
+            fast_path_hits=fast_path.hits,
+            fast_path_hit_rate=round(fast_path.hit_rate, 3),
+            fast_path_ms=round(fast_path.latency_ms, 3),
+            cache_hits=cache_hits,
+            llm_calls=len(misses),
+            total_ms=round((time.perf_counter() - started) * 1000, 3),
+        )
 
-            api_key = settings.ANTHROPIC_API_KEY
-        except ImportError:
-            pass
+    llm_logger.info("=" * 80)
+    llm_logger.info(f"SESSION COMPLETED - {len(parsed_rules)} rules parsed")
+    llm_logger.info("=" * 80)
 
-        if not api_key:
-            api_key = os.getenv("ANTHROPIC_API_KEY")
+    return parsed_rules
 
-    if not api_key:
-        llm_logger.error("ANTHROPIC_API_KEY not configured")
-        raise ValueError(
-            "ANTHROPIC_API_KEY nicht gesetzt. Bitte in .env Datei oder Umgebungsvariable konfigurieren."
-        )
 
-    client = anthropic.Anthropic(api_key=api_key)
+def _from_cache(rule_text: str, structured_json: str | None) -> StructuredParsedRule | None:
+    """Cached structured rule for rule_text, or None (also for outdated entries)."""
+    if structured_json is None:
+        return None
+    try:
+        structured = StructuredParsedRule.model_validate_json(structured_json)
+    except ValueError:
+        return None
+    # The cache key ignores case and whitespace; keep the text as entered
+    return structured.model_copy(update={"original_text": rule_text})
+
+
+def _cache_dependencies(structured: StructuredParsedRule, context: RuleParserContext) -> set[str]:
+    """Parts of the parser context a parsed rule depends on (see services/parse_cache.py)."""
+    depends_on = set()
+    if (
+        structured.scope != RuleScope.ALL
+        or structured.employee_names
+        or structured.employee_initials
+        or structured.required_qualifications
+    ):
+        depends_on.add(DEPENDS_ON_EMPLOYEES)
+    if structured.constraint.shift_names or structured.constraint.shift_categories:
+        depends_on.add(DEPENDS_ON_SHIFTS)
+    if mentions_code(structured.original_text, context.availability_codes):
+        depends_on.add(DEPENDS_ON_CODES)
+    return depends_on
+
+
+async def _parse_uncached(
+    rule_texts: list[str],
+    context: RuleParserContext,
+    api_key: str | None,
+    max_concurrency: int,
+    timeout: float,
+    max_retries: int,
+    base_url: str | None,
+    batch_token_budget: int | None = None,
+) -> list[StructuredParsedRule | ParsedRule]:
+    """Parse rules with the LLM, at most max_concurrency requests at a time, in input order.
+
+    With a batch_token_budget, rules are sent in batches (see
+    chunk_by_token_budget) and only the rules a batch answer lacks are sent
+    on their own.
+    """
+    # Retries are handled here, with the same backoff for every error kind
+    client = anthropic.AsyncAnthropic(
+        api_key=_resolve_api_key(api_key), base_url=base_url, max_retries=0
+    )
 
     system_prompt = create_system_prompt(context)
     llm_logger.debug("System prompt created (length: %d chars)", len(system_prompt))
 
-    parsed_rules = []
-
-    for i, rule_text in enumerate(rule_texts, 1):
-        llm_logger.info("-" * 60)
-        llm_logger.info(f"PARSING RULE {i}/{len(rule_texts)}")
-        llm_logger.info(f"Rule text: {rule_text}")
+    semaphore = asyncio.Semaphore(max_concurrency)
 
+    async def parse_one(i: int, rule_text: str) -> StructuredParsedRule | ParsedRule:
         user_message = f"""Analysiere diese Dienstplanregel:
 
 "{rule_text}"
 
 Gib die strukturierte Analyse als JSON zurück."""
 
-        llm_logger.debug("User message sent to LLM")
+        async with semaphore:
+            llm_logger.info(f"PARSING RULE {i}/{len(rule_texts)}: %s", rule_text, extra=PAYLOAD)
+            try:
+                with tracer.start_as_current_span(
+                    "llm.messages.create",
+                    attributes={"llm.model": LLM_MODEL, "rules.index": i},
+                    kind=SpanKind.CLIENT,
+                ):
+                    message = await _create_message(
+                        client, system_prompt, user_message, timeout, max_retries
+                    )
+            except asyncio.TimeoutError:  # noqa: UP041 (not the builtin before 3.11)
+                llm_logger.error(f"Rule {i}: LLM call timed out after {max_retries} retries")
+                return _failed_rule(
+                    rule_text,
+                    "Regel konnte nicht analysiert werden",
+                    0.0,
+                    [f"Zeitüberschreitung der LLM-Anfrage nach {timeout:g}s"],
+                )
+            except anthropic.APIError as e:
+                llm_logger.error(f"Rule {i}: Anthropic API error: {e!s}")
+                return _failed_rule(
+                    rule_text,
+                    "Regel konnte nicht analysiert werden",
+                    0.0,
+                    [f"API-Fehler: {e!s}"],
+                )
 
-        try:
-            llm_logger.info("Calling Anthropic API...")
-            message = client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1024,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_message}],
-            )
+        response_text = message.content[0].text
+        llm_logger.info(f"Rule {i}: LLM response received")
+        llm_logger.debug("Raw LLM response:\n%s", response_text, extra=PAYLOAD)
+        return _parse_response(rule_text, response_text)
 
-            # Extract JSON from response
-            response_text = message.content[0].text
-            llm_logger.info("LLM Response received")
-            llm_logger.debug("Raw LLM response:\n%s", response_text)
-
-            # Try to parse JSON from response
-            # Handle case where response might have markdown code blocks
-            if "```json" in response_text:
-                json_start = response_text.find("```json") + 7
-                json_end = response_text.find("```", json_start)
-                json_str = response_text[json_start:json_end].strip()
-                llm_logger.debug("Extracted JSON from ```json block")
-            elif "```" in response_text:
-                json_start = response_text.find("```") + 3
-                json_end = response_text.find("```", json_start)
-                json_str = response_text[json_start:json_end].strip()
-                llm_logger.debug("Extracted JSON from ``` block")
-            else:
-                json_str = response_text.strip()
-                llm_logger.debug("Using raw response as JSON")
-
-            llm_logger.debug("JSON string to parse:\n%s", json_str)
-
-            parsed_data = json.loads(json_str)
-            llm_logger.info("JSON parsed successfully")
-            llm_logger.debug("Parsed data keys: %s", list(parsed_data.keys()))
-
-            # Parse into new structured format first
-            llm_logger.info("Converting to StructuredParsedRule...")
-            structured_rule = parse_structured_response(rule_text, parsed_data)
-            llm_logger.info(
-                f"Structured rule created - Scope: {structured_rule.scope.value}, Confidence: {structured_rule.confidence}"
-            )
+    async def parse_batch(indices: list[int]) -> list[StructuredParsedRule | None]:
+        batch_texts = [rule_texts[index] for index in indices]
+        numbered = "\n".join(f'{n}. "{text}"' for n, text in enumerate(batch_texts, 1))
+        user_message = f"""Analysiere diese {len(batch_texts)} Dienstplanregeln:
 
-            if structured_rule.warnings:
-                llm_logger.warning(f"LLM warnings: {structured_rule.warnings}")
-            if structured_rule.ambiguities:
-                llm_logger.warning(f"LLM ambiguities: {structured_rule.ambiguities}")
-            if structured_rule.llm_feedback:
-                llm_logger.info(f"LLM feedback: {structured_rule.llm_feedback}")
-
-            # Convert to legacy format for backward compatibility
-            parsed_rule = convert_structured_to_legacy(structured_rule)
-            llm_logger.info(f"Converted to legacy format - applies_to: {parsed_rule.applies_to}")
-
-            parsed_rules.append(parsed_rule)
-            llm_logger.info(f"Rule {i} parsed successfully")
-
-        except json.JSONDecodeError as e:
-            llm_logger.error(f"JSON parsing error: {str(e)}")
-            llm_logger.error(f"Raw response that failed: {response_text[:500]}")
-            # If JSON parsing fails, create a rule with warning
-            parsed_rules.append(
-                ParsedRule(
-                    original_text=rule_text,
-                    rule_type="soft",
-                    category="Allgemeine Regel",
-                    applies_to="all",
-                    constraint_description="Regel konnte nicht vollständig analysiert werden",
-                    confidence=0.1,
-                    warnings=[
-                        f"JSON-Parsing-Fehler: {str(e)}",
-                        f"Rohantwort: {response_text[:200]}",
-                    ],
-                )
-            )
-        except (ValueError, KeyError) as e:
-            llm_logger.error(f"Schema validation error: {str(e)}")
-            # If enum parsing fails or structure is wrong
-            parsed_rules.append(
-                ParsedRule(
-                    original_text=rule_text,
-                    rule_type="soft",
-                    category="Allgemeine Regel",
-                    applies_to="all",
-                    constraint_description="Regel konnte nicht vollständig analysiert werden",
-                    confidence=0.2,
-                    warnings=[f"Schema-Validierungsfehler: {str(e)}"],
-                )
+{numbered}
+
+Gib ein JSON-Array mit genau {len(batch_texts)} Objekten in derselben Reihenfolge zurück,
+eines pro Regel im obigen Ausgabeformat, jeweils mit dem zusätzlichen Feld "index"
+(Nummer der Regel)."""
+
+        async with semaphore:
+            llm_logger.info(
+                f"PARSING BATCH OF {len(indices)} RULES: {[index + 1 for index in indices]}"
             )
-        except anthropic.APIError as e:
-            llm_logger.error(f"Anthropic API error: {str(e)}")
-            parsed_rules.append(
-                ParsedRule(
-                    original_text=rule_text,
-                    rule_type="soft",
-                    category="Allgemeine Regel",
-                    applies_to="all",
-                    constraint_description="Regel konnte nicht analysiert werden",
-                    confidence=0.0,
-                    warnings=[f"API-Fehler: {str(e)}"],
+            try:
+                with tracer.start_as_current_span(
+                    "llm.messages.create",
+                    attributes={"llm.model": LLM_MODEL, "rules.count": len(indices)},
+                    kind=SpanKind.CLIENT,
+                ):
+                    message = await _create_message(
+                        client,
+                        system_prompt,
+                        user_message,
+                        timeout,
+                        max_retries,
+                        max_tokens=OUTPUT_TOKENS_PER_RULE * len(indices),
+                    )
+            except (asyncio.TimeoutError, anthropic.APIError) as e:  # noqa: UP041
+                llm_logger.error(
+                    f"Batch failed ({type(e).__name__}: {e}), parsing rules one by one"
                 )
-            )
+                return [None] * len(indices)
+
+        response_text = message.content[0].text
+        llm_logger.debug("Raw LLM batch response:\n%s", response_text, extra=PAYLOAD)
+        return _parse_batch_response(batch_texts, response_text)
+
+    try:
+        results: list[StructuredParsedRule | ParsedRule | None] = [None] * len(rule_texts)
+        if batch_token_budget:
+            batches = chunk_by_token_budget(rule_texts, batch_token_budget)
+            answers = await asyncio.gather(*(parse_batch(indices) for indices in batches))
+            for indices, answer in zip(batches, answers, strict=True):
+                for index, result in zip(indices, answer, strict=True):
+                    results[index] = result
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if batch_token_budget and missing:
+            llm_logger.warning(f"{len(missing)} rules missing from batch answers, parsing alone")
+        # gather keeps the input order regardless of completion order
+        parsed = await asyncio.gather(
+            *(parse_one(index + 1, rule_texts[index]) for index in missing)
+        )
+        for index, result in zip(missing, parsed, strict=True):
+            results[index] = result
+        return results
+    finally:
+        await client.close()
 
-    llm_logger.info("=" * 80)
-    llm_logger.info(f"SESSION COMPLETED - {len(parsed_rules)} rules parsed")
-    llm_logger.info("=" * 80)
 
-    return parsed_rules
+def parse_rules_with_llm(
+    rule_texts: list[str], context: RuleParserContext, api_key: str | None = None
+) -> list[ParsedRule]:
+    """Parse natural language rules using Claude LLM (blocking).
+
+    Runs parse_rules_with_llm_async in a new event loop; use the async
+    version from async code.
+    """
+    return asyncio.run(parse_rules_with_llm_async(rule_texts, context, api_key))
 
 
 def validate_rule_references(parsed_rule: ParsedRule, context: RuleParserContext) -> ParsedRule:
@@ -709,35 +1076,36 @@ def validate_rule_references(parsed_rule: ParsedRule, context: RuleParserContext
     """
     warnings = list(parsed_rule.warnings)
     ambiguities = list(parsed_rule.ambiguities)
+    suggestions = list(parsed_rule.suggestions)
+    resolver = resolver_for(context.employees, context.shifts)
 
     # Validate employee reference
     if parsed_rule.employee_name:
-        matching_employees = [
-            emp
-            for emp in context.employees
-            if emp.get("name", "").lower() == parsed_rule.employee_name.lower()
-            or emp.get("initials", "").lower() == parsed_rule.applies_to.lower()
-        ]
-
-        if not matching_employees:
+        match = resolver.employee(parsed_rule.employee_name)
+        if not match.found and parsed_rule.applies_to != "all":
+            match = resolver.employee(parsed_rule.applies_to)
+
+        if not match.found:
             warnings.append(
                 f"Mitarbeiter '{parsed_rule.employee_name}' nicht in der Mitarbeiterliste gefunden"
             )
-        elif len(matching_employees) > 1:
-            ambiguities.append(
-                f"Mehrere Mitarbeiter gefunden: {', '.join([str(e.get('name', '')) for e in matching_employees])}"
-            )
+        elif match.ambiguous:
+            ambiguities.append(f"Mehrere Mitarbeiter gefunden: {', '.join(match.names)}")
+        elif match.method == MATCH_FUZZY:
+            suggestions.append(f"Mitarbeiter '{match.names[0]}' gemeint?")
 
     # Validate shift reference
     if parsed_rule.shift_name:
-        matching_shifts = [
-            s for s in context.shifts if s.get("name", "").lower() == parsed_rule.shift_name.lower()
-        ]
+        match = resolver.shift(parsed_rule.shift_name)
 
-        if not matching_shifts:
+        if not match.found:
             warnings.append(
                 f"Schicht '{parsed_rule.shift_name}' nicht in der Schichtliste gefunden"
             )
+        elif match.ambiguous:
+            ambiguities.append(f"Mehrere Schichten gefunden: {', '.join(match.names)}")
+        elif match.method == MATCH_FUZZY:
+            suggestions.append(f"Schicht '{match.names[0]}' gemeint?")
 
     # Update the rule with new warnings/ambiguities
     return ParsedRule(
@@ -753,6 +1121,7 @@ def validate_rule_references(parsed_rule: ParsedRule, context: RuleParserContext
         confidence=parsed_rule.confidence * (0.8 if warnings else 1.0),
         warnings=warnings,
         ambiguities=ambiguities,
-        suggestions=parsed_rule.suggestions,
+        suggestions=suggestions,
         llm_feedback=parsed_rule.llm_feedback,
+        compiled=parsed_rule.compiled,
     )
@@ -0,0 +1,204 @@
+"""Lightweight tracing with OpenTelemetry-compatible spans.
+
+Spans follow the OTLP/JSON field layout (trace id, span id, parent span id,
+start/end time in unix nanoseconds, attributes, status) so exported files can
+be loaded into any OpenTelemetry tooling. No OpenTelemetry SDK is required.
+"""
+
+import json
+import logging
+import secrets
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+logger = logging.getLogger(__name__)
+
+
+class SpanKind:
+    """Span kinds as defined by OpenTelemetry."""
+
+    INTERNAL = "SPAN_KIND_INTERNAL"
+    SERVER = "SPAN_KIND_SERVER"
+    CLIENT = "SPAN_KIND_CLIENT"
+
+
+class StatusCode:
+    """Span status codes as defined by OpenTelemetry."""
+
+    UNSET = "STATUS_CODE_UNSET"
+    OK = "STATUS_CODE_OK"
+    ERROR = "STATUS_CODE_ERROR"
+
+
+@dataclass
+class Span:
+    """A single timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None = None
+    kind: str = SpanKind.INTERNAL
+    start_time_unix_nano: int = 0
+    end_time_unix_nano: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status_code: str = StatusCode.UNSET
+    status_message: str | None = None
+
+    def set_attribute(self, key: str, value: Any):
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def set_status(self, code: str, message: str | None = None):
+        """Set the span status."""
+        self.status_code = code
+        self.status_message = message
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds (0 while the span is still open)."""
+        if not self.end_time_unix_nano:
+            return 0.0
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1_000_000
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to an OTLP/JSON compatible span dictionary."""
+        status: dict[str, Any] = {"code": self.status_code}
+        if self.status_message:
+            status["message"] = self.status_message
+
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_unix_nano),
+            "endTimeUnixNano": str(self.end_time_unix_nano),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()
+            ],
+            "status": status,
+        }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    """Encode an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class ConsoleSpanExporter:
+    """Writes finished spans as JSON lines to a stream (stdout by default)."""
+
+    def __init__(self, stream: TextIO | None = None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+class FileSpanExporter:
+    """Appends finished spans as JSON lines to a local file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False)
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans and hands finished spans to the configured exporters."""
+
+    def __init__(self, exporters: list | None = None):
+        self.exporters = exporters or []
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        kind: str = SpanKind.INTERNAL,
+    ) -> Iterator[Span]:
+        """Open a span, make it the current span and close it on exit.
+
+        Exceptions raised inside the block mark the span as failed and are
+        re-raised unchanged.
+        """
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+            start_time_unix_nano=time.time_ns(),
+            attributes=dict(attributes or {}),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_status(StatusCode.ERROR, str(e))
+            raise
+        finally:
+            span.end_time_unix_nano = time.time_ns()
+            _current_span.reset(token)
+            self._export(span)
+
+    def _export(self, span: Span):
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except (OSError, ValueError) as e:
+                # Tracing must never break the traced operation
+                logger.debug("Span export to %s failed: %s", type(exporter).__name__, e)
+
+
+def get_current_span() -> Span | None:
+    """Return the span active in the current context, if any."""
+    return _current_span.get()
+
+
+def _build_exporters() -> list:
+    """Create exporters from settings (TRACING_EXPORTER / TRACING_FILE)."""
+    try:
+        from config import settings
+
+        exporter_name = settings.TRACING_EXPORTER
+        trace_file = settings.TRACING_FILE
+    except ImportError:
+        return []
+
+    if exporter_name == "console":
+        return [ConsoleSpanExporter()]
+    if exporter_name == "file":
+        return [FileSpanExporter(trace_file)]
+    return []
+
+
+tracer = Tracer(_build_exporters())
@@ -1,6 +1,22 @@
-from .constraints import ConstraintBuilder
-from .model import RosterSolver
-from .objectives import ObjectiveBuilder
-from .solution import SolutionAnalyzer
+"""CP-SAT roster solver.
+
+The exports are loaded on first access, so importing a light submodule
+(e.g. solver.rule_ir from the rules router) does not load OR-Tools.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "RosterSolver": ".model",
+    "ConstraintBuilder": ".constraints",
+    "ObjectiveBuilder": ".objectives",
+    "SolutionAnalyzer": ".solution",
+}
 
 __all__ = ["RosterSolver", "ConstraintBuilder", "ObjectiveBuilder", "SolutionAnalyzer"]
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
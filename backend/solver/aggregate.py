@@ -0,0 +1,300 @@
+"""Aggregated count-based model for large pools of interchangeable staff.
+
+Instead of one boolean per employee, day and shift, the aggregated model has
+one integer per staff class, day and shift ("how many class-A assistants
+work Früh on day 3"). Staff classes group employees with identical
+qualifications, contract and hours; personal availability is folded into
+per-day class capacities. All class-level constraints are necessary
+conditions of the per-person constraints, so an infeasible aggregated model
+proves the request infeasible.
+
+A greedy disaggregation pass then assigns the counts to individuals day by
+day, respecting availability, the 11h rest rule and the 48h week, and
+preferring the least loaded employees. If it gets stuck, the caller falls
+back to the per-person model.
+"""
+
+from collections import defaultdict
+
+from ortools.sat.python import cp_model
+
+from .calendar_index import calendar_for
+from .constraints import (
+    UNAVAILABLE_CODES,
+    get_shift_duration,
+    hard_rule_kind,
+    parse_min_requirement,
+)
+from .objectives import COVERAGE_SHORTAGE_WEIGHT
+from .precheck import MAX_WEEKLY_HOURS
+from .qualifications import eligibility_matrix
+from .transitions import transition_matrix
+
+# Penalty per shift a class works beyond or below its per-capita share
+CLASS_BALANCE_WEIGHT = 5
+
+# Auto mode: aggregate only large teams made of few, large staff classes
+AGGREGATION_MIN_EMPLOYEES = 100
+AGGREGATION_MIN_CLASS_SIZE = 10  # Average employees per class
+
+MODE_AUTO = "auto"
+MODE_AGGREGATE = "aggregate"
+MODE_PER_PERSON = "per_person"
+
+
+def group_staff_classes(employees: list[dict]) -> list[list[dict]]:
+    """Group employees by qualifications, contract and hours (input order kept)."""
+    classes: dict[tuple, list[dict]] = {}
+    for emp in employees:
+        key = (tuple(sorted(emp.get("qualifications", []))), emp.get("contract"), emp.get("hours"))
+        classes.setdefault(key, []).append(emp)
+    return list(classes.values())
+
+
+def aggregation_blocker(data: dict) -> str | None:
+    """Reason why the aggregated model cannot solve the request, or None.
+
+    Fixed assignments, boundary state, quotas, alternative plans, custom hard
+    rules that add constraints and rules for individual employees need
+    per-person variables.
+    """
+    for key, reason in (
+        ("fixed_assignments", "fixed assignments"),
+        ("boundary_state", "boundary state"),
+        ("quotas", "quotas"),
+    ):
+        if data.get(key):
+            return reason
+    if (data.get("num_alternatives") or 1) > 1:
+        return "alternative plans"
+    for rule in data.get("rules", []):
+        if not rule.get("isActive", True):
+            continue
+        if (rule.get("appliesTo") or "all") != "all":
+            return "rules for individual employees"
+        if rule.get("type") == "hard" and hard_rule_kind(rule) is not None:
+            return "custom hard rules"
+    return None
+
+
+def can_aggregate(data: dict) -> bool:
+    """Check whether the request only uses features the aggregated model covers."""
+    return aggregation_blocker(data) is None
+
+
+def should_aggregate(data: dict) -> bool:
+    """Decide between the aggregated and the per-person model.
+
+    data["model_mode"] forces "aggregate" or "per_person"; in "auto" mode
+    (default) large teams with large staff classes are aggregated.
+    """
+    mode = data.get("model_mode") or MODE_AUTO
+    if mode == MODE_PER_PERSON or not can_aggregate(data):
+        return False
+    if mode == MODE_AGGREGATE:
+        return True
+
+    employees = data.get("employees", [])
+    if len(employees) < AGGREGATION_MIN_EMPLOYEES:
+        return False
+    classes = group_staff_classes(employees)
+    return len(employees) / len(classes) >= AGGREGATION_MIN_CLASS_SIZE
+
+
+class AggregateRosterModel:
+    """Count-based CP-SAT model over staff classes."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.shifts = data.get("shifts", [])
+        self.days = [str(d) for d in data.get("days", [])]
+        self.availability = data.get("availability", {})
+        self.soft_coverage = data.get("soft_coverage", False)
+        self.weeks = calendar_for(data).weeks
+        self.transitions = transition_matrix(self.shifts)
+        self.classes = group_staff_classes(data.get("employees", []))
+
+        self.model = cp_model.CpModel()
+        # (class index, day, shift name) -> number of class members on that shift
+        self.count_vars: dict[tuple[int, str, str], cp_model.IntVar] = {}
+        # (day, shift name) -> shortage slack (soft coverage mode)
+        self.coverage_slacks: dict[tuple[str, str], cp_model.IntVar] = {}
+
+        self._available = {
+            (c, day): [emp for emp in members if self._is_available(emp, day)]
+            for c, members in enumerate(self.classes)
+            for day in self.days
+        }
+
+        self._create_variables()
+        self._add_constraints()
+        self._build_objective()
+
+    def _is_available(self, emp: dict, day: str) -> bool:
+        return self.availability.get(emp["initials"], {}).get(day) not in UNAVAILABLE_CODES
+
+    def _create_variables(self):
+        """One count per class, day and shift the class is qualified for."""
+        eligibility = eligibility_matrix(self.data.get("employees", []), self.shifts)
+        for c, members in enumerate(self.classes):
+            # Members share their qualifications
+            for shift in self.shifts:
+                if not eligibility.is_eligible(members[0]["initials"], shift["name"]):
+                    continue
+                for day in self.days:
+                    self.count_vars[(c, day, shift["name"])] = self.model.new_int_var(
+                        0, len(self._available[(c, day)]), f"count_{c}_{day}_{shift['name']}"
+                    )
+
+    def _add_constraints(self):
+        # Coverage
+        for day in self.days:
+            for shift in self.shifts:
+                min_staff = parse_min_requirement(shift.get("requirements", []))
+                assigned = [
+                    var
+                    for (c, d, s), var in self.count_vars.items()
+                    if d == day and s == shift["name"]
+                ]
+                if self.soft_coverage:
+                    slack = self.model.new_int_var(0, min_staff, f"shortage_{day}_{shift['name']}")
+                    self.coverage_slacks[(day, shift["name"])] = slack
+                    self.model.add(sum(assigned) + slack >= min_staff)
+                else:
+                    self.model.add(sum(assigned) >= min_staff)
+
+        for c in range(len(self.classes)):
+            # One shift per day per available member
+            for day in self.days:
+                day_counts = self._counts(c, day)
+                if day_counts:
+                    self.model.add(sum(day_counts) <= len(self._available[(c, day)]))
+
+            # Rest time: shift s on day d and the shifts that may not follow s
+            # on day d+1 need different people, who must be available on one
+            # of the two days
+            for day, next_day in zip(self.days, self.days[1:], strict=False):
+                members = {emp["initials"] for emp in self._available[(c, day)]}
+                members |= {emp["initials"] for emp in self._available[(c, next_day)]}
+                for shift in self.shifts:
+                    forbidden = self.transitions.forbidden_after[shift["name"]]
+                    current = self.count_vars.get((c, day, shift["name"]))
+                    following = self._counts(c, next_day, lambda s, f=forbidden: s["name"] in f)
+                    if current is not None and following:
+                        self.model.add(current + sum(following) <= len(members))
+
+            # Weekly hours of the whole class
+            for week_days in self.weeks:
+                hours = [
+                    var * get_shift_duration(shift)
+                    for day in week_days
+                    for shift in self.shifts
+                    if (var := self.count_vars.get((c, day, shift["name"]))) is not None
+                ]
+                if hours:
+                    self.model.add(sum(hours) <= MAX_WEEKLY_HOURS * len(self.classes[c]))
+
+    def _build_objective(self):
+        """Penalise shortages, unbalanced class workloads and overstaffing."""
+        terms = [slack * COVERAGE_SHORTAGE_WEIGHT for slack in self.coverage_slacks.values()]
+        terms.extend(self.count_vars.values())
+
+        # Each class should work its per-capita share of the required shifts
+        total_staff = sum(len(members) for members in self.classes)
+        demand = len(self.days) * sum(
+            parse_min_requirement(shift.get("requirements", [])) for shift in self.shifts
+        )
+        for c, members in enumerate(self.classes):
+            load = [var for (cls, _, _), var in self.count_vars.items() if cls == c]
+            if not load or not total_staff:
+                continue
+            target = round(demand * len(members) / total_staff)
+            deviation = self.model.new_int_var(0, max(demand, target), f"class_dev_{c}")
+            self.model.add(deviation >= sum(load) - target)
+            self.model.add(deviation >= target - sum(load))
+            terms.append(deviation * CLASS_BALANCE_WEIGHT)
+
+        if terms:
+            self.model.minimize(sum(terms))
+
+    def _counts(self, c, day, predicate=None):
+        return [
+            var
+            for shift in self.shifts
+            if predicate is None or predicate(shift)
+            if (var := self.count_vars.get((c, day, shift["name"]))) is not None
+        ]
+
+    def disaggregate(self, solver: cp_model.CpSolver) -> set[tuple[str, str, str]] | None:
+        """
+        Assign the solved class counts to individual employees.
+
+        Days are processed in order. Within a class, scarce shifts (fewest
+        eligible members per required person) are filled first, each with
+        the eligible members that have worked the fewest hours so far (then
+        the fewest shifts of this type).
+
+        Returns:
+            Set of (initials, day, shift name) assignments, or None if some
+            count could not be assigned to eligible members
+        """
+        shifts_by_name = {shift["name"]: shift for shift in self.shifts}
+        week_of_day = {
+            day: index for index, week_days in enumerate(self.weeks) for day in week_days
+        }
+
+        assigned: set[tuple[str, str, str]] = set()
+        last_shift: dict[str, dict | None] = {}
+        total_hours: dict[str, int] = defaultdict(int)
+        week_hours: dict[tuple[str, int], int] = defaultdict(int)
+        shift_counts: dict[tuple[str, str], int] = defaultdict(int)
+
+        for i, day in enumerate(self.days):
+            today: dict[str, dict] = {}
+            week = week_of_day[day]
+
+            for c in range(len(self.classes)):
+                candidates = self._available[(c, day)]
+                demand = {
+                    name: solver.value(var)
+                    for (cls, d, name), var in self.count_vars.items()
+                    if cls == c and d == day
+                }
+
+                def eligible(emp, shift, week=week, i=i, today=today, last_shift=last_shift):
+                    initials = emp["initials"]
+                    if initials in today:
+                        return False
+                    previous = last_shift.get(initials) if i > 0 else None
+                    if previous and self.transitions.is_forbidden(previous["name"], shift["name"]):
+                        return False
+                    hours = week_hours[(initials, week)] + get_shift_duration(shift)
+                    return hours <= MAX_WEEKLY_HOURS
+
+                def scarcity(name, candidates=candidates, eligible=eligible, demand=demand):
+                    shift = shifts_by_name[name]
+                    return sum(1 for emp in candidates if eligible(emp, shift)) / demand[name]
+
+                for name in sorted((n for n in demand if demand[n] > 0), key=scarcity):
+                    shift = shifts_by_name[name]
+                    pool = [emp for emp in candidates if eligible(emp, shift)]
+                    if len(pool) < demand[name]:
+                        return None
+                    pool.sort(
+                        key=lambda emp, name=name: (
+                            total_hours[emp["initials"]],
+                            shift_counts[(emp["initials"], name)],
+                        )
+                    )
+                    for emp in pool[: demand[name]]:
+                        today[emp["initials"]] = shift
+
+            for initials, shift in today.items():
+                hours = get_shift_duration(shift)
+                assigned.add((initials, day, shift["name"]))
+                total_hours[initials] += hours
+                week_hours[(initials, week)] += hours
+                shift_counts[(initials, shift["name"])] += 1
+            last_shift = {initials: today.get(initials) for initials in last_shift | today}
+
+        return assigned
@@ -0,0 +1,223 @@
+"""Calendar index of the planning period.
+
+Maps the day labels of a request to real dates once per solve, so that
+constraints, objectives and analysis agree on weekdays, weeks and holidays.
+Days are resolved in this order:
+
+    - ISO dates ("2025-03-01") are used as they are.
+    - Day numbers with data["month"] ("2025-03") count from the first of the
+      month; numbers beyond the month's length continue into the next months.
+    - Without dates the legacy approximation is kept: day numbers with
+      day % 7 == 6 are Saturdays, day % 7 == 0 Sundays, and weeks are chunks
+      of 7 days after week_start_offset.
+
+With dates, weeks are ISO weeks (Monday to Sunday) and German public holidays
+(nationwide, plus those of data["holiday_region"], e.g. "BY") are marked.
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+SATURDAY = 5
+SUNDAY = 6
+
+# Holidays observed in some federal states only: name -> (states, date function)
+_REGIONAL_HOLIDAYS = {
+    "Heilige Drei Könige": ({"BW", "BY", "ST"}, lambda year, easter: date(year, 1, 6)),
+    "Internationaler Frauentag": ({"BE", "MV"}, lambda year, easter: date(year, 3, 8)),
+    "Fronleichnam": (
+        {"BW", "BY", "HE", "NW", "RP", "SL"},
+        lambda year, easter: easter + timedelta(days=60),
+    ),
+    "Mariä Himmelfahrt": ({"SL"}, lambda year, easter: date(year, 8, 15)),
+    "Weltkindertag": ({"TH"}, lambda year, easter: date(year, 9, 20)),
+    "Reformationstag": (
+        {"BB", "HB", "HH", "MV", "NI", "SH", "SN", "ST", "TH"},
+        lambda year, easter: date(year, 10, 31),
+    ),
+    "Allerheiligen": ({"BW", "BY", "NW", "RP", "SL"}, lambda year, easter: date(year, 11, 1)),
+    # Wednesday before 23 November
+    "Buß- und Bettag": (
+        {"SN"},
+        lambda year, easter: (
+            date(year, 11, 22) - timedelta(days=(date(year, 11, 22).weekday() - 2) % 7)
+        ),
+    ),
+}
+
+
+def easter_sunday(year: int) -> date:
+    """Easter Sunday (Gregorian calendar, anonymous algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday) // 451
+    month, day = divmod(h + weekday - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=32)
+def german_holidays(year: int, region: str | None = None) -> dict[date, str]:
+    """German public holidays of a year: nationwide plus those of region."""
+    easter = easter_sunday(year)
+    holidays = {
+        date(year, 1, 1): "Neujahr",
+        easter - timedelta(days=2): "Karfreitag",
+        easter + timedelta(days=1): "Ostermontag",
+        date(year, 5, 1): "Tag der Arbeit",
+        easter + timedelta(days=39): "Christi Himmelfahrt",
+        easter + timedelta(days=50): "Pfingstmontag",
+        date(year, 10, 3): "Tag der Deutschen Einheit",
+        date(year, 12, 25): "1. Weihnachtstag",
+        date(year, 12, 26): "2. Weihnachtstag",
+    }
+    for name, (states, holiday) in _REGIONAL_HOLIDAYS.items():
+        if region in states:
+            holidays[holiday(year, easter)] = name
+    return holidays
+
+
+def group_days_by_week(days, week_start_offset=0):
+    """Group days into chunks of 7 (legacy weeks without dates).
+
+    week_start_offset is the number of days of the first week that lie
+    before days[0]; the first group is shortened accordingly.
+    """
+    weeks = []
+    current_week = []
+    week_length = 7 - week_start_offset % 7
+
+    for day in days:
+        current_week.append(day)
+        # Simple grouping: every 7 days is a week
+        if len(current_week) == week_length:
+            week_length = 7
+            weeks.append(current_week)
+            current_week = []
+
+    # Add remaining days
+    if current_week:
+        weeks.append(current_week)
+
+    return weeks
+
+
+def adjacent_day(day, delta: int) -> str | None:
+    """Label of the day delta days away from day (ISO date or day number)."""
+    day = str(day)
+    try:
+        return (date.fromisoformat(day) + timedelta(days=delta)).isoformat()
+    except ValueError:
+        pass
+    return str(int(day) + delta) if day.lstrip("-").isdigit() else None
+
+
+def _parse_dates(days: tuple[str, ...], month: str | None) -> list[date] | None:
+    """Resolve day labels to dates, or None if the request has no dates."""
+    try:
+        return [date.fromisoformat(day) for day in days]
+    except ValueError:
+        pass
+    if not month:
+        return None
+    try:
+        year, month_number = (int(part) for part in month.split("-"))
+        first = date(year, month_number, 1)
+        return [first + timedelta(days=int(day) - 1) for day in days]
+    except ValueError:
+        return None
+
+
+class CalendarIndex:
+    """Weekdays, weeks, weekends and holidays of the planning days.
+
+    All day collections keep the order of the request's days.
+    """
+
+    def __init__(
+        self,
+        days: list,
+        month: str | None = None,
+        week_start_offset: int = 0,
+        holiday_region: str | None = None,
+    ):
+        self.days = [str(day) for day in days]
+        dates = _parse_dates(tuple(self.days), month)
+        self.has_dates = dates is not None
+
+        # day -> date (None without dates)
+        self.dates: dict[str, date | None] = {}
+        # day -> weekday (Monday = 0)
+        self.weekday: dict[str, int] = {}
+        # day -> holiday name
+        self.holidays: dict[str, str] = {}
+
+        if dates is not None:
+            for day, day_date in zip(self.days, dates, strict=True):
+                self.dates[day] = day_date
+                self.weekday[day] = day_date.weekday()
+                holiday = german_holidays(day_date.year, holiday_region).get(day_date)
+                if holiday:
+                    self.holidays[day] = holiday
+            self.weeks = []
+            week_key = None
+            for day, day_date in zip(self.days, dates, strict=True):
+                if day_date.isocalendar()[:2] != week_key:
+                    week_key = day_date.isocalendar()[:2]
+                    self.weeks.append([])
+                self.weeks[-1].append(day)
+            self.week_start_offset = dates[0].weekday() if dates else 0
+        else:
+            for day in self.days:
+                self.dates[day] = None
+                if day.lstrip("-").isdigit():
+                    # Legacy approximation: day 6 is a Saturday, day 7 a Sunday
+                    self.weekday[day] = (int(day) - 1) % 7
+            self.weeks = group_days_by_week(self.days, week_start_offset)
+            self.week_start_offset = week_start_offset % 7
+
+        self.week_of = {day: index for index, week in enumerate(self.weeks) for day in week}
+        self.saturdays = [day for day in self.days if self.weekday.get(day) == SATURDAY]
+        self.sundays = [day for day in self.days if self.weekday.get(day) == SUNDAY]
+        self.weekends = [day for day in self.days if self.weekday.get(day) in (SATURDAY, SUNDAY)]
+        self.holiday_days = [day for day in self.days if day in self.holidays]
+        # Days counted as weekend duty for fairness: weekends and public holidays
+        weekends = set(self.weekends)
+        self.weekend_or_holiday = [
+            day for day in self.days if day in self.holidays or day in weekends
+        ]
+        self._weekend_or_holiday = set(self.weekend_or_holiday)
+
+    def is_weekend(self, day) -> bool:
+        """Saturday, Sunday or public holiday."""
+        return str(day) in self._weekend_or_holiday
+
+    def ends_week(self, day) -> bool:
+        """Whether day is the last day of its week (the next day starts a new week)."""
+        day = str(day)
+        if self.has_dates:
+            return self.weekday[day] == SUNDAY
+        index = self.week_of[day]
+        week = self.weeks[index]
+        full_length = 7 - self.week_start_offset if index == 0 else 7
+        return day == week[-1] and len(week) == full_length
+
+
+@lru_cache(maxsize=64)
+def _cached_index(days, month, week_start_offset, holiday_region):
+    return CalendarIndex(list(days), month, week_start_offset, holiday_region)
+
+
+def calendar_for(data: dict) -> CalendarIndex:
+    """Calendar index of a request (shared by all builders of the same days)."""
+    return _cached_index(
+        tuple(str(day) for day in data.get("days", [])),
+        data.get("month"),
+        data.get("week_start_offset", 0),
+        data.get("holiday_region"),
+    )
@@ -0,0 +1,166 @@
+"""Opt-in capture of solver requests as reproducible replay archives.
+
+Each capture is a zip archive containing:
+    - request.json: the solver input data with personal data scrubbed
+    - parameters.json: time limit, worker count and the full SatParameters
+    - model.pbtxt: the built CpModel proto (text format, names removed)
+    - result.json: status, statistics and phase timings of the original solve
+
+Enable by setting SOLVER_CAPTURE_DIR. With SOLVER_CAPTURE_MIN_SECONDS > 0 only
+solves that are slower than the threshold or end without a solution are kept.
+"""
+
+import copy
+import hashlib
+import json
+import re
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from ortools.sat.python import cp_model
+
+CAPTURE_FORMAT_VERSION = 1
+
+# Titles kept when scrubbing names from rule texts
+NAME_TITLES = {"dr", "dr.", "prof", "prof.", "med", "med."}
+
+
+def get_capture_settings() -> tuple[str | None, float]:
+    """Return (capture directory, minimum solve seconds) from settings."""
+    try:
+        from config import settings
+
+        return settings.SOLVER_CAPTURE_DIR, settings.SOLVER_CAPTURE_MIN_SECONDS
+    except ImportError:
+        return None, 0.0
+
+
+def should_capture(status_name: str, wall_time: float, min_seconds: float) -> bool:
+    """Decide whether a finished solve is worth capturing."""
+    if status_name not in ("OPTIMAL", "FEASIBLE"):
+        return True
+    return wall_time >= min_seconds
+
+
+def scrub_request(data: dict) -> tuple[dict, dict[str, str]]:
+    """Replace employee names and initials with stable pseudonyms.
+
+    Returns:
+        Tuple of (scrubbed copy of data, mapping from original to pseudonym)
+    """
+    scrubbed = copy.deepcopy(data)
+    initials_map: dict[str, str] = {}
+    text_replacements: dict[str, str] = {}
+
+    for i, emp in enumerate(scrubbed.get("employees", []), 1):
+        pseudonym = f"Mitarbeiter {i:03d}"
+        pseudo_initials = f"M{i:03d}"
+
+        name = emp.get("name") or ""
+        initials = emp.get("initials") or ""
+        if initials:
+            initials_map[initials] = pseudo_initials
+        if name:
+            text_replacements[name] = pseudonym
+            for part in name.split():
+                if part.lower() not in NAME_TITLES and len(part) > 2:
+                    text_replacements.setdefault(part, pseudonym)
+
+        emp["name"] = pseudonym
+        emp["initials"] = pseudo_initials
+        for field in ("email", "phone", "employee_number", "notes"):
+            emp.pop(field, None)
+
+    def scrub_text(text: str) -> str:
+        # Longest names first so full names win over their parts
+        for original in sorted(text_replacements, key=len, reverse=True):
+            text = re.sub(rf"\b{re.escape(original)}\b", text_replacements[original], text)
+        for original, pseudo in initials_map.items():
+            text = re.sub(rf"\b{re.escape(original)}\b", pseudo, text)
+        return text
+
+    scrubbed["availability"] = {
+        initials_map.get(initials, initials): days
+        for initials, days in scrubbed.get("availability", {}).items()
+    }
+
+    for assignment in scrubbed.get("fixed_assignments", []):
+        emp_initials = assignment.get("employee")
+        assignment["employee"] = initials_map.get(emp_initials, emp_initials)
+
+    for rule in scrubbed.get("rules", []):
+        rule["text"] = scrub_text(rule.get("text", ""))
+        applies_to = rule.get("appliesTo")
+        if applies_to and applies_to != "all":
+            rule["appliesTo"] = initials_map.get(applies_to) or scrub_text(applies_to)
+
+    mapping = {**text_replacements, **initials_map}
+    return scrubbed, mapping
+
+
+def write_capture(
+    capture_dir: str | Path,
+    data: dict,
+    model: cp_model.CpModel,
+    parameters: dict[str, Any],
+    result: dict[str, Any],
+) -> Path:
+    """Write a scrubbed capture archive and return its path."""
+    scrubbed, _mapping = scrub_request(data)
+
+    # Variable names contain employee initials; drop all names from the proto
+    anonymous_model = model.clone()
+    anonymous_model.remove_all_names()
+
+    request_json = json.dumps(scrubbed, ensure_ascii=False, indent=2, sort_keys=True)
+    digest = hashlib.sha256(request_json.encode("utf-8")).hexdigest()[:12]
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    path = Path(capture_dir) / f"{timestamp}_{result.get('status', 'UNKNOWN')}_{digest}.zip"
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    summary = {
+        "format_version": CAPTURE_FORMAT_VERSION,
+        "captured_at": datetime.now().isoformat(),
+        "status": result.get("status"),
+        "statistics": result.get("statistics", {}),
+        "timings": result.get("timings", {}),
+    }
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("request.json", request_json)
+        archive.writestr("parameters.json", json.dumps(parameters, indent=2))
+        archive.writestr("model.pbtxt", str(anonymous_model.Proto()))
+        archive.writestr("result.json", json.dumps(summary, indent=2, default=str))
+
+    return path
+
+
+def load_capture(path: str | Path) -> dict[str, Any]:
+    """Load a capture archive.
+
+    Returns:
+        Dictionary with request, parameters, result and the rebuilt CpModel
+    """
+    with zipfile.ZipFile(path) as archive:
+        request = json.loads(archive.read("request.json"))
+        parameters = json.loads(archive.read("parameters.json"))
+        result = json.loads(archive.read("result.json"))
+        model_text = archive.read("model.pbtxt").decode("utf-8")
+
+    model = cp_model.CpModel()
+    merge_text_format(model.Proto(), model_text)
+
+    return {"request": request, "parameters": parameters, "result": result, "model": model}
+
+
+def merge_text_format(message: Any, text: str):
+    """Merge a text-format proto into a message (C++ wrapper or protobuf)."""
+    if hasattr(message, "merge_text_format"):
+        message.merge_text_format(text)
+    else:
+        from google.protobuf import text_format
+
+        text_format.Merge(text, message)
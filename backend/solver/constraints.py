@@ -1,23 +1,131 @@
 """Hard constraint implementations for the roster solver."""
 
 import re
+from itertools import pairwise
 
 from ortools.sat.python import cp_model
 
+from .calendar_index import calendar_for
+from .qualifications import eligibility_matrix, parse_qualifications
+from .resolver import resolver_for
+from .rule_ir import (
+    DEFAULT_MAX_CONSECUTIVE_DAYS,
+    HARD_RULE_KINDS,
+    RULE_MAX_CONSECUTIVE_DAYS,
+    RULE_NO_WORK,
+    compiled_rule,
+    resolve_employees,
+)
+from .transitions import transition_matrix
+
+# Availability codes that make an employee unavailable for the whole day
+UNAVAILABLE_CODES = {"uw", "EZ", "BV", "krank", "U", "K", "SU", "MU"}
+
+
+def parse_min_requirement(requirements):
+    """Parse minimum staff requirement from shift requirements."""
+    for req in requirements:
+        if "Min." in req or "Mindestens" in req:
+            match = re.search(r"(\d+)", req)
+            if match:
+                return int(match.group(1))
+    return 1  # Default to 1 person required
+
+
+def get_shift_duration(shift):
+    """Get shift duration in hours."""
+    time_str = shift.get("time", "")
+    if "-" in time_str:
+        parts = time_str.split("-")
+        if len(parts) == 2:
+            try:
+                start = parts[0].strip()
+                end = parts[1].strip()
+                start_hour = int(start.split(":")[0])
+                end_hour = int(end.split(":")[0])
+
+                # Handle overnight shifts
+                if end_hour <= start_hour:
+                    duration = (24 - start_hour) + end_hour
+                else:
+                    duration = end_hour - start_hour
+                return duration
+            except (ValueError, IndexError):
+                pass
+    return 8  # Default 8 hours
+
+
+def hard_rule_kind(rule):
+    """Kind of constraint a custom hard rule is turned into (or None)."""
+    kind = compiled_rule(rule)["kind"]
+    return kind if kind in HARD_RULE_KINDS else None
+
+
+def parse_max_consecutive_days(rule):
+    """Day limit of a maximum consecutive working days rule."""
+    return compiled_rule(rule).get("limit", DEFAULT_MAX_CONSECUTIVE_DAYS)
+
+
+def is_demanding_shift(shift):
+    """Check if shift is demanding (night, on-call, etc.)."""
+    name = shift.get("name", "").lower()
+    time_str = shift.get("time", "")
+
+    # Night shifts
+    if "nacht" in name or "rufbereitschaft" in name:
+        return True
+
+    # Check if shift time indicates night work
+    if "-" in time_str:
+        try:
+            end_time = time_str.split("-")[1].strip()
+            hour = int(end_time.split(":")[0])
+            if hour <= 8:  # Ends in early morning
+                return True
+        except (ValueError, IndexError):
+            pass
+
+    return False
+
 
 class ConstraintBuilder:
     """Builds hard constraints for the CP-SAT model."""
 
-    def __init__(self, model: cp_model.CpModel, shift_vars: dict, data: dict):
+    def __init__(
+        self,
+        model: cp_model.CpModel,
+        shift_vars: dict,
+        data: dict,
+        coverage_slacks: dict | None = None,
+        assumptions: dict | None = None,
+    ):
         self.model = model
         self.shift_vars = shift_vars
         self.data = data
+        # Soft coverage: (day, shift) -> shortage slack variable, shared with objective/analysis
+        self.soft_coverage = data.get("soft_coverage", False)
+        self.coverage_slacks = coverage_slacks if coverage_slacks is not None else {}
+        # Assumption tracking: when a dict is passed, every hard constraint is
+        # guarded by an assumption literal keyed by (family, details...) so an
+        # infeasible model can be explained via sufficient assumptions
+        self.assumptions = assumptions
         self.employees = data.get("employees", [])
         self.shifts = data.get("shifts", [])
         self.days = data.get("days", [])
         self.rules = data.get("rules", [])
         self.availability = data.get("availability", {})
         self.fixed_assignments = data.get("fixed_assignments", [])
+        # Context from before days[0] (see solver/horizon.py):
+        # initials -> {"last_shift", "consecutive_days", "week_hours"}
+        self.boundary_state = data.get("boundary_state") or {}
+        self.calendar = calendar_for(data)
+        # Forbidden consecutive-day shift pairs (11h rest)
+        self.transitions = transition_matrix(self.shifts)
+        self.resolver = resolver_for(self.employees, self.shifts)
+        self.eligibility = eligibility_matrix(self.employees, self.shifts)
+        # Upper bounds per employee (see solver/decomposition.py):
+        # initials -> {"shifts", "nights", "weekends"}
+        self.quotas = data.get("quotas") or {}
 
     def add_all_hard_constraints(self):
         """Add all hard constraints to the model."""
@@ -29,9 +137,15 @@ class ConstraintBuilder:
         self.add_fixed_assignments()
         self.add_availability_constraints()
         self.add_custom_hard_rules()
+        self.add_quota_constraints()
 
     def add_shift_coverage_constraints(self):
-        """Ensure each shift has minimum required coverage."""
+        """Ensure each shift has minimum required coverage.
+
+        In soft coverage mode a shortage slack per day and shift absorbs any
+        shortfall instead, so the model stays feasible; the objective
+        penalises the slack heavily.
+        """
         for day in self.days:
             for shift in self.shifts:
                 min_staff = self._parse_min_requirement(shift.get("requirements", []))
@@ -41,8 +155,22 @@ class ConstraintBuilder:
                         for emp in self.employees
                     ]
                     assigned = [v for v in assigned if v is not None]
-                    if assigned:
-                        self.model.add(sum(assigned) >= min_staff)
+                    if self.soft_coverage:
+                        slack = self.model.new_int_var(
+                            0, min_staff, f"shortage_{day}_{shift['name']}"
+                        )
+                        self.model.add(sum(assigned) + slack >= min_staff)
+                        self.coverage_slacks[(str(day), shift["name"])] = slack
+                    else:
+                        # Nobody eligible: the constraint on the empty sum is
+                        # infeasible rather than silently dropped
+                        self._guard(
+                            self.model.add(cp_model.LinearExpr.sum(assigned) >= min_staff),
+                            ("coverage", str(day), shift["name"]),
+                            f"Minimum staffing of {min_staff} for {shift['name']} on day {day}",
+                            day=str(day),
+                            shift=shift["name"],
+                        )
 
     def add_one_shift_per_day(self):
         """Each employee works at most one shift per day."""
@@ -53,30 +181,54 @@ class ConstraintBuilder:
                     for shift in self.shifts
                 ]
                 shifts_on_day = [v for v in shifts_on_day if v is not None]
-                if shifts_on_day:
+                if not shifts_on_day:
+                    continue
+                if self.assumptions is None:
                     self.model.add_at_most_one(shifts_on_day)
+                else:
+                    # AtMostOne does not support enforcement literals
+                    self._guard(
+                        self.model.add(sum(shifts_on_day) <= 1),
+                        ("one_shift_per_day", emp["initials"]),
+                        f"{emp['initials']} works at most one shift per day",
+                        employee=emp["initials"],
+                    )
 
     def add_rest_time_constraints(self):
-        """11 hours minimum rest between shifts (German labor law)."""
-        for emp in self.employees:
-            for i in range(len(self.days) - 1):
-                current_day = str(self.days[i])
-                next_day = str(self.days[i + 1])
+        """11 hours minimum rest between shifts (German labor law).
 
-                # Check late shifts followed by early shifts
-                for shift in self.shifts:
-                    if self._is_late_shift(shift):
-                        for next_shift in self.shifts:
-                            if self._is_early_shift(next_shift):
-                                current_var = self.shift_vars.get(
-                                    (emp["initials"], current_day, shift["name"]), None
-                                )
-                                next_var = self.shift_vars.get(
-                                    (emp["initials"], next_day, next_shift["name"]), None
-                                )
-                                if current_var is not None and next_var is not None:
-                                    # Can't work late shift then early shift next day
-                                    self.model.add(current_var + next_var <= 1)
+        One clause per employee, pair of consecutive days and forbidden shift
+        pair of the transition matrix.
+        """
+        forbidden_pairs = self.transitions.forbidden_pairs
+        days = [str(day) for day in self.days]
+        for emp in self.employees:
+            initials = emp["initials"]
+            for current_day, next_day in pairwise(days):
+                for shift_name, next_shift_name in forbidden_pairs:
+                    current_var = self.shift_vars.get((initials, current_day, shift_name))
+                    next_var = self.shift_vars.get((initials, next_day, next_shift_name))
+                    if current_var is not None and next_var is not None:
+                        self._guard(
+                            self.model.add_bool_or([current_var.Not(), next_var.Not()]),
+                            ("rest_time", initials),
+                            f"11h rest between shifts for {initials}",
+                            employee=initials,
+                        )
+
+            # Shift on the day before the planning period
+            last_shift = self.boundary_state.get(initials, {}).get("last_shift")
+            for next_shift_name in (
+                self.transitions.forbidden_after.get(last_shift, ()) if days else ()
+            ):
+                next_var = self.shift_vars.get((initials, days[0], next_shift_name))
+                if next_var is not None:
+                    self._guard(
+                        self.model.add_bool_or([next_var.Not()]),
+                        ("rest_time", initials),
+                        f"11h rest between shifts for {initials}",
+                        employee=initials,
+                    )
 
     def add_max_weekly_hours(self):
         """Maximum 48 hours per week (German labor law)."""
@@ -84,7 +236,10 @@ class ConstraintBuilder:
         weeks = self._group_days_by_week()
 
         for emp in self.employees:
-            for week_days in weeks:
+            carried_hours = self.boundary_state.get(emp["initials"], {}).get("week_hours", 0)
+            for week_index, week_days in enumerate(weeks, 1):
+                # Hours already worked in the first week before the planning period
+                limit = max(48 - carried_hours, 0) if week_index == 1 else 48
                 total_hours = []
                 for day in week_days:
                     for shift in self.shifts:
@@ -93,21 +248,34 @@ class ConstraintBuilder:
                             hours = self._get_shift_duration(shift)
                             total_hours.append(var * hours)
                 if total_hours:
-                    self.model.add(sum(total_hours) <= 48)
+                    self._guard(
+                        self.model.add(sum(total_hours) <= limit),
+                        ("max_weekly_hours", emp["initials"], week_index),
+                        f"Maximum 48 hours for {emp['initials']} in week {week_index}",
+                        employee=emp["initials"],
+                        days=[str(d) for d in week_days],
+                    )
 
     def add_qualification_constraints(self):
         """Only qualified staff can work certain shifts."""
+        # Variables of ineligible pairs are usually not created at all (see
+        # RosterSolver._create_variables); the remaining ones are fixed to 0
         for emp in self.employees:
-            emp_quals = set(emp.get("qualifications", []))
-            for day in self.days:
-                for shift in self.shifts:
-                    required_quals = self._parse_qualifications(shift.get("requirements", []))
-
-                    # Check if employee has all required qualifications
-                    if required_quals and not required_quals.issubset(emp_quals):
-                        var = self.shift_vars.get((emp["initials"], str(day), shift["name"]), None)
-                        if var is not None:
-                            self.model.add(var == 0)
+            for shift in self.shifts:
+                if self.eligibility.is_eligible(emp["initials"], shift["name"]):
+                    continue
+                missing = self.eligibility.missing(emp["initials"], shift["name"])
+                for day in self.days:
+                    var = self.shift_vars.get((emp["initials"], str(day), shift["name"]), None)
+                    if var is not None:
+                        self._guard(
+                            self.model.add(var == 0),
+                            ("qualification", emp["initials"], shift["name"]),
+                            f"{emp['initials']} lacks qualifications "
+                            f"{', '.join(missing)} for {shift['name']}",
+                            employee=emp["initials"],
+                            shift=shift["name"],
+                        )
 
     def add_fixed_assignments(self):
         """Lock in pre-assigned/locked shifts."""
@@ -118,20 +286,31 @@ class ConstraintBuilder:
 
             var = self.shift_vars.get((emp_initials, day, shift_name), None)
             if var is not None:
-                self.model.add(var == 1)
+                self._guard(
+                    self.model.add(var == 1),
+                    ("fixed_assignment", emp_initials, day, shift_name),
+                    f"Fixed assignment of {emp_initials} to {shift_name} on day {day}",
+                    employee=emp_initials,
+                    day=day,
+                    shift=shift_name,
+                )
 
     def add_availability_constraints(self):
         """Respect employee availability/time-off."""
-        unavailable_codes = {"uw", "EZ", "BV", "krank", "U", "K", "SU", "MU"}
-
         for emp_initials, days_availability in self.availability.items():
             for day, status in days_availability.items():
-                if status in unavailable_codes:
+                if status in UNAVAILABLE_CODES:
                     # Employee is unavailable on this day
                     for shift in self.shifts:
                         var = self.shift_vars.get((emp_initials, str(day), shift["name"]), None)
                         if var is not None:
-                            self.model.add(var == 0)
+                            self._guard(
+                                self.model.add(var == 0),
+                                ("availability", emp_initials, str(day)),
+                                f"{emp_initials} is unavailable ({status}) on day {day}",
+                                employee=emp_initials,
+                                day=str(day),
+                            )
 
     def add_custom_hard_rules(self):
         """Add hard constraints from custom rules."""
@@ -139,57 +318,71 @@ class ConstraintBuilder:
             if rule.get("type") == "hard":
                 self._apply_rule_constraint(rule)
 
-    def _apply_rule_constraint(self, rule):
-        """Apply a single rule as a constraint."""
-        text = rule.get("text", "")
+    def add_quota_constraints(self):
+        """Limit shifts, demanding shifts and weekend shifts per employee."""
+        weekend_days = set(self.calendar.weekend_or_holiday)
+        selections = {
+            "shifts": lambda day, shift: True,
+            "nights": lambda day, shift: is_demanding_shift(shift),
+            "weekends": lambda day, shift: day in weekend_days,
+        }
 
-        # Pattern: "Employee X does not work on Day Y"
-        if "arbeitet nicht" in text.lower():
-            self._add_no_work_constraint(rule)
+        for emp in self.employees:
+            quota = self.quotas.get(emp["initials"], {})
+            for kind, selected in selections.items():
+                if quota.get(kind) is None:
+                    continue
+                worked = [
+                    var
+                    for day in self.days
+                    for shift in self.shifts
+                    if selected(str(day), shift)
+                    if (var := self.shift_vars.get((emp["initials"], str(day), shift["name"])))
+                    is not None
+                ]
+                if len(worked) > quota[kind]:
+                    self._guard(
+                        self.model.add(sum(worked) <= quota[kind]),
+                        ("quota", emp["initials"], kind),
+                        f"At most {quota[kind]} {kind} for {emp['initials']}",
+                        employee=emp["initials"],
+                    )
+
+    def _apply_rule_constraint(self, rule):
+        """Apply a single rule as a constraint, dispatching on its compiled IR."""
+        ir = compiled_rule(rule, [shift["name"] for shift in self.shifts])
 
-        # Pattern: "Maximum consecutive working days"
-        elif "aufeinanderfolgende" in text.lower() and "arbeitstage" in text.lower():
-            self._add_max_consecutive_days_constraint(rule)
+        if ir["kind"] == RULE_NO_WORK:
+            self._add_no_work_constraint(rule, ir)
+        elif ir["kind"] == RULE_MAX_CONSECUTIVE_DAYS:
+            self._add_max_consecutive_days_constraint(rule, ir)
 
-    def _add_no_work_constraint(self, rule):
+    def _add_no_work_constraint(self, rule, ir):
         """Add constraint that employee doesn't work on certain days."""
         text = rule.get("text", "")
-        applies_to = rule.get("appliesTo", "all")
-
-        # Parse day patterns
-        if "sonntag" in text.lower():
-            target_days = self._get_sundays()
-        elif "samstag" in text.lower():
-            target_days = self._get_saturdays()
-        elif "wochenende" in text.lower():
-            target_days = self._get_weekends()
-        else:
-            return
-
-        # Apply to specific employee or all
-        employees_to_apply = []
-        if applies_to != "all":
-            employees_to_apply = [e for e in self.employees if applies_to in e.get("name", "")]
-        else:
-            employees_to_apply = self.employees
+        target_days = self._select_days(ir["days"])
+        employees_to_apply = resolve_employees(ir, self.employees, self.resolver)
 
         for emp in employees_to_apply:
             for day in target_days:
                 for shift in self.shifts:
                     var = self.shift_vars.get((emp["initials"], str(day), shift["name"]), None)
                     if var is not None:
-                        self.model.add(var == 0)
-
-    def _add_max_consecutive_days_constraint(self, rule):
+                        self._guard(
+                            self.model.add(var == 0),
+                            ("rule", self._rule_key(rule), emp["initials"]),
+                            f"Rule '{text}' for {emp['initials']}",
+                            rule_id=rule.get("id"),
+                            employee=emp["initials"],
+                            days=[str(d) for d in target_days],
+                        )
+
+    def _add_max_consecutive_days_constraint(self, rule, ir):
         """Add constraint for maximum consecutive working days."""
-        # Default to 5 consecutive days max
-        max_consecutive = 5
+        max_consecutive = ir["limit"]
         text = rule.get("text", "")
-        match = re.search(r"(\d+)", text)
-        if match:
-            max_consecutive = int(match.group(1))
 
-        for emp in self.employees:
+        for emp in resolve_employees(ir, self.employees, self.resolver):
             # Sliding window check
             for i in range(len(self.days) - max_consecutive):
                 working_vars = []
@@ -203,122 +396,95 @@ class ConstraintBuilder:
 
                 # Can't work all max_consecutive+1 days
                 if len(working_vars) > max_consecutive:
-                    self.model.add(sum(working_vars) <= max_consecutive)
+                    self._guard(
+                        self.model.add(sum(working_vars) <= max_consecutive),
+                        ("rule", self._rule_key(rule), emp["initials"]),
+                        f"Rule '{text}' for {emp['initials']}",
+                        rule_id=rule.get("id"),
+                        employee=emp["initials"],
+                    )
+
+            # Streak carried over from before the planning period: the first
+            # max_consecutive - streak + 1 days can't all be working days
+            streak = self.boundary_state.get(emp["initials"], {}).get("consecutive_days", 0)
+            if streak > 0:
+                window = max(max_consecutive - streak + 1, 1)
+                if window <= len(self.days):
+                    working_vars = [
+                        var
+                        for day in self.days[:window]
+                        for shift in self.shifts
+                        if (var := self.shift_vars.get((emp["initials"], str(day), shift["name"])))
+                        is not None
+                    ]
+                    if working_vars:
+                        self._guard(
+                            self.model.add(sum(working_vars) <= window - 1),
+                            ("rule", self._rule_key(rule), emp["initials"]),
+                            f"Rule '{text}' for {emp['initials']}",
+                            rule_id=rule.get("id"),
+                            employee=emp["initials"],
+                        )
 
     # Helper methods
+    def _guard(self, constraint, key, description, **details):
+        """Guard a constraint with the assumption literal for key (if tracking).
+
+        Constraints sharing a key share one literal, so an explanation names
+        e.g. a rule for one employee rather than each of its clauses.
+        """
+        if self.assumptions is None:
+            return constraint
+
+        entry = self.assumptions.get(key)
+        if entry is None:
+            literal = self.model.new_bool_var(f"assume_{len(self.assumptions)}")
+            entry = {"literal": literal, "family": key[0], "description": description, **details}
+            self.assumptions[key] = entry
+        constraint.only_enforce_if(entry["literal"])
+        return constraint
+
+    def _rule_key(self, rule):
+        """Stable identifier of a custom rule for assumption keys."""
+        rule_id = rule.get("id")
+        return rule_id if rule_id is not None else rule.get("text", "")
+
     def _parse_min_requirement(self, requirements):
         """Parse minimum staff requirement from shift requirements."""
-        for req in requirements:
-            if "Min." in req or "Mindestens" in req:
-                match = re.search(r"(\d+)", req)
-                if match:
-                    return int(match.group(1))
-        return 1  # Default to 1 person required
+        return parse_min_requirement(requirements)
 
     def _parse_qualifications(self, requirements):
         """Extract qualification requirements."""
-        qualifications = set()
-        qual_keywords = [
-            "Facharzt",
-            "Oberarzt",
-            "Chefarzt",
-            "Assistenzarzt",
-            "ABS-zertifiziert",
-            "Notfallzertifizierung",
-            "Intensivmedizin",
-            "Ultraschall-Zertifikat",
-            "Endoskopie",
-        ]
-        for req in requirements:
-            for qual in qual_keywords:
-                if qual.lower() in req.lower():
-                    qualifications.add(qual)
-        return qualifications
-
-    def _is_late_shift(self, shift):
-        """Check if shift ends late (after 21:00)."""
-        time_str = shift.get("time", "")
-        if "-" in time_str:
-            end_time = time_str.split("-")[1].strip()
-            if ":" in end_time:
-                hour = int(end_time.split(":")[0])
-                # Night shifts or shifts ending after 21:00
-                return hour >= 21 or hour <= 8
-        return False
-
-    def _is_early_shift(self, shift):
-        """Check if shift starts early (before 09:00)."""
-        time_str = shift.get("time", "")
-        if "-" in time_str:
-            start_time = time_str.split("-")[0].strip()
-            if ":" in start_time:
-                hour = int(start_time.split(":")[0])
-                return hour < 9
-        return False
+        return parse_qualifications(requirements)
 
     def _get_shift_duration(self, shift):
         """Get shift duration in hours."""
-        time_str = shift.get("time", "")
-        if "-" in time_str:
-            parts = time_str.split("-")
-            if len(parts) == 2:
-                try:
-                    start = parts[0].strip()
-                    end = parts[1].strip()
-                    start_hour = int(start.split(":")[0])
-                    end_hour = int(end.split(":")[0])
-
-                    # Handle overnight shifts
-                    if end_hour <= start_hour:
-                        duration = (24 - start_hour) + end_hour
-                    else:
-                        duration = end_hour - start_hour
-                    return duration
-                except (ValueError, IndexError):
-                    pass
-        return 8  # Default 8 hours
+        return get_shift_duration(shift)
 
     def _group_days_by_week(self):
         """Group days into calendar weeks."""
-        if not self.days:
-            return []
-
-        weeks = []
-        current_week = []
-
-        for day in self.days:
-            current_week.append(day)
-            # Simple grouping: every 7 days is a week
-            if len(current_week) == 7:
-                weeks.append(current_week)
-                current_week = []
-
-        # Add remaining days
-        if current_week:
-            weeks.append(current_week)
-
-        return weeks
+        return self.calendar.weeks
 
     def _get_sundays(self):
         """Get all Sundays from days list."""
-        # Assuming days are day numbers in a month
-        # This is simplified - in production would use actual date logic
-        sundays = []
-        for day in self.days:
-            # Simple heuristic: every 7th day starting from first Sunday
-            # In real implementation, use actual calendar
-            if int(day) % 7 == 0:  # Simplified
-                sundays.append(day)
-        return sundays
+        return self.calendar.sundays
 
     def _get_saturdays(self):
         """Get all Saturdays from days list."""
-        saturdays = []
-        for day in self.days:
-            if (int(day) - 1) % 7 == 5:  # Simplified
-                saturdays.append(day)
-        return saturdays
+        return self.calendar.saturdays
 
     def _get_weekends(self):
         """Get all weekend days."""
         return self._get_saturdays() + self._get_sundays()
+
+    def _select_days(self, selector):
+        """Days of a no_work rule's day selector (see solver/rule_ir.py)."""
+        if selector == "sunday":
+            return self._get_sundays()
+        if selector == "saturday":
+            return self._get_saturdays()
+        if selector == "weekend":
+            return self._get_weekends()
+        if selector == "holiday":
+            return self.calendar.holiday_days
+        return [day for day in self.calendar.days if self.calendar.weekday.get(day) in selector]
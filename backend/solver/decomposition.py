@@ -0,0 +1,458 @@
+"""Coarse-to-fine weekly decomposition for long planning periods.
+
+For horizons of several weeks the per-person model grows with every
+windowed consecutive-days and fairness term. The decomposition solves it in
+two levels:
+
+    1. A coarse CP-SAT model decides per employee and week how many shifts,
+       demanding (night) shifts and weekend shifts they work. It only keeps
+       weekly necessary conditions (coverage per week, availability, 48h
+       week) and balances the totals over the whole horizon against each
+       employee's available days.
+    2. Every week is solved with RosterSolver in its own process, with the
+       coarse counts as upper bounds ("quotas"). A week whose quotas turn out
+       infeasible at day level is re-solved without them.
+
+Weeks are solved independently, so rest time and working streaks across
+week boundaries are checked afterwards; a week that conflicts with the
+week before is re-solved with the boundary state of that week.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from ortools.sat.python import cp_model
+
+from .calendar_index import calendar_for
+from .constraints import (
+    RULE_MAX_CONSECUTIVE_DAYS,
+    UNAVAILABLE_CODES,
+    get_shift_duration,
+    hard_rule_kind,
+    is_demanding_shift,
+    parse_max_consecutive_days,
+    parse_min_requirement,
+)
+from .horizon import compute_boundary_state
+from .model import RosterSolver
+from .objectives import COVERAGE_SHORTAGE_WEIGHT
+from .precheck import MAX_WEEKLY_HOURS
+from .qualifications import eligibility_matrix
+from .solution import SolutionAnalyzer, coverage_shortages
+from .transitions import transition_matrix
+
+# Share of the time limit for the coarse model and for boundary repairs;
+# the rest goes to the week subproblems
+COARSE_TIME_SHARE = 0.2
+REPAIR_TIME_SHARE = 0.2
+
+# Coarse objective weights, matching the per-person fairness objectives
+WORKLOAD_WEIGHT = 5
+WEEKEND_WEIGHT = 10
+NIGHT_WEIGHT = 3
+
+# Extra shifts per quota in the week subproblems, so that day-level rest and
+# coverage patterns that the weekly counts cannot see still fit
+QUOTA_TOLERANCE = 1
+
+_FOUND = (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+class WeeklyQuotaModel:
+    """Coarse model over (employee, week) shift counts."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.employees = data.get("employees", [])
+        self.shifts = data.get("shifts", [])
+        self.days = [str(d) for d in data.get("days", [])]
+        self.availability = data.get("availability", {})
+        self.soft_coverage = data.get("soft_coverage", False)
+        self.boundary_state = data.get("boundary_state") or {}
+        calendar = calendar_for(data)
+        self.weeks = calendar.weeks
+        # Weekend duty: weekends and public holidays, as in the objectives
+        self.weekend_days = set(calendar.weekend_or_holiday)
+
+        self.model = cp_model.CpModel()
+        # (initials, week index, shift name) -> shifts of that type in the week
+        self.count_vars: dict[tuple[str, int, str], cp_model.IntVar] = {}
+        # (initials, week index) -> weekend shifts in the week
+        self.weekend_vars: dict[tuple[str, int], cp_model.IntVar] = {}
+        # (week index, shift name) -> shortage slack (soft coverage mode)
+        self.coverage_slacks: dict[tuple[int, str], cp_model.IntVar] = {}
+
+        self._create_variables()
+        self._add_constraints()
+        self._build_objective()
+
+    def _available_days(self, emp: dict, week_days: list[str]) -> list[str]:
+        personal = self.availability.get(emp["initials"], {})
+        return [day for day in week_days if personal.get(day) not in UNAVAILABLE_CODES]
+
+    def _create_variables(self):
+        fixed: dict[tuple[str, int, str], int] = {}
+        week_of_day = {day: w for w, week_days in enumerate(self.weeks) for day in week_days}
+        for a in self.data.get("fixed_assignments", []):
+            day = str(a.get("day"))
+            if day in week_of_day:
+                key = (a.get("employee"), week_of_day[day], a.get("shift"))
+                fixed[key] = fixed.get(key, 0) + 1
+
+        eligibility = eligibility_matrix(self.employees, self.shifts)
+        for emp in self.employees:
+            initials = emp["initials"]
+            for w, week_days in enumerate(self.weeks):
+                available = self._available_days(emp, week_days)
+                for shift in self.shifts:
+                    if not eligibility.is_eligible(initials, shift["name"]):
+                        continue
+                    var = self.model.new_int_var(
+                        0, len(available), f"count_{initials}_{w}_{shift['name']}"
+                    )
+                    if fixed.get((initials, w, shift["name"])):
+                        self.model.add(var >= fixed[(initials, w, shift["name"])])
+                    self.count_vars[(initials, w, shift["name"])] = var
+
+                weekend = [day for day in available if day in self.weekend_days]
+                self.weekend_vars[(initials, w)] = self.model.new_int_var(
+                    0, len(weekend), f"weekend_{initials}_{w}"
+                )
+
+    def _add_constraints(self):
+        for w, week_days in enumerate(self.weeks):
+            # Coverage of every shift over the week
+            for shift in self.shifts:
+                required = parse_min_requirement(shift.get("requirements", [])) * len(week_days)
+                assigned = self._counts(w=w, predicate=lambda s, name=shift["name"]: s == name)
+                if self.soft_coverage:
+                    slack = self.model.new_int_var(0, required, f"shortage_{w}_{shift['name']}")
+                    self.coverage_slacks[(w, shift["name"])] = slack
+                    self.model.add(sum(assigned) + slack >= required)
+                else:
+                    self.model.add(sum(assigned) >= required)
+
+            # Coverage of the weekend days of the week
+            weekend_demand = sum(
+                parse_min_requirement(shift.get("requirements", []))
+                for day in week_days
+                if day in self.weekend_days
+                for shift in self.shifts
+            )
+            if weekend_demand and not self.soft_coverage:
+                self.model.add(
+                    sum(self.weekend_vars[(emp["initials"], w)] for emp in self.employees)
+                    >= weekend_demand
+                )
+
+            for emp in self.employees:
+                initials = emp["initials"]
+                available = self._available_days(emp, week_days)
+                weekend = self.weekend_vars[(initials, w)]
+                worked = self._counts(initials, w)
+
+                # One shift per available day, weekend shifts on weekend days
+                self.model.add(sum(worked) <= len(available))
+                self.model.add(weekend <= sum(worked))
+                weekdays = [day for day in available if day not in self.weekend_days]
+                self.model.add(sum(worked) - weekend <= len(weekdays))
+
+                # Weekly hours, including hours worked before the first day
+                carried = (
+                    self.boundary_state.get(initials, {}).get("week_hours", 0) if w == 0 else 0
+                )
+                hours = [
+                    self.count_vars[(initials, w, shift["name"])] * get_shift_duration(shift)
+                    for shift in self.shifts
+                    if (initials, w, shift["name"]) in self.count_vars
+                ]
+                if hours:
+                    self.model.add(sum(hours) <= max(MAX_WEEKLY_HOURS - carried, 0))
+
+    def _build_objective(self):
+        """Balance shifts, weekends and nights against available days; avoid overstaffing."""
+        terms = [slack * COVERAGE_SHORTAGE_WEIGHT for slack in self.coverage_slacks.values()]
+        terms.extend(self.count_vars.values())
+
+        demanding = {shift["name"] for shift in self.shifts if is_demanding_shift(shift)}
+        shift_demand = sum(
+            parse_min_requirement(shift.get("requirements", [])) for shift in self.shifts
+        )
+        night_demand = sum(
+            parse_min_requirement(shift.get("requirements", []))
+            for shift in self.shifts
+            if shift["name"] in demanding
+        )
+        metrics = [
+            (
+                "shifts",
+                WORKLOAD_WEIGHT,
+                len(self.days) * shift_demand,
+                lambda initials: self._counts(initials),
+                lambda emp: len(self._available_days(emp, self.days)),
+            ),
+            (
+                "weekends",
+                WEEKEND_WEIGHT,
+                len(self.weekend_days) * shift_demand,
+                lambda initials: [self.weekend_vars[(initials, w)] for w in range(len(self.weeks))],
+                lambda emp: len(
+                    [d for d in self._available_days(emp, self.days) if d in self.weekend_days]
+                ),
+            ),
+            (
+                "nights",
+                NIGHT_WEIGHT,
+                len(self.days) * night_demand,
+                lambda initials: self._counts(initials, predicate=demanding.__contains__),
+                lambda emp: len(self._available_days(emp, self.days)),
+            ),
+        ]
+
+        for name, weight, demand, counts, capacity in metrics:
+            eligible = [(emp, counts(emp["initials"])) for emp in self.employees]
+            eligible = [(emp, c) for emp, c in eligible if c and capacity(emp)]
+            total_capacity = sum(capacity(emp) for emp, _ in eligible)
+            for emp, worked in eligible:
+                # Share of the demand proportional to the employee's available days
+                target = round(demand * capacity(emp) / total_capacity)
+                deviation = self.model.new_int_var(
+                    0, max(demand, target), f"{name}_dev_{emp['initials']}"
+                )
+                self.model.add(deviation >= sum(worked) - target)
+                self.model.add(deviation >= target - sum(worked))
+                terms.append(deviation * weight)
+
+        if terms:
+            self.model.minimize(sum(terms))
+
+    def _counts(self, initials=None, w=None, predicate=None):
+        return [
+            var
+            for (emp, week, shift), var in self.count_vars.items()
+            if (initials is None or emp == initials)
+            and (w is None or week == w)
+            and (predicate is None or predicate(shift))
+        ]
+
+    def extract_quotas(self, solver: cp_model.CpSolver) -> list[dict]:
+        """Per week: initials -> {"shifts", "nights", "weekends"}."""
+        demanding = {shift["name"] for shift in self.shifts if is_demanding_shift(shift)}
+        quotas = []
+        for w in range(len(self.weeks)):
+            week_quotas = {}
+            for emp in self.employees:
+                initials = emp["initials"]
+                week_quotas[initials] = {
+                    "shifts": sum(solver.value(v) for v in self._counts(initials, w)),
+                    "nights": sum(
+                        solver.value(v)
+                        for v in self._counts(initials, w, predicate=demanding.__contains__)
+                    ),
+                    "weekends": solver.value(self.weekend_vars[(initials, w)]),
+                }
+            quotas.append(week_quotas)
+        return quotas
+
+
+def solve_week(week_data: dict, time_limit_seconds: float, num_workers: int) -> dict:
+    """Solve one week subproblem; re-solve without quotas if they are infeasible.
+
+    Module-level so that it can run in a worker process.
+    """
+    result = RosterSolver(week_data).solve(
+        time_limit_seconds=time_limit_seconds, num_workers=num_workers, explain_time_limit=0
+    )
+    result["quotas_relaxed"] = False
+    if result["solution"] is None and week_data.get("quotas"):
+        result = RosterSolver({**week_data, "quotas": {}}).solve(
+            time_limit_seconds=time_limit_seconds, num_workers=num_workers, explain_time_limit=0
+        )
+        result["quotas_relaxed"] = True
+    return result
+
+
+def find_boundary_conflicts(
+    data: dict, boundary_state: dict, week_days: list[str], assigned: set[tuple[str, str, str]]
+) -> list[str]:
+    """
+    Find employees whose week schedule conflicts with the week before.
+
+    Checks the 11h rest time on the first day and, with a hard maximum
+    consecutive working days rule, the streak across the boundary.
+
+    Returns:
+        Initials of the conflicting employees
+    """
+    transitions = transition_matrix(data.get("shifts", []))
+    worked = {(emp, day): shift for emp, day, shift in assigned}
+    limits = [
+        parse_max_consecutive_days(rule)
+        for rule in data.get("rules", [])
+        if rule.get("type") == "hard"
+        and rule.get("isActive", True)
+        and hard_rule_kind(rule) == RULE_MAX_CONSECUTIVE_DAYS
+    ]
+
+    conflicts = []
+    for initials, state in boundary_state.items():
+        if transitions.is_forbidden(state.get("last_shift"), worked.get((initials, week_days[0]))):
+            conflicts.append(initials)
+            continue
+
+        streak = state.get("consecutive_days", 0)
+        for day in week_days:
+            if (initials, day) not in worked:
+                break
+            streak += 1
+        if limits and streak > min(limits):
+            conflicts.append(initials)
+    return conflicts
+
+
+def solve_weekly_decomposition(
+    data: dict,
+    time_limit_seconds: float = 60,
+    num_workers: int = 4,
+    processes: int | None = None,
+) -> dict:
+    """
+    Solve a long planning period with weekly quotas and parallel week solves.
+
+    Args:
+        data: Solver input data for the whole horizon
+        time_limit_seconds: Approximate total time limit (coarse model, week
+            rounds and boundary repairs)
+        num_workers: CP-SAT workers, shared between the parallel weeks
+        processes: Parallel week processes (default: one per week, at most
+            one per CPU); 1 solves the weeks in this process
+
+    Returns:
+        Result dictionary like RosterSolver.solve() for the whole horizon,
+        with result["quotas"] and statistics["coarse"] and statistics["weeks"]
+    """
+    days = [str(d) for d in data.get("days", [])]
+    week_start_offset = data.get("week_start_offset", 0)
+    initial_state = data.get("boundary_state") or {}
+
+    # 1. Coarse model: weekly quotas
+    coarse = WeeklyQuotaModel(data)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit_seconds * COARSE_TIME_SHARE
+    solver.parameters.num_workers = num_workers
+    status = solver.solve(coarse.model)
+    statistics = {
+        "coarse": {
+            "status": solver.status_name(status),
+            "objective_value": solver.objective_value if status in _FOUND else None,
+            "wall_time": solver.wall_time,
+        },
+        "num_conflicts": solver.num_conflicts,
+        "num_branches": solver.num_branches,
+        "wall_time": solver.wall_time,
+    }
+    if status not in _FOUND:
+        return {
+            "status": solver.status_name(status),
+            "solution": None,
+            "statistics": statistics,
+            "analysis": None,
+        }
+    quotas = coarse.extract_quotas(solver)
+
+    # 2. Week subproblems in parallel
+    weeks = coarse.weeks
+    week_inputs = [
+        {
+            **data,
+            "days": week_days,
+            "week_start_offset": week_start_offset if w == 0 else 0,
+            "boundary_state": initial_state if w == 0 else {},
+            "quotas": {
+                initials: {kind: count + QUOTA_TOLERANCE for kind, count in quota.items()}
+                for initials, quota in quotas[w].items()
+            },
+            "num_alternatives": 1,
+            "fixed_assignments": [
+                a for a in data.get("fixed_assignments", []) if str(a.get("day")) in week_days
+            ],
+        }
+        for w, week_days in enumerate(weeks)
+    ]
+    processes = processes or min(len(weeks), os.cpu_count() or 1)
+    rounds = -(-len(weeks) // processes)
+    week_time_limit = time_limit_seconds * (1 - COARSE_TIME_SHARE - REPAIR_TIME_SHARE) / rounds
+    week_workers = max(num_workers // processes, 1)
+
+    if processes > 1:
+        with ProcessPoolExecutor(processes, mp_context=get_context("spawn")) as pool:
+            results = list(
+                pool.map(
+                    solve_week,
+                    week_inputs,
+                    [week_time_limit] * len(weeks),
+                    [week_workers] * len(weeks),
+                )
+            )
+    else:
+        results = [solve_week(week, week_time_limit, week_workers) for week in week_inputs]
+
+    # 3. Boundary repair, week by week
+    repair_time_limit = time_limit_seconds * REPAIR_TIME_SHARE / max(len(weeks) - 1, 1)
+    assigned: set[tuple[str, str, str]] = set()
+    shortages: dict[tuple[str, str], int] = {}
+    week_stats = []
+    all_optimal = True
+    for w, (week_days, result) in enumerate(zip(weeks, results, strict=True)):
+        repaired = False
+        if w > 0 and result["solution"] is not None:
+            planned = days[: days.index(week_days[0])]
+            state = compute_boundary_state(data, assigned, planned, initial_state)
+            week_assigned = _assignments(result)
+            if find_boundary_conflicts(data, state, week_days, week_assigned):
+                result = solve_week(
+                    {**week_inputs[w], "boundary_state": state}, repair_time_limit, num_workers
+                )
+                repaired = True
+
+        for key in ("num_conflicts", "num_branches", "wall_time"):
+            statistics[key] += result["statistics"].get(key, 0)
+        week_stats.append(
+            {
+                "days": [week_days[0], week_days[-1]],
+                "status": result["status"],
+                "objective_value": result["statistics"].get("objective_value"),
+                "wall_time": result["statistics"].get("wall_time"),
+                "quotas_relaxed": result["quotas_relaxed"],
+                "repaired": repaired,
+            }
+        )
+        if result["solution"] is None:
+            statistics["weeks"] = week_stats
+            return {
+                "status": result["status"],
+                "solution": None,
+                "statistics": statistics,
+                "analysis": None,
+                "quotas": quotas,
+                "failed_week": week_stats[-1]["days"],
+                "infeasibility_explanation": result.get("infeasibility_explanation"),
+            }
+        all_optimal = all_optimal and result["status"] == "OPTIMAL"
+        assigned |= _assignments(result)
+        shortages.update(coverage_shortages(result["analysis"]))
+
+    statistics["weeks"] = week_stats
+    analyzer = SolutionAnalyzer(None, {}, data, shortages, assigned=assigned)
+    return {
+        "status": "OPTIMAL" if all_optimal else "FEASIBLE",
+        "solution": analyzer.extract_solution(),
+        "statistics": statistics,
+        "analysis": analyzer.analyze_solution(),
+        "quotas": quotas,
+    }
+
+
+def _assignments(result: dict) -> set[tuple[str, str, str]]:
+    return {(a["employee"], a["day"], a["shift"]) for a in result["solution"]["assignments"]}
@@ -0,0 +1,188 @@
+"""Rolling-horizon planning for long planning periods.
+
+Long horizons (e.g. a quarter) are solved window by window: each window
+(default two weeks) is solved with RosterSolver, its first step_days (default
+one week) are committed and the next window starts right after them. The
+committed schedule is carried into the next window as boundary state:
+
+    - last_shift: shift worked on the day before the window (rest time)
+    - consecutive_days: working streak ending on the day before the window
+    - week_hours: hours already worked in the week containing the first day
+
+Every window has the same size, so the solve time grows linearly with the
+horizon length.
+"""
+
+from .calendar_index import calendar_for
+from .constraints import get_shift_duration
+from .model import RosterSolver
+from .solution import SolutionAnalyzer, coverage_shortages
+
+DEFAULT_WINDOW_DAYS = 14
+DEFAULT_STEP_DAYS = 7
+
+
+def compute_boundary_state(
+    data: dict,
+    assigned: set[tuple[str, str, str]],
+    planned_days: list[str],
+    initial_state: dict | None = None,
+) -> dict:
+    """
+    Derive the boundary state after planned_days from committed assignments.
+
+    Args:
+        data: Solver input data (employees, shifts)
+        assigned: Committed (initials, day, shift) assignments
+        planned_days: Days planned so far; a prefix of data["days"]
+        initial_state: Boundary state before planned_days[0], if any
+
+    Returns:
+        initials -> {"last_shift", "consecutive_days", "week_hours"}
+    """
+    initial_state = initial_state or {}
+    shift_hours = {shift["name"]: get_shift_duration(shift) for shift in data.get("shifts", [])}
+    worked: dict[tuple[str, str], str] = {(emp, day): shift for emp, day, shift in assigned}
+
+    # Planned days of the week the next day belongs to
+    calendar = calendar_for(data)
+    week_days = []
+    first_week = False
+    if planned_days and not calendar.ends_week(planned_days[-1]):
+        week_index = calendar.week_of[str(planned_days[-1])]
+        week_days = calendar.weeks[week_index]
+        first_week = week_index == 0
+
+    state = {}
+    for emp in data.get("employees", []):
+        initials = emp["initials"]
+        before = initial_state.get(initials, {})
+        last_shift = worked.get((initials, planned_days[-1])) if planned_days else None
+
+        streak = 0
+        for day in reversed(planned_days):
+            if (initials, day) not in worked:
+                break
+            streak += 1
+        else:
+            # Worked every planned day: the streak continues from before
+            streak += before.get("consecutive_days", 0)
+
+        week_hours = sum(
+            shift_hours.get(worked[(initials, day)], 0)
+            for day in week_days
+            if (initials, day) in worked
+        )
+        if first_week:
+            # The week started before the first planned day
+            week_hours += before.get("week_hours", 0)
+
+        state[initials] = {
+            "last_shift": last_shift,
+            "consecutive_days": streak,
+            "week_hours": week_hours,
+        }
+    return state
+
+
+def solve_rolling_horizon(
+    data: dict,
+    time_limit_seconds: float = 30,
+    num_workers: int = 4,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    step_days: int = DEFAULT_STEP_DAYS,
+) -> dict:
+    """
+    Solve a long planning period window by window.
+
+    Args:
+        data: Solver input data for the whole horizon; may contain
+            boundary_state and week_start_offset for the first window
+        time_limit_seconds: Total time limit, shared evenly between windows
+        num_workers: Number of parallel workers per window
+        window_days: Days per window
+        step_days: Days committed per window (window_days - step_days overlap)
+
+    Returns:
+        Result dictionary like RosterSolver.solve() for the whole horizon,
+        with statistics["windows"] and the boundary_state after the last day
+    """
+    days = [str(d) for d in data.get("days", [])]
+    window_days = max(window_days, 1)
+    step_days = min(max(step_days, 1), window_days)
+    week_start_offset = data.get("week_start_offset", 0)
+
+    # Window start -> first day of the next window; the last window runs to the end
+    starts = [0]
+    while starts[-1] + window_days < len(days):
+        starts.append(starts[-1] + step_days)
+    window_time_limit = time_limit_seconds / len(starts)
+
+    assigned: set[tuple[str, str, str]] = set()
+    shortages: dict[tuple[str, str], int] = {}
+    boundary_state = data.get("boundary_state") or {}
+    windows = []
+    statistics = {"num_conflicts": 0, "num_branches": 0, "wall_time": 0.0, "num_solutions": 0}
+    all_optimal = True
+
+    for index, start in enumerate(starts):
+        window = days[start : start + window_days]
+        commit_until = starts[index + 1] if index + 1 < len(starts) else len(days)
+
+        window_data = {
+            **data,
+            "days": window,
+            "boundary_state": boundary_state,
+            "week_start_offset": (week_start_offset + start) % 7,
+            "fixed_assignments": [
+                a for a in data.get("fixed_assignments", []) if str(a.get("day")) in window
+            ],
+        }
+
+        solver = RosterSolver(window_data)
+        result = solver.solve(time_limit_seconds=window_time_limit, num_workers=num_workers)
+        for key in ("num_conflicts", "num_branches", "wall_time", "num_solutions"):
+            statistics[key] += result["statistics"].get(key, 0)
+        windows.append(
+            {
+                "days": [window[0], window[-1]],
+                "status": result["status"],
+                "objective_value": result["statistics"].get("objective_value"),
+                "wall_time": result["statistics"].get("wall_time"),
+            }
+        )
+
+        if result["solution"] is None:
+            statistics["windows"] = windows
+            return {
+                "status": result["status"],
+                "solution": None,
+                "statistics": statistics,
+                "analysis": None,
+                "failed_window": windows[-1]["days"],
+                "infeasibility_explanation": result.get("infeasibility_explanation"),
+            }
+        all_optimal = all_optimal and result["status"] == "OPTIMAL"
+
+        # Commit the days up to the next window start
+        commit_days = set(days[start:commit_until])
+        for a in result["solution"]["assignments"]:
+            if a["day"] in commit_days:
+                assigned.add((a["employee"], a["day"], a["shift"]))
+        shortages.update(coverage_shortages(result["analysis"], commit_days))
+        boundary_state = compute_boundary_state(
+            data,
+            assigned,
+            days[:commit_until],
+            data.get("boundary_state"),
+        )
+
+    statistics["windows"] = windows
+    analyzer = SolutionAnalyzer(None, {}, data, shortages, assigned=assigned)
+    return {
+        "status": "OPTIMAL" if all_optimal else "FEASIBLE",
+        "solution": analyzer.extract_solution(),
+        "statistics": statistics,
+        "analysis": analyzer.analyze_solution(),
+        "boundary_state": boundary_state,
+    }
@@ -4,9 +4,48 @@ from typing import Any
 
 from ortools.sat.python import cp_model
 
+from services.metrics import MODEL_CONSTRAINTS, MODEL_VARIABLES, SOLUTIONS_PER_SECOND
+from services.tracing import tracer
+
+from .aggregate import (
+    MODE_AGGREGATE,
+    MODE_PER_PERSON,
+    AggregateRosterModel,
+    aggregation_blocker,
+    should_aggregate,
+)
+from .calendar_index import calendar_for
+from .capture import get_capture_settings, should_capture, write_capture
 from .constraints import ConstraintBuilder
-from .objectives import ObjectiveBuilder
+from .objectives import STAGES, ObjectiveBuilder
+from .qualifications import eligibility_matrix
 from .solution import SolutionAnalyzer
+from .symmetry import ORDER_COUNT, add_symmetry_breaking
+
+# Dedicated time budget for explaining an infeasible model
+EXPLANATION_TIME_LIMIT = 10
+
+# Objective strategies
+STRATEGY_WEIGHTED = "weighted"  # Single weighted sum of all soft terms
+STRATEGY_LEXICOGRAPHIC = "lexicographic"  # One stage after the other (see STAGES)
+
+# Default share of the time limit per lexicographic stage
+DEFAULT_STAGE_TIME_SPLIT = {"priority": 0.5, "fairness": 0.3, "preferences": 0.2}
+
+# Alternatives may be this much worse than the best plan (relative objective gap)
+ALTERNATIVE_OBJECTIVE_GAP = 0.1
+DEFAULT_MIN_HAMMING_DISTANCE = 4
+
+
+class SolutionCounter(cp_model.CpSolverSolutionCallback):
+    """Counts improving solutions reported during search."""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def on_solution_callback(self):
+        self.count += 1
 
 
 class RosterSolver:
@@ -18,7 +57,10 @@ class RosterSolver:
     - Soft constraints (fairness, preferences, workload balance)
     """
 
-    def __init__(self, data: dict):
+    # Large pools of equivalent staff may be solved with the aggregated model
+    supports_aggregation = True
+
+    def __init__(self, data: dict, track_assumptions: bool = False):
         """
         Initialize the solver with planning data.
 
@@ -30,6 +72,20 @@ class RosterSolver:
                 - rules: List of constraint rules
                 - availability: Dict of employee availability
                 - fixed_assignments: List of locked assignments
+                - soft_coverage: Penalise understaffing instead of failing (optional)
+                - objective_strategy: "weighted" (default) or "lexicographic"
+                - stage_time_split: Share of the time limit per lexicographic
+                  stage, e.g. {"priority": 0.5, "fairness": 0.3, "preferences": 0.2}
+                - num_alternatives: Number of diverse plans to return (default 1)
+                - min_hamming_distance: Minimum number of changed assignment
+                  variables between any two plans
+                - symmetry_breaking: Order interchangeable employees by shift
+                  count (True/"count") or "lexicographic" (default off)
+                - model_mode: "auto" (default), "aggregate" or "per_person"
+                  (see solver/aggregate.py); a forced "aggregate" that falls
+                  back to per-person variables adds statistics["warnings"]
+            track_assumptions: Guard every hard constraint with an assumption
+                literal (used to explain infeasibility; no objective is built)
         """
         self.data = data
         self.employees = data.get("employees", [])
@@ -38,21 +94,98 @@ class RosterSolver:
         self.rules = data.get("rules", [])
         self.availability = data.get("availability", {})
         self.fixed_assignments = data.get("fixed_assignments", [])
+        self.objective_strategy = data.get("objective_strategy") or STRATEGY_WEIGHTED
+        self.stage_time_split = data.get("stage_time_split") or DEFAULT_STAGE_TIME_SPLIT
+        self.num_alternatives = max(int(data.get("num_alternatives") or 1), 1)
+        self.min_hamming_distance = int(
+            data.get("min_hamming_distance") or DEFAULT_MIN_HAMMING_DISTANCE
+        )
 
         # Create the CP-SAT model
         self.model = cp_model.CpModel()
         self.shift_vars: dict[tuple[str, str, str], Any] = {}
+        # Soft coverage mode: (day, shift) -> shortage slack variable
+        self.coverage_slacks: dict[tuple[str, str], Any] = {}
+        # Assumption key -> {"literal", "family", "description", ...} when tracking
+        self.assumptions: dict[tuple, dict] | None = {} if track_assumptions else None
+        # Stage name -> objective expression (see ObjectiveBuilder.stage_objectives)
+        self.stage_objectives: dict[str, Any] = {}
+        # Expression minimised by the last solve (used to bound alternatives)
+        self.objective: Any = None
+        # Classes of interchangeable employees (initials) ordered by symmetry breaking
+        self.equivalence_classes: list[list[str]] = []
+        # Count-based model over staff classes, if selected instead of per-person variables
+        self.aggregate_model: AggregateRosterModel | None = None
+        # Weekdays, weeks and holidays of the planning days, shared by all builders
+        self.calendar = calendar_for(data)
+
+        # Phase timings in milliseconds (build, solve, analyze)
+        self.timings: dict[str, float] = {}
+        # Requested options that could not be honoured (statistics["warnings"])
+        self.warnings: list[str] = []
 
         # Initialize model components
+        with tracer.start_as_current_span(
+            "solver.build",
+            attributes={
+                "solver.employees": len(self.employees),
+                "solver.shifts": len(self.shifts),
+                "solver.days": len(self.days),
+            },
+        ) as span:
+            if self.supports_aggregation and not track_assumptions and should_aggregate(data):
+                self.aggregate_model = AggregateRosterModel(data)
+                span.set_attribute("solver.model", MODE_AGGREGATE)
+                span.set_attribute("solver.variables", len(self.aggregate_model.count_vars))
+            else:
+                if data.get("model_mode") == MODE_AGGREGATE and not track_assumptions:
+                    reason = (
+                        aggregation_blocker(data)
+                        if self.supports_aggregation
+                        else "incremental re-planning"
+                    )
+                    self._warn_per_person(reason)
+                self._build_per_person_model()
+                span.set_attribute("solver.model", MODE_PER_PERSON)
+                span.set_attribute("solver.variables", len(self.shift_vars))
+                span.set_attribute("solver.equivalence_classes", len(self.equivalence_classes))
+        self.timings["build"] = span.duration_ms
+
+    def _warn_per_person(self, reason):
+        self.warnings.append(
+            f'model_mode "aggregate" not applicable ({reason}); solved with the per-person model'
+        )
+
+    def _build_per_person_model(self):
+        """Build the model with one boolean per employee, day and shift."""
         self._create_variables()
         self._add_constraints()
-        self._build_objective()
+        if self.assumptions is None:
+            if self.data.get("symmetry_breaking"):
+                self._break_symmetries()
+            self._build_objective()
 
     def _create_variables(self):
-        """Create boolean decision variables for shift assignments."""
+        """Create boolean decision variables for shift assignments.
+
+        Employees get no variables for shifts they lack qualifications for,
+        except for fixed assignments and when tracking assumptions, where the
+        guarded qualification constraint explains the conflict.
+        """
+        eligibility = eligibility_matrix(self.employees, self.shifts)
+        fixed = {
+            (a.get("employee"), a.get("shift")) for a in self.data.get("fixed_assignments", [])
+        }
         for emp in self.employees:
+            shifts = [
+                shift
+                for shift in self.shifts
+                if self.assumptions is not None
+                or eligibility.is_eligible(emp["initials"], shift["name"])
+                or (emp["initials"], shift["name"]) in fixed
+            ]
             for day in self.days:
-                for shift in self.shifts:
+                for shift in shifts:
                     var_name = f"shift_{emp['initials']}_{day}_{shift['name']}"
                     self.shift_vars[(emp["initials"], str(day), shift["name"])] = (
                         self.model.new_bool_var(var_name)
@@ -60,21 +193,46 @@ class RosterSolver:
 
     def _add_constraints(self):
         """Add all hard constraints to the model."""
-        constraint_builder = ConstraintBuilder(self.model, self.shift_vars, self.data)
+        constraint_builder = ConstraintBuilder(
+            self.model, self.shift_vars, self.data, self.coverage_slacks, self.assumptions
+        )
         constraint_builder.add_all_hard_constraints()
 
+    def _break_symmetries(self, exclude: set[str] | None = None):
+        """Order the schedules of interchangeable employees."""
+        order = self.data.get("symmetry_breaking")
+        self.equivalence_classes = add_symmetry_breaking(
+            self.model,
+            self.shift_vars,
+            self.data,
+            exclude=exclude,
+            order=ORDER_COUNT if order is True else order,
+        )
+
     def _build_objective(self):
         """Build the optimization objective with soft constraints."""
-        objective_builder = ObjectiveBuilder(self.model, self.shift_vars, self.data)
+        objective_builder = ObjectiveBuilder(
+            self.model, self.shift_vars, self.data, self.coverage_slacks
+        )
         objective_builder.build_all_objectives()
-
-    def solve(self, time_limit_seconds: int = 30, num_workers: int = 4):
+        self.stage_objectives = objective_builder.stage_objectives
+        self.objective = objective_builder.objective
+
+    def solve(
+        self,
+        time_limit_seconds: int = 30,
+        num_workers: int = 4,
+        explain_time_limit: float = EXPLANATION_TIME_LIMIT,
+    ):
         """
         Run the solver to find an optimal schedule.
 
         Args:
-            time_limit_seconds: Maximum time to spend solving
+            time_limit_seconds: Maximum time to spend solving (shared evenly
+                between the plans if num_alternatives > 1)
             num_workers: Number of parallel workers
+            explain_time_limit: Extra time budget for explaining an INFEASIBLE
+                result (0 disables the explanation)
 
         Returns:
             Dictionary containing:
@@ -82,33 +240,374 @@ class RosterSolver:
                 - solution: The generated schedule (if found)
                 - statistics: Solver statistics
                 - analysis: Solution quality analysis
+                - infeasibility_explanation: Conflicting constraints (if INFEASIBLE)
+                - alternatives: Further diverse plans with solution, analysis,
+                  objective value and distance to the best plan (if requested)
         """
-        solver = cp_model.CpSolver()
+        # Each requested plan gets an equal share of the time limit
+        plan_time_limit = time_limit_seconds / self.num_alternatives
+
+        if self.aggregate_model is not None:
+            result = self._solve_aggregated(time_limit_seconds, num_workers, explain_time_limit)
+            if result is not None:
+                return result
+
+            # Disaggregation got stuck: fall back to the per-person model
+            remaining = time_limit_seconds - self.timings["solve"] / 1000
+            self.aggregate_model = None
+            if self.data.get("model_mode") == MODE_AGGREGATE:
+                self._warn_per_person("disaggregation failed")
+            with tracer.start_as_current_span("solver.build") as span:
+                self._build_per_person_model()
+                span.set_attribute("solver.model", MODE_PER_PERSON)
+            self.timings["build"] += span.duration_ms
+            plan_time_limit = max(remaining, 1.0) / self.num_alternatives
+
+        # Record model size
+        proto = self.model.Proto()
+        MODEL_VARIABLES.observe(len(proto.variables))
+        MODEL_CONSTRAINTS.observe(len(proto.constraints))
+
+        # Solve the model
+        lexicographic = self.objective_strategy == STRATEGY_LEXICOGRAPHIC and self.stage_objectives
+        with tracer.start_as_current_span(
+            "solver.solve",
+            attributes={
+                "solver.time_limit": time_limit_seconds,
+                "solver.num_workers": num_workers,
+                "solver.strategy": STRATEGY_LEXICOGRAPHIC if lexicographic else STRATEGY_WEIGHTED,
+            },
+        ) as span:
+            if lexicographic:
+                solver, status, statistics = self._solve_lexicographic(plan_time_limit, num_workers)
+            else:
+                solver = self._create_solver(plan_time_limit, num_workers)
+                counter = SolutionCounter()
+                status = solver.solve(self.model, counter)
+                statistics = self._get_statistics(solver)
+                statistics["num_solutions"] = counter.count
+            statistics["model"] = MODE_PER_PERSON
+            if self.warnings:
+                statistics["warnings"] = list(self.warnings)
+            status_name = self._get_status_name(status)
+            span.set_attribute("solver.status", status_name)
+            span.set_attribute("solver.solutions", statistics["num_solutions"])
+        self.timings["solve"] = span.duration_ms
+
+        if statistics["wall_time"] > 0:
+            SOLUTIONS_PER_SECOND.observe(statistics["num_solutions"] / statistics["wall_time"])
+
+        result = {
+            "status": status_name,
+            "solution": None,
+            "statistics": statistics,
+            "analysis": None,
+        }
+
+        # Extract solution if found
+        if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+            with tracer.start_as_current_span("solver.analyze") as span:
+                analyzer = SolutionAnalyzer(
+                    solver, self.shift_vars, self.data, self.coverage_slacks
+                )
+                result["solution"] = analyzer.extract_solution()
+                result["analysis"] = analyzer.analyze_solution()
+            self.timings["analyze"] = span.duration_ms
+
+        if status == cp_model.INFEASIBLE and explain_time_limit > 0 and self.assumptions is None:
+            with tracer.start_as_current_span("solver.explain") as span:
+                result["infeasibility_explanation"] = self.explain_infeasibility(explain_time_limit)
+            self.timings["explain"] = span.duration_ms
+
+        capture_dir, min_seconds = get_capture_settings()
+        if capture_dir and should_capture(status_name, solver.wall_time, min_seconds):
+            self._capture(capture_dir, self.model, solver, result, time_limit_seconds, num_workers)
+
+        # Alternatives add constraints, so search them after the model was captured
+        if result["solution"] is not None and self.num_alternatives > 1:
+            with tracer.start_as_current_span(
+                "solver.alternatives", attributes={"solver.alternatives": self.num_alternatives}
+            ) as span:
+                result["alternatives"] = self._find_alternatives(
+                    solver, plan_time_limit, num_workers
+                )
+                span.set_attribute("solver.alternatives_found", len(result["alternatives"]))
+            self.timings["alternatives"] = span.duration_ms
+
+        return result
+
+    def _find_alternatives(
+        self, best_solver: cp_model.CpSolver, time_limit_seconds: float, num_workers: int
+    ) -> list[dict]:
+        """
+        Search further near-optimal plans on the already built model.
 
-        # Configure solver parameters
+        Every plan found so far is excluded by a diversity constraint (at
+        least min_hamming_distance assignment variables must differ) and the
+        objective may be at most ALTERNATIVE_OBJECTIVE_GAP worse than the best
+        plan. Stops early when no further plan is found in time.
+        """
+        keys = list(self.shift_vars)
+        best_values = {key: best_solver.boolean_value(self.shift_vars[key]) for key in keys}
+
+        if self.objective is not None:
+            best = round(best_solver.objective_value)
+            self.model.add(
+                self.objective <= best + max(int(abs(best) * ALTERNATIVE_OBJECTIVE_GAP), 1)
+            )
+
+        alternatives = []
+        previous = best_values
+        for _ in range(self.num_alternatives - 1):
+            self._add_diversity_constraint(previous)
+            self.model.clear_hints()
+            for key in keys:
+                self.model.add_hint(self.shift_vars[key], previous[key])
+
+            solver = self._create_solver(time_limit_seconds, num_workers)
+            status = solver.solve(self.model)
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                break
+
+            values = {key: solver.boolean_value(self.shift_vars[key]) for key in keys}
+            analyzer = SolutionAnalyzer(solver, self.shift_vars, self.data, self.coverage_slacks)
+            alternatives.append(
+                {
+                    "status": self._get_status_name(status),
+                    "solution": analyzer.extract_solution(),
+                    "analysis": analyzer.analyze_solution(),
+                    "objective_value": solver.objective_value if self.objective is not None else 0,
+                    "hamming_distance": sum(values[key] != best_values[key] for key in keys),
+                }
+            )
+            previous = values
+
+        return alternatives
+
+    def _add_diversity_constraint(self, values: dict[tuple[str, str, str], bool]):
+        """Require at least min_hamming_distance assignments to differ from values."""
+        changed = [
+            1 - self.shift_vars[key] if value else self.shift_vars[key]
+            for key, value in values.items()
+        ]
+        self.model.add(sum(changed) >= min(self.min_hamming_distance, len(changed)))
+
+    def _create_solver(self, time_limit_seconds: float, num_workers: int) -> cp_model.CpSolver:
+        """Create a CP-SAT solver with the standard parameters."""
+        solver = cp_model.CpSolver()
         solver.parameters.max_time_in_seconds = time_limit_seconds
         solver.parameters.num_workers = num_workers
         solver.parameters.linearization_level = 0
+        return solver
 
-        # Solve the model
-        status = solver.solve(self.model)
-        status_name = self._get_status_name(status)
+    def _solve_lexicographic(self, time_limit_seconds: float, num_workers: int):
+        """
+        Optimise the objective stages one after the other.
+
+        Each stage gets its share of the time limit (plus time left over by
+        earlier stages), is warm-started from the previous stage's solution
+        and keeps the previous stage objectives bounded by their best values.
+        If a later stage finds no solution in time, the previous one is kept.
 
+        Returns:
+            Tuple of (solver holding the final solution, status, statistics)
+        """
+        stages = [stage for stage in STAGES if stage in self.stage_objectives]
+        shares = {stage: max(float(self.stage_time_split.get(stage, 0)), 0.0) for stage in stages}
+
+        best_solver = None
+        status = cp_model.UNKNOWN
+        all_optimal = True
+        remaining = float(time_limit_seconds)
+        stage_stats = []
+        totals = {"num_conflicts": 0, "num_branches": 0, "wall_time": 0.0, "num_solutions": 0}
+
+        for i, stage in enumerate(stages):
+            objective = self.stage_objectives[stage]
+            # Split what is left among this and the following stages
+            pending = sum(shares[s] for s in stages[i:])
+            if pending > 0:
+                budget = remaining * shares[stage] / pending
+            else:
+                budget = remaining / (len(stages) - i)
+
+            self.model.minimize(objective)
+            solver = self._create_solver(max(budget, 0.1), num_workers)
+            counter = SolutionCounter()
+            with tracer.start_as_current_span(
+                "solver.stage", attributes={"solver.stage": stage, "solver.time_limit": budget}
+            ) as span:
+                stage_status = solver.solve(self.model, counter)
+                span.set_attribute("solver.status", self._get_status_name(stage_status))
+
+            remaining = max(remaining - solver.wall_time, 0.0)
+            totals["num_conflicts"] += solver.num_conflicts
+            totals["num_branches"] += solver.num_branches
+            totals["wall_time"] += solver.wall_time
+            totals["num_solutions"] += counter.count
+
+            found = stage_status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            stage_stats.append(
+                {
+                    "stage": stage,
+                    "status": self._get_status_name(stage_status),
+                    "objective_value": solver.objective_value if found else None,
+                    "time_limit": round(budget, 3),
+                    "wall_time": solver.wall_time,
+                }
+            )
+            if not found:
+                if best_solver is None:
+                    status = stage_status
+                break
+
+            best_solver = solver
+            self.objective = objective
+            all_optimal = all_optimal and stage_status == cp_model.OPTIMAL
+            status = cp_model.OPTIMAL if all_optimal else cp_model.FEASIBLE
+            if i == len(stages) - 1:
+                break
+
+            # Keep this stage's result while the next stages optimise
+            self.model.add(objective <= round(solver.objective_value))
+            self.model.clear_hints()
+            for var in self.shift_vars.values():
+                self.model.add_hint(var, solver.boolean_value(var))
+            for slack in self.coverage_slacks.values():
+                self.model.add_hint(slack, solver.value(slack))
+
+        final_solver = best_solver or solver
+        statistics = self._get_statistics(final_solver)
+        statistics.update(totals)
+        statistics["stages"] = stage_stats
+        return final_solver, status, statistics
+
+    def _solve_aggregated(self, time_limit_seconds, num_workers, explain_time_limit):
+        """
+        Solve the aggregated model and disaggregate it to individual shifts.
+
+        Returns:
+            Result dictionary like solve(), or None if the disaggregation got
+            stuck and the per-person model has to be solved instead
+        """
+        aggregate = self.aggregate_model
+        proto = aggregate.model.Proto()
+        MODEL_VARIABLES.observe(len(proto.variables))
+        MODEL_CONSTRAINTS.observe(len(proto.constraints))
+
+        solver = self._create_solver(time_limit_seconds, num_workers)
+        # The integer count model is closed quickly by the LP relaxation
+        solver.parameters.linearization_level = 1
+        counter = SolutionCounter()
+        with tracer.start_as_current_span(
+            "solver.solve",
+            attributes={
+                "solver.time_limit": time_limit_seconds,
+                "solver.num_workers": num_workers,
+                "solver.model": MODE_AGGREGATE,
+            },
+        ) as span:
+            status = solver.solve(aggregate.model, counter)
+            status_name = self._get_status_name(status)
+            span.set_attribute("solver.status", status_name)
+            span.set_attribute("solver.solutions", counter.count)
+        self.timings["solve"] = span.duration_ms
+
+        if solver.wall_time > 0:
+            SOLUTIONS_PER_SECOND.observe(counter.count / solver.wall_time)
+
+        statistics = self._get_statistics(solver)
+        statistics["num_solutions"] = counter.count
+        statistics["model"] = MODE_AGGREGATE
+        statistics["staff_classes"] = len(aggregate.classes)
         result = {
             "status": status_name,
             "solution": None,
-            "statistics": self._get_statistics(solver),
+            "statistics": statistics,
             "analysis": None,
         }
 
-        # Extract solution if found
         if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            analyzer = SolutionAnalyzer(solver, self.shift_vars, self.data)
-            result["solution"] = analyzer.extract_solution()
-            result["analysis"] = analyzer.analyze_solution()
+            with tracer.start_as_current_span("solver.disaggregate") as span:
+                assigned = aggregate.disaggregate(solver)
+                span.set_attribute("solver.disaggregated", assigned is not None)
+            self.timings["disaggregate"] = span.duration_ms
+            if assigned is None:
+                return None
+
+            with tracer.start_as_current_span("solver.analyze") as span:
+                analyzer = SolutionAnalyzer(
+                    solver, {}, self.data, aggregate.coverage_slacks, assigned=assigned
+                )
+                result["solution"] = analyzer.extract_solution()
+                result["analysis"] = analyzer.analyze_solution()
+            self.timings["analyze"] = span.duration_ms
+
+        # The aggregated model is a relaxation: INFEASIBLE holds for the request
+        if status == cp_model.INFEASIBLE and explain_time_limit > 0:
+            with tracer.start_as_current_span("solver.explain") as span:
+                result["infeasibility_explanation"] = self.explain_infeasibility(explain_time_limit)
+            self.timings["explain"] = span.duration_ms
+
+        capture_dir, min_seconds = get_capture_settings()
+        if capture_dir and should_capture(status_name, solver.wall_time, min_seconds):
+            self._capture(
+                capture_dir, aggregate.model, solver, result, time_limit_seconds, num_workers
+            )
 
         return result
 
+    def _capture(self, capture_dir, model, solver, result, time_limit_seconds, num_workers):
+        """Write a replay archive of this solve (never fails the solve itself)."""
+        parameters = {
+            "time_limit_seconds": time_limit_seconds,
+            "num_workers": num_workers,
+            "sat_parameters": str(solver.parameters),
+        }
+        try:
+            path = write_capture(
+                capture_dir, self.data, model, parameters, {**result, "timings": self.timings}
+            )
+            result["capture"] = str(path)
+        except OSError:
+            pass
+
+    def explain_infeasibility(self, time_limit_seconds: float = EXPLANATION_TIME_LIMIT):
+        """
+        Find a set of hard constraints that together make the model infeasible.
+
+        Rebuilds the model with every hard constraint family and custom hard
+        rule guarded by an assumption literal and asks CP-SAT for sufficient
+        assumptions for infeasibility.
+
+        Returns:
+            List of conflicting constraints, each with family, description and
+            the employee/day/shift/rule it concerns. Empty if no explanation
+            was found within the time budget.
+        """
+        explainer = RosterSolver(self.data, track_assumptions=True)
+        assumptions = explainer.assumptions or {}
+        if not assumptions:
+            return []
+
+        by_index = {entry["literal"].Index(): entry for entry in assumptions.values()}
+        explainer.model.add_assumptions([entry["literal"] for entry in assumptions.values()])
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit_seconds
+        # Cores are reported reliably by the single-threaded search
+        solver.parameters.num_workers = 1
+
+        if solver.solve(explainer.model) != cp_model.INFEASIBLE:
+            return []
+
+        explanation = []
+        for index in solver.sufficient_assumptions_for_infeasibility():
+            entry = by_index.get(index)
+            if entry is not None:
+                explanation.append({k: v for k, v in entry.items() if k != "literal"})
+        return explanation
+
     def _get_status_name(self, status):
         """Convert status code to string."""
         status_map = {
@@ -137,6 +636,9 @@ class IncrementalRosterSolver(RosterSolver):
     Use this for partial re-planning scenarios.
     """
 
+    # Existing assignments make employees distinguishable
+    supports_aggregation = False
+
     def __init__(self, data: dict, existing_schedule: dict):
         """
         Initialize incremental solver.
@@ -153,6 +655,15 @@ class IncrementalRosterSolver(RosterSolver):
         super()._add_constraints()
         self._lock_existing_assignments()
 
+    def _break_symmetries(self, exclude: set[str] | None = None):
+        """Order interchangeable employees, except those with existing assignments."""
+        planned = {
+            emp_initials
+            for emp_initials, days_data in self.existing_schedule.items()
+            if any(assignment.get("shift") for assignment in days_data.values())
+        }
+        super()._break_symmetries(planned | set(exclude or ()))
+
     def _lock_existing_assignments(self):
         """Lock in all assignments from existing schedule."""
         for emp_initials, days_data in self.existing_schedule.items():
@@ -206,4 +717,8 @@ def validate_input_data(data: dict) -> tuple[bool, list[str]]:
         if not all([emp, day, shift]):
             errors.append(f"Invalid fixed assignment: {assignment}")
 
+    # Day labels must resolve to dates when a month is given
+    if data.get("month") and data.get("days") and not calendar_for(data).has_dates:
+        errors.append(f"Days do not match month {data['month']}")
+
     return len(errors) == 0, errors
@@ -4,35 +4,96 @@ from typing import Any
 
 from ortools.sat.python import cp_model
 
+from .calendar_index import calendar_for
+from .constraints import is_demanding_shift
+from .resolver import resolver_for
+from .rule_ir import (
+    RULE_AVOID_SHIFTS,
+    RULE_PREFER_SHIFTS,
+    compiled_rule,
+    resolve_employees,
+)
+
+# Penalty per missing person in soft coverage mode; dominates all other terms
+COVERAGE_SHORTAGE_WEIGHT = 10_000
+
+# Objective stages in lexicographic priority order
+STAGE_PRIORITY = "priority"  # Coverage slack and labour-law soft limits
+STAGE_FAIRNESS = "fairness"  # Weekend, workload and shift type distribution
+STAGE_PREFERENCES = "preferences"  # Employee preferences and soft rules
+STAGES = (STAGE_PRIORITY, STAGE_FAIRNESS, STAGE_PREFERENCES)
+
 
 class ObjectiveBuilder:
     """Builds soft constraints and objective function for optimization."""
 
-    def __init__(self, model: cp_model.CpModel, shift_vars: dict, data: dict):
+    def __init__(
+        self,
+        model: cp_model.CpModel,
+        shift_vars: dict,
+        data: dict,
+        coverage_slacks: dict | None = None,
+    ):
         self.model = model
         self.shift_vars = shift_vars
         self.data = data
+        self.coverage_slacks = coverage_slacks or {}
         self.employees = data.get("employees", [])
         self.shifts = data.get("shifts", [])
+        self.resolver = resolver_for(self.employees, self.shifts)
         self.days = data.get("days", [])
         self.rules = data.get("rules", [])
+        # Context from before days[0] (see ConstraintBuilder.boundary_state)
+        self.boundary_state = data.get("boundary_state") or {}
+        self.calendar = calendar_for(data)
 
         self.penalty_vars: list[Any] = []
         self.reward_vars: list[Any] = []
+        # Stage name -> objective expression of that stage's terms only
+        self.stage_objectives: dict[str, Any] = {}
+        # Weighted objective expression (None if there are no soft terms)
+        self.objective: Any = None
 
     def build_all_objectives(self):
-        """Build complete objective function with all soft constraints."""
-        self.add_weekend_fairness()
-        self.add_workload_balance()
-        self.add_equal_utilization()
-        self.add_shift_distribution()
-        self.add_preference_satisfaction()
-        self.add_consecutive_days_penalty()
-        self.apply_soft_rules()
+        """Build complete objective function with all soft constraints.
+
+        Terms are also grouped per stage in stage_objectives so the solver
+        can optimise them lexicographically instead of as one weighted sum.
+        """
+        stage_builders = (
+            (
+                STAGE_PRIORITY,
+                (self.add_coverage_shortage_penalty, self.add_consecutive_days_penalty),
+            ),
+            (
+                STAGE_FAIRNESS,
+                (
+                    self.add_weekend_fairness,
+                    self.add_workload_balance,
+                    self.add_equal_utilization,
+                    self.add_shift_distribution,
+                ),
+            ),
+            (STAGE_PREFERENCES, (self.add_preference_satisfaction,)),
+        )
+        for stage, builders in stage_builders:
+            num_penalties, num_rewards = len(self.penalty_vars), len(self.reward_vars)
+            for build in builders:
+                build()
+            penalties = self.penalty_vars[num_penalties:]
+            rewards = self.reward_vars[num_rewards:]
+            if penalties or rewards:
+                self.stage_objectives[stage] = sum(penalties) - sum(rewards)
 
         # Combine into single objective: minimize penalties - maximize rewards
         if self.penalty_vars or self.reward_vars:
-            self.model.minimize(sum(self.penalty_vars) - sum(self.reward_vars))
+            self.objective = sum(self.penalty_vars) - sum(self.reward_vars)
+            self.model.minimize(self.objective)
+
+    def add_coverage_shortage_penalty(self, weight=COVERAGE_SHORTAGE_WEIGHT):
+        """Penalise understaffing slack (soft coverage mode only)."""
+        for slack in self.coverage_slacks.values():
+            self.penalty_vars.append(slack * weight)
 
     def add_weekend_fairness(self, weight=10):
         """Distribute weekend shifts fairly among staff."""
@@ -205,12 +266,14 @@ class ObjectiveBuilder:
 
     def add_preference_satisfaction(self, weight=5):
         """Maximize satisfaction of employee preferences."""
-        # Parse preferences from rules
         for rule in self.rules:
-            if rule.get("type") == "soft" and "bevorzugt" in rule.get("text", "").lower():
-                self._add_preference_reward(rule, weight)
-            elif rule.get("type") == "soft" and "vermeiden" in rule.get("text", "").lower():
-                self._add_avoidance_penalty(rule, weight)
+            if rule.get("type") != "soft":
+                continue
+            ir = self._compiled(rule)
+            if ir["kind"] == RULE_PREFER_SHIFTS:
+                self._add_preference_reward(ir, weight)
+            elif ir["kind"] == RULE_AVOID_SHIFTS:
+                self._add_avoidance_penalty(ir, weight)
 
     def add_consecutive_days_penalty(self, weight=8):
         """Penalize too many consecutive working days."""
@@ -241,60 +304,52 @@ class ObjectiveBuilder:
                         self.model.add(sum(consecutive_work) < 6).only_enforce_if(all_working.Not())
                         self.penalty_vars.append(all_working * weight * 10)
 
-    def apply_soft_rules(self):
-        """Apply soft constraints from custom rules."""
-        for rule in self.rules:
-            if rule.get("type") == "soft":
-                self._apply_soft_rule(rule)
-
-    def _apply_soft_rule(self, rule):
-        """Apply a single soft rule as an optimization objective."""
-        text = rule.get("text", "")
-        category = rule.get("category", "")
-
-        if "fair" in text.lower() or category == "Fairness":
-            # Already handled by fairness objectives
-            pass
-        elif "präferenz" in category.lower() or "bevorzugt" in text.lower():
-            # Handled in preference satisfaction
-            pass
-
-    def _add_preference_reward(self, rule, base_weight):
-        """Add reward for satisfying shift preferences."""
-        # Parse the rule to extract employee and preferred shifts
-        # This is simplified - would need NLP for production
-        applies_to = rule.get("appliesTo", "all")
-        if applies_to == "all":
-            return
-
-        # Find employee
-        emp = next((e for e in self.employees if applies_to in e.get("name", "")), None)
-        if not emp:
+            # Streak carried over from before the planning period
+            streak = self.boundary_state.get(emp["initials"], {}).get("consecutive_days", 0)
+            window = max(6 - streak, 1)
+            if streak > 0 and window <= len(self.days):
+                first_days = [
+                    var
+                    for day in self.days[:window]
+                    for shift in self.shifts
+                    if (var := self.shift_vars.get((emp["initials"], str(day), shift["name"])))
+                    is not None
+                ]
+                if first_days:
+                    all_working = self.model.new_bool_var(f"all6_{emp['initials']}_boundary")
+                    self.model.add(sum(first_days) >= window).only_enforce_if(all_working)
+                    self.model.add(sum(first_days) < window).only_enforce_if(all_working.Not())
+                    self.penalty_vars.append(all_working * weight * 10)
+
+    def _compiled(self, rule):
+        """Compiled IR of a rule (see solver/rule_ir.py)."""
+        return compiled_rule(rule, [shift["name"] for shift in self.shifts])
+
+    def _add_preference_reward(self, ir, base_weight):
+        """Add reward for assigning the preferred shifts (all shifts if none given)."""
+        # Preferences of the whole team would only shift the objective
+        if ir["employees"] == "all":
             return
 
-        # Reward for assigning preferred shifts (simplified)
-        for day in self.days:
-            for shift in self.shifts:
-                var = self.shift_vars.get((emp["initials"], str(day), shift["name"]), None)
-                if var is not None:
-                    self.reward_vars.append(var * base_weight)
+        preferred = self.resolver.shift_names(ir.get("shifts") or []) or [
+            shift["name"] for shift in self.shifts
+        ]
+        for emp in resolve_employees(ir, self.employees, self.resolver):
+            for day in self.days:
+                for shift_name in preferred:
+                    var = self.shift_vars.get((emp["initials"], str(day), shift_name), None)
+                    if var is not None:
+                        self.reward_vars.append(var * base_weight)
 
-    def _add_avoidance_penalty(self, rule, base_weight):
+    def _add_avoidance_penalty(self, ir, base_weight):
         """Add penalty for assigning shifts employee wants to avoid."""
-        applies_to = rule.get("appliesTo", "all")
-        if applies_to == "all":
+        if ir["employees"] == "all":
             return
 
-        emp = next((e for e in self.employees if applies_to in e.get("name", "")), None)
-        if not emp:
-            return
-
-        # Penalize assigning certain shifts (simplified)
-        text = rule.get("text", "")
-        for shift in self.shifts:
-            if shift["name"].lower() in text.lower():
+        for emp in resolve_employees(ir, self.employees, self.resolver):
+            for shift_name in self.resolver.shift_names(ir.get("shifts") or []):
                 for day in self.days:
-                    var = self.shift_vars.get((emp["initials"], str(day), shift["name"]), None)
+                    var = self.shift_vars.get((emp["initials"], str(day), shift_name), None)
                     if var is not None:
                         self.penalty_vars.append(var * base_weight)
 
@@ -304,34 +359,9 @@ class ObjectiveBuilder:
         return 5  # Default weight
 
     def _get_weekend_days(self):
-        """Get weekend days from days list."""
-        # Simple heuristic - in production use actual calendar
-        weekends = []
-        for day in self.days:
-            day_num = int(day)
-            # Assume first day of month is known, calculate day of week
-            # Simplified: mark every 6th and 7th day as weekend
-            if day_num % 7 in [0, 6]:
-                weekends.append(day)
-        return weekends
+        """Get weekend and public holiday days from days list."""
+        return self.calendar.weekend_or_holiday
 
     def _is_demanding_shift(self, shift):
         """Check if shift is demanding (night, on-call, etc.)."""
-        name = shift.get("name", "").lower()
-        time_str = shift.get("time", "")
-
-        # Night shifts
-        if "nacht" in name or "rufbereitschaft" in name:
-            return True
-
-        # Check if shift time indicates night work
-        if "-" in time_str:
-            try:
-                end_time = time_str.split("-")[1].strip()
-                hour = int(end_time.split(":")[0])
-                if hour <= 8:  # Ends in early morning
-                    return True
-            except (ValueError, IndexError):
-                pass
-
-        return False
+        return is_demanding_shift(shift)
@@ -0,0 +1,178 @@
+"""Linear-time capacity checks run before the CP-SAT model is built.
+
+Many infeasible requests are plain capacity shortfalls (too few qualified
+staff on a day, more required hours than anyone may work). These checks find
+them in O(employees x days + shifts x days) and report every shortage
+precisely, instead of letting CP-SAT run into its time limit.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+from .calendar_index import calendar_for
+from .constraints import UNAVAILABLE_CODES, get_shift_duration, parse_min_requirement
+from .qualifications import eligibility_matrix, parse_qualifications
+
+# Maximum weekly hours per employee (German labor law, see add_max_weekly_hours)
+MAX_WEEKLY_HOURS = 48
+
+SEVERITY_ERROR = "error"  # Provably infeasible under the hard constraints
+SEVERITY_WARNING = "warning"  # Feasible, but only with overtime beyond contract hours
+
+
+def check_capacity(data: dict) -> list[dict]:
+    """
+    Compare staffing demand from shift requirements with available staff.
+
+    Returns:
+        List of shortage dictionaries with type, severity, day/week, the
+        qualification or shift involved, required vs. available counts and a
+        human-readable message. Empty if no shortage was found.
+    """
+    employees = data.get("employees", [])
+    shifts = data.get("shifts", [])
+    days = [str(d) for d in data.get("days", [])]
+    availability = data.get("availability", {})
+    eligibility = eligibility_matrix(employees, shifts)
+
+    # Per-shift demand, computed once
+    shift_demand = []
+    for shift in shifts:
+        requirements = shift.get("requirements", [])
+        shift_demand.append(
+            (
+                shift,
+                parse_min_requirement(requirements),
+                frozenset(parse_qualifications(requirements)),
+                get_shift_duration(shift),
+            )
+        )
+
+    daily_demand = sum(min_staff for _, min_staff, _, _ in shift_demand)
+    daily_hours = sum(min_staff * hours for _, min_staff, _, hours in shift_demand)
+    qualification_demand: dict[str, int] = defaultdict(int)
+    for _, min_staff, quals, _ in shift_demand:
+        for qual in quals:
+            qualification_demand[qual] += min_staff
+
+    shortages = []
+    available_per_day: dict[str, list[dict]] = {}
+
+    for day in days:
+        is_available = np.array(
+            [
+                availability.get(emp.get("initials"), {}).get(day) not in UNAVAILABLE_CODES
+                for emp in employees
+            ],
+            dtype=bool,
+        )
+        available = [emp for emp, free in zip(employees, is_available, strict=True) if free]
+        available_per_day[day] = available
+
+        # Each employee works at most one shift per day
+        if daily_demand > len(available):
+            shortages.append(
+                {
+                    "type": "staff",
+                    "severity": SEVERITY_ERROR,
+                    "day": day,
+                    "required": daily_demand,
+                    "available": len(available),
+                    "message": f"Day {day}: {daily_demand} staff required, "
+                    f"only {len(available)} available",
+                }
+            )
+
+        # Staff holding each required qualification
+        qual_supply: dict[str, int] = defaultdict(int)
+        for emp in available:
+            for qual in emp.get("qualifications", []):
+                qual_supply[qual] += 1
+
+        for qual, required in qualification_demand.items():
+            if required > qual_supply[qual]:
+                shortages.append(
+                    {
+                        "type": "qualification",
+                        "severity": SEVERITY_ERROR,
+                        "day": day,
+                        "qualification": qual,
+                        "required": required,
+                        "available": qual_supply[qual],
+                        "message": f"Day {day}: {required} x {qual} required, "
+                        f"only {qual_supply[qual]} available",
+                    }
+                )
+
+        # Shifts requiring a combination of qualifications
+        for shift, min_staff, quals, _ in shift_demand:
+            if len(quals) < 2:
+                continue
+            column = eligibility.eligible[:, eligibility.shift_index[shift["name"]]]
+            eligible = int(np.count_nonzero(column & is_available))
+            if min_staff > eligible:
+                shortages.append(
+                    {
+                        "type": "shift_qualification",
+                        "severity": SEVERITY_ERROR,
+                        "day": day,
+                        "shift": shift["name"],
+                        "qualification": ", ".join(sorted(quals)),
+                        "required": min_staff,
+                        "available": eligible,
+                        "message": f"Day {day}: shift {shift['name']} needs {min_staff} staff "
+                        f"with {', '.join(sorted(quals))}, only {eligible} available",
+                    }
+                )
+
+    # Weekly hours, grouped like add_max_weekly_hours
+    boundary_state = data.get("boundary_state") or {}
+    weeks = calendar_for(data).weeks
+    for week_index, week_days in enumerate(weeks, 1):
+        required_hours = daily_hours * len(week_days)
+        working = {emp.get("initials") for day in week_days for emp in available_per_day[day]}
+        capacity = sum(
+            max(
+                MAX_WEEKLY_HOURS
+                - (boundary_state.get(initials, {}).get("week_hours", 0) if week_index == 1 else 0),
+                0,
+            )
+            for initials in working
+        )
+        if required_hours > capacity:
+            shortages.append(
+                {
+                    "type": "weekly_hours",
+                    "severity": SEVERITY_ERROR,
+                    "week": week_index,
+                    "days": week_days,
+                    "required": required_hours,
+                    "available": capacity,
+                    "message": f"Week {week_index}: {required_hours}h required, "
+                    f"at most {capacity}h allowed ({MAX_WEEKLY_HOURS}h per employee)",
+                }
+            )
+
+    # Contract hours over the whole planning period
+    weeks = len(days) / 7
+    required_hours = daily_hours * len(days)
+    contract_hours = sum((emp.get("hours") or 0) * weeks for emp in employees)
+    if employees and required_hours > contract_hours:
+        shortages.append(
+            {
+                "type": "contract_hours",
+                "severity": SEVERITY_WARNING,
+                "required": required_hours,
+                "available": round(contract_hours, 1),
+                "message": f"{required_hours}h required, contracts cover "
+                f"{round(contract_hours, 1)}h (overtime needed)",
+            }
+        )
+
+    return shortages
+
+
+def has_errors(shortages: list[dict]) -> bool:
+    """Check whether any shortage makes the request infeasible."""
+    return any(s["severity"] == SEVERITY_ERROR for s in shortages)
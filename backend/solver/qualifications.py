@@ -0,0 +1,121 @@
+"""Qualification bitmasks and the employee x shift eligibility matrix.
+
+The qualifications required by the shifts of a request (the department) are
+interned to bit positions. Every employee and shift gets an integer mask,
+and the boolean eligibility matrix (employee may work shift: the employee's
+mask contains all bits of the shift's mask) is computed once with NumPy.
+
+Variable creation, the capacity check, the aggregated and decomposed
+models, solution analysis and replacement ranking all read the matrix
+instead of comparing qualification strings per employee, day and shift.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+QUALIFICATION_KEYWORDS = [
+    "Facharzt",
+    "Oberarzt",
+    "Chefarzt",
+    "Assistenzarzt",
+    "ABS-zertifiziert",
+    "Notfallzertifizierung",
+    "Intensivmedizin",
+    "Ultraschall-Zertifikat",
+    "Endoskopie",
+]
+
+
+def parse_qualifications(requirements):
+    """Extract qualification requirements."""
+    qualifications = set()
+    for req in requirements:
+        for qual in QUALIFICATION_KEYWORDS:
+            if qual.lower() in req.lower():
+                qualifications.add(qual)
+    return qualifications
+
+
+class EligibilityMatrix:
+    """Qualification masks of employees and shifts and who may work which shift."""
+
+    def __init__(self, employees: list[dict], shifts: list[dict]):
+        self.employees = [emp["initials"] for emp in employees]
+        self.shifts = [shift["name"] for shift in shifts]
+        self.employee_index = {initials: i for i, initials in enumerate(self.employees)}
+        self.shift_index = {name: j for j, name in enumerate(self.shifts)}
+
+        # Required qualifications per shift, interned in first-seen order;
+        # qualifications no shift requires do not affect eligibility
+        self.required = {
+            shift["name"]: frozenset(parse_qualifications(shift.get("requirements", [])))
+            for shift in shifts
+        }
+        self.bits: dict[str, int] = {}
+        for shift in shifts:
+            for qual in sorted(self.required[shift["name"]]):
+                self.bits.setdefault(qual, len(self.bits))
+
+        self.employee_masks = np.array(
+            [self.mask(emp.get("qualifications", [])) for emp in employees], dtype=np.uint64
+        )
+        self.shift_masks = np.array(
+            [self.mask(self.required[name]) for name in self.shifts], dtype=np.uint64
+        )
+        # eligible[i, j]: employee i holds every qualification shift j requires
+        self.eligible = (
+            self.employee_masks[:, None] & self.shift_masks[None, :]
+        ) == self.shift_masks[None, :]
+
+    def mask(self, qualifications) -> int:
+        """Bitmask of the interned qualifications among qualifications."""
+        mask = 0
+        for qual in qualifications:
+            if qual in self.bits:
+                mask |= 1 << self.bits[qual]
+        return mask
+
+    def is_eligible(self, initials: str, shift_name: str) -> bool:
+        """Whether the employee holds every qualification the shift requires."""
+        i = self.employee_index.get(initials)
+        j = self.shift_index.get(shift_name)
+        if i is None or j is None:
+            return False
+        return bool(self.eligible[i, j])
+
+    def eligible_employees(self, shift_name: str) -> list[str]:
+        """Initials of the employees eligible for a shift, in employee order."""
+        j = self.shift_index[shift_name]
+        return [self.employees[i] for i in np.flatnonzero(self.eligible[:, j])]
+
+    def missing(self, initials: str, shift_name: str) -> list[str]:
+        """Required qualifications of the shift the employee lacks, sorted."""
+        mask = int(self.employee_masks[self.employee_index[initials]])
+        return sorted(
+            qual for qual in self.required[shift_name] if not mask & (1 << self.bits[qual])
+        )
+
+    def match_ratio(self, initials: str, shift_name: str) -> float:
+        """Share of the shift's required qualifications the employee holds (1.0 if none)."""
+        required = int(self.shift_masks[self.shift_index[shift_name]])
+        if not required:
+            return 1.0
+        held = int(self.employee_masks[self.employee_index[initials]]) & required
+        return held.bit_count() / required.bit_count()
+
+
+@lru_cache(maxsize=32)
+def _cached_matrix(employees: tuple, shifts: tuple) -> EligibilityMatrix:
+    return EligibilityMatrix(
+        [{"initials": initials, "qualifications": quals} for initials, quals in employees],
+        [{"name": name, "requirements": requirements} for name, requirements in shifts],
+    )
+
+
+def eligibility_matrix(employees: list[dict], shifts: list[dict]) -> EligibilityMatrix:
+    """Eligibility matrix of employees and shifts (cached by qualifications and requirements)."""
+    return _cached_matrix(
+        tuple((emp["initials"], tuple(emp.get("qualifications", []))) for emp in employees),
+        tuple((shift["name"], tuple(shift.get("requirements", []))) for shift in shifts),
+    )
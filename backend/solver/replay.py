@@ -0,0 +1,130 @@
+"""Replay captured solver requests with different parameters.
+
+Usage:
+    python -m solver.replay CAPTURE_OR_DIR [...] [--workers 1 4 8]
+        [--time-limit 30] [--param name=value ...]
+
+Every capture archive (see solver/capture.py) is re-solved once per worker
+count and the wall time is compared with the originally captured solve.
+Directories are searched for *.zip archives, so benchmarks/captures/ can be
+replayed as a whole.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from ortools.sat.python import cp_model
+
+from .capture import load_capture, merge_text_format
+
+
+def find_captures(paths: list[str]) -> list[Path]:
+    """Expand directories into the capture archives they contain."""
+    captures = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            captures.extend(sorted(path.glob("*.zip")))
+        else:
+            captures.append(path)
+    return captures
+
+
+def parse_param_overrides(overrides: list[str]) -> str:
+    """Convert name=value pairs into SatParameters text format."""
+    lines = []
+    for override in overrides:
+        if "=" not in override:
+            raise ValueError(f"Invalid parameter override '{override}', expected name=value")
+        name, value = override.split("=", 1)
+        lines.append(f"{name.strip()}: {value.strip()}")
+    return "\n".join(lines)
+
+
+def replay_capture(
+    path: Path,
+    num_workers: int | None = None,
+    time_limit: float | None = None,
+    param_overrides: str = "",
+) -> dict:
+    """Re-solve a single capture and return timing and status information."""
+    capture = load_capture(path)
+    parameters = capture["parameters"]
+    baseline = capture["result"]
+
+    solver = cp_model.CpSolver()
+    merge_text_format(solver.parameters, parameters.get("sat_parameters", ""))
+    if param_overrides:
+        merge_text_format(solver.parameters, param_overrides)
+    if num_workers is not None:
+        solver.parameters.num_workers = num_workers
+    if time_limit is not None:
+        solver.parameters.max_time_in_seconds = time_limit
+
+    status = solver.solve(capture["model"])
+
+    baseline_time = baseline.get("statistics", {}).get("wall_time", 0.0)
+    found = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "capture": path.name,
+        "num_workers": solver.parameters.num_workers,
+        "baseline_status": baseline.get("status"),
+        "baseline_wall_time": baseline_time,
+        "status": solver.status_name(status),
+        "wall_time": solver.wall_time,
+        "delta": solver.wall_time - baseline_time,
+        "objective_value": solver.objective_value if found else None,
+    }
+
+
+def format_report(rows: list[dict]) -> str:
+    """Format replay results as a plain-text table."""
+    header = (
+        f"{'capture':<48} {'workers':>7} {'baseline':>18} {'replay':>18} {'delta':>9} "
+        f"{'objective':>12}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        baseline = f"{row['baseline_status']} {row['baseline_wall_time']:.2f}s"
+        replay = f"{row['status']} {row['wall_time']:.2f}s"
+        objective = "-" if row["objective_value"] is None else f"{row['objective_value']:.0f}"
+        lines.append(
+            f"{row['capture']:<48} {row['num_workers']:>7} {baseline:>18} {replay:>18} "
+            f"{row['delta']:>+8.2f}s {objective:>12}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured solver requests")
+    parser.add_argument("captures", nargs="+", help="Capture archives or directories")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[None], help="Worker counts to compare"
+    )
+    parser.add_argument("--time-limit", type=float, default=None, help="Override time limit (s)")
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        help="SatParameters override as name=value (repeatable)",
+    )
+    args = parser.parse_args(argv)
+
+    captures = find_captures(args.captures)
+    if not captures:
+        print("No capture archives found", file=sys.stderr)
+        return 1
+
+    overrides = parse_param_overrides(args.param)
+    rows = [
+        replay_capture(path, workers, args.time_limit, overrides)
+        for path in captures
+        for workers in args.workers
+    ]
+    print(format_report(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
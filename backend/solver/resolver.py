@@ -0,0 +1,195 @@
+"""Resolution of employee and shift references.
+
+Rules refer to employees and shifts by initials, full names, partial names
+("Müller") or slightly misspelled names ("Dr. Anna Mueller", "Spätdienst").
+A Resolver is built once per set of employees and shifts and resolves such
+references in this order:
+
+    1. code: initials of an employee (case-insensitive)
+    2. name: normalised full name (case, accents, titles and punctuation
+       ignored)
+    3. token: every token of the reference is a token of the name, a prefix
+       of one, or starts with one of at least MIN_STEM_LENGTH characters
+       ("Spätdienst" -> "Spät")
+    4. fuzzy: every token of the reference is close to a token of the name
+       (difflib ratio of at least FUZZY_CUTOFF)
+
+The first step with a match wins. A match with more than one candidate is
+ambiguous; callers decide whether to apply a rule to all candidates (the
+solver) or to report it (rule validation).
+"""
+
+import difflib
+import re
+import unicodedata
+from functools import lru_cache
+from typing import NamedTuple
+
+FUZZY_CUTOFF = 0.8
+MIN_STEM_LENGTH = 4
+
+MATCH_CODE = "code"
+MATCH_NAME = "name"
+MATCH_TOKEN = "token"
+MATCH_FUZZY = "fuzzy"
+
+# Tokens that do not identify a person
+_TITLES = {"dr", "prof", "med", "pd", "frau", "herr"}
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+
+def normalize_name(text: str) -> str:
+    """Lower-case text with umlauts spelled out, accents, titles and punctuation removed."""
+    text = str(text).casefold().translate(_UMLAUTS)
+    text = "".join(
+        char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char)
+    )
+    tokens = re.findall(r"[a-z0-9]+", text)
+    return " ".join(token for token in tokens if token not in _TITLES)
+
+
+class Match(NamedTuple):
+    """Result of resolving a reference."""
+
+    items: list[dict]
+    method: str | None  # MATCH_* step that matched, None if nothing matched
+
+    @property
+    def found(self) -> bool:
+        return bool(self.items)
+
+    @property
+    def ambiguous(self) -> bool:
+        return len(self.items) > 1
+
+    @property
+    def names(self) -> list[str]:
+        return [item.get("name", "") for item in self.items]
+
+
+class NameIndex:
+    """Hash maps on codes, normalised names and name tokens of items."""
+
+    def __init__(self, items: list[dict], code_field: str | None = None):
+        self.items = list(items)
+        self.by_code: dict[str, list[int]] = {}
+        self.by_name: dict[str, list[int]] = {}
+        self.by_token: dict[str, set[int]] = {}
+
+        for position, item in enumerate(self.items):
+            if code_field and item.get(code_field):
+                self.by_code.setdefault(str(item[code_field]).casefold(), []).append(position)
+            name = normalize_name(item.get("name", ""))
+            if name:
+                self.by_name.setdefault(name, []).append(position)
+            for token in name.split():
+                self.by_token.setdefault(token, set()).add(position)
+
+        self._tokens = sorted(self.by_token)
+        self._cache: dict[str, Match] = {}
+
+    def lookup(self, reference: str) -> Match:
+        """Resolve a reference (see module docstring)."""
+        reference = str(reference).strip()
+        if reference not in self._cache:
+            self._cache[reference] = self._lookup(reference)
+        return self._cache[reference]
+
+    def _lookup(self, reference: str) -> Match:
+        if positions := self.by_code.get(reference.casefold()):
+            return self._match(positions, MATCH_CODE)
+
+        name = normalize_name(reference)
+        if not name:
+            return Match([], None)
+        if positions := self.by_name.get(name):
+            return self._match(positions, MATCH_NAME)
+
+        tokens = name.split()
+        positions = self._positions_of(
+            tokens,
+            lambda token: [
+                t
+                for t in self._tokens
+                if t.startswith(token) or (len(t) >= MIN_STEM_LENGTH and token.startswith(t))
+            ],
+        )
+        if positions:
+            return self._match(positions, MATCH_TOKEN)
+
+        positions = self._positions_of(
+            tokens,
+            lambda token: difflib.get_close_matches(token, self._tokens, n=5, cutoff=FUZZY_CUTOFF),
+        )
+        if positions:
+            return self._match(positions, MATCH_FUZZY)
+        return Match([], None)
+
+    def _positions_of(self, tokens: list[str], candidates) -> set[int]:
+        """Items having, for every token, one of the candidate tokens."""
+        positions = None
+        for token in tokens:
+            matching = set()
+            for candidate in candidates(token):
+                matching |= self.by_token[candidate]
+            positions = matching if positions is None else positions & matching
+            if not positions:
+                return set()
+        return positions
+
+    def _match(self, positions, method: str) -> Match:
+        return Match([self.items[position] for position in sorted(positions)], method)
+
+
+class Resolver:
+    """Employee and shift references of one request."""
+
+    def __init__(self, employees: list[dict], shifts: list[dict]):
+        self.employees = NameIndex(employees, code_field="initials")
+        self.shifts = NameIndex(shifts)
+
+    def employee(self, reference: str) -> Match:
+        """Resolve an employee reference (initials or name)."""
+        return self.employees.lookup(reference)
+
+    def shift(self, reference: str) -> Match:
+        """Resolve a shift reference."""
+        return self.shifts.lookup(reference)
+
+    def employees_for(self, references: list[str] | str) -> list[dict]:
+        """Employees referred to by any of references ("all": every employee), in order."""
+        if references == "all":
+            return list(self.employees.items)
+        selected = set()
+        for reference in references:
+            selected.update(emp["initials"] for emp in self.employee(reference).items)
+        return [emp for emp in self.employees.items if emp["initials"] in selected]
+
+    def shift_names(self, references: list[str]) -> list[str]:
+        """Names of the shifts referred to by references, in shift order."""
+        selected = set()
+        for reference in references:
+            selected.update(shift["name"] for shift in self.shift(reference).items)
+        return [shift["name"] for shift in self.shifts.items if shift["name"] in selected]
+
+
+@lru_cache(maxsize=32)
+def _cached_resolver(employees: tuple, shifts: tuple) -> Resolver:
+    return Resolver(
+        [{"initials": initials, "name": name} for initials, name in employees],
+        [{"name": name} for name in shifts],
+    )
+
+
+def resolver_for(employees: list[dict], shifts: list[dict]) -> Resolver:
+    """
+    Resolver of a request (cached by employee initials and names and shift names).
+
+    Matches contain {"initials", "name"} for employees and {"name"} for
+    shifts; look up further fields in the request by initials or name.
+    """
+    return _cached_resolver(
+        tuple((emp["initials"], emp.get("name", "")) for emp in employees),
+        tuple(shift["name"] for shift in shifts),
+    )
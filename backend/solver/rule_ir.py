@@ -0,0 +1,236 @@
+"""Compiled intermediate representation (IR) of custom scheduling rules.
+
+Rules are compiled once, when they are created or updated (routers/rules.py)
+or right after LLM parsing, and the IR is stored in rule["parameters"]
+["compiled"]. The solver dispatches on the IR instead of matching the rule
+text on every solve. An IR is a plain JSON dict:
+
+    - kind: one of the RULE_* kinds below
+    - hardness: "hard" or "soft"
+    - employees: employee references (initials or names), or "all"
+    - days: weekday selector for no_work rules ("sunday", "saturday",
+      "weekend", "holiday", or a list of weekday numbers, Monday = 0)
+    - limit: day limit of max_consecutive_days rules
+    - shifts: shift names of prefer/avoid rules (empty: all shifts, or
+      not yet known when compiled without shift names; such IRs are
+      matched against the shifts of each solve)
+    - version, fingerprint: IR_VERSION and a hash of the rule fields the IR
+      was compiled from; a stored IR is only used while both still match
+
+Rules without a valid stored IR (older rules, edited text) are compiled on
+the fly and cached by rule id and fingerprint.
+"""
+
+import hashlib
+import re
+
+IR_VERSION = 1
+
+RULE_NO_WORK = "no_work"
+RULE_MAX_CONSECUTIVE_DAYS = "max_consecutive_days"
+RULE_PREFER_SHIFTS = "prefer_shifts"
+RULE_AVOID_SHIFTS = "avoid_shifts"
+RULE_FAIRNESS = "fairness"
+RULE_NONE = "none"
+
+HARD_RULE_KINDS = (RULE_NO_WORK, RULE_MAX_CONSECUTIVE_DAYS)
+
+DEFAULT_MAX_CONSECUTIVE_DAYS = 5
+
+# Text patterns of the day selectors of no_work rules, checked in order
+_DAY_PATTERNS = (
+    ("sonntag", "sunday"),
+    ("samstag", "saturday"),
+    ("wochenende", "weekend"),
+    ("feiertag", "holiday"),
+)
+
+_WEEKDAY_NUMBERS = {
+    "monday": 0,
+    "tuesday": 1,
+    "wednesday": 2,
+    "thursday": 3,
+    "friday": 4,
+    "saturday": 5,
+    "sunday": 6,
+}
+
+# Compiled IRs of rules without a valid stored IR: (rule id, fingerprint) -> IR
+_cache: dict[tuple, dict] = {}
+_CACHE_SIZE = 1024
+
+
+def rule_fingerprint(rule: dict) -> str:
+    """Hash of the rule fields an IR is compiled from (solver rule format)."""
+    source = "\x1f".join(
+        str(rule.get(key) or "") for key in ("type", "text", "appliesTo", "category")
+    )
+    return hashlib.sha1(f"{IR_VERSION}\x1f{source}".encode()).hexdigest()[:16]
+
+
+def _employee_refs(applies_to) -> list[str] | str:
+    """Employee references of an appliesTo value ("all", "AM" or "AM,LW")."""
+    if not applies_to or applies_to == "all":
+        return "all"
+    return [ref.strip() for ref in str(applies_to).split(",") if ref.strip()]
+
+
+def _new_ir(rule: dict, kind: str, **fields) -> dict:
+    return {
+        "version": IR_VERSION,
+        "fingerprint": rule_fingerprint(rule),
+        "kind": kind,
+        "hardness": "hard" if rule.get("type") == "hard" else "soft",
+        "employees": _employee_refs(rule.get("appliesTo")),
+        **fields,
+    }
+
+
+def compile_rule(rule: dict, shift_names: list[str] | None = None) -> dict:
+    """
+    Compile a rule from its text.
+
+    Args:
+        rule: Rule in solver format (type, text, appliesTo, category)
+        shift_names: Known shift names, matched in the text of prefer/avoid rules
+
+    Returns:
+        The rule's IR
+    """
+    text = rule.get("text", "").lower()
+    category = rule.get("category") or ""
+
+    if rule.get("type") == "hard":
+        # Pattern: "Employee X does not work on Day Y"
+        if "arbeitet nicht" in text:
+            days = next((days for pattern, days in _DAY_PATTERNS if pattern in text), None)
+            if days is None:
+                return _new_ir(rule, RULE_NONE)
+            return _new_ir(rule, RULE_NO_WORK, days=days)
+
+        # Pattern: "Maximum consecutive working days"
+        if "aufeinanderfolgende" in text and "arbeitstage" in text:
+            match = re.search(r"(\d+)", text)
+            limit = int(match.group(1)) if match else DEFAULT_MAX_CONSECUTIVE_DAYS
+            return _new_ir(rule, RULE_MAX_CONSECUTIVE_DAYS, limit=limit)
+
+        return _new_ir(rule, RULE_NONE)
+
+    mentioned = [name for name in shift_names or [] if name.lower() in text]
+    if "bevorzugt" in text:
+        return _new_ir(rule, RULE_PREFER_SHIFTS, shifts=mentioned)
+    if "vermeiden" in text:
+        return _new_ir(rule, RULE_AVOID_SHIFTS, shifts=mentioned)
+    if "fair" in text or category == "Fairness":
+        return _new_ir(rule, RULE_FAIRNESS)
+    return _new_ir(rule, RULE_NONE)
+
+
+def compile_structured_rule(structured) -> dict:
+    """
+    Compile an LLM-parsed rule (services.rule_parser.StructuredParsedRule).
+
+    Uses the parsed constraint type, weekdays, shifts and limits instead of
+    the text. The fingerprint covers the rule as the legacy ParsedRule
+    reports it, so the IR stays valid when the rule is saved unchanged.
+    """
+    constraint = structured.constraint
+    constraint_type = constraint.constraint_type.value
+    rule = {
+        "type": structured.rule_type,
+        "text": structured.original_text,
+        "appliesTo": structured.applies_to,
+        "category": structured.category,
+    }
+    weekdays = [
+        _WEEKDAY_NUMBERS[weekday.value] for weekday in structured.time_frame.specific_weekdays or []
+    ]
+
+    if constraint_type == "unavailable" and structured.rule_type == "hard":
+        if weekdays:
+            return _new_ir(rule, RULE_NO_WORK, days=sorted(weekdays))
+        return compile_rule(rule)
+    if constraint_type == "consecutive_limit" and structured.rule_type == "hard":
+        limit = constraint.days_value or constraint.count_value or DEFAULT_MAX_CONSECUTIVE_DAYS
+        return _new_ir(rule, RULE_MAX_CONSECUTIVE_DAYS, limit=limit)
+    if constraint_type == "preferred":
+        return _new_ir(rule, RULE_PREFER_SHIFTS, shifts=list(constraint.shift_names or []))
+    if constraint_type == "avoid":
+        return _new_ir(rule, RULE_AVOID_SHIFTS, shifts=list(constraint.shift_names or []))
+    if constraint_type == "fairness":
+        return _new_ir(rule, RULE_FAIRNESS)
+    return compile_rule(rule, constraint.shift_names)
+
+
+def compile_rule_parameters(
+    parameters: dict | None,
+    rule_type: str,
+    rule_text: str,
+    category: str,
+    applies_to: str | None,
+) -> dict:
+    """
+    Parameters of a stored rule with a valid compiled IR.
+
+    A compiled IR already in parameters (e.g. from LLM parsing) is kept if it
+    matches the rule; otherwise the rule is compiled from its text.
+    """
+    rule = {"type": rule_type, "text": rule_text, "appliesTo": applies_to, "category": category}
+    parameters = dict(parameters or {})
+    if not _is_valid(parameters.get("compiled"), rule):
+        parameters["compiled"] = compile_rule(rule)
+    return parameters
+
+
+def _is_valid(ir, rule: dict) -> bool:
+    return (
+        isinstance(ir, dict)
+        and ir.get("version") == IR_VERSION
+        and ir.get("fingerprint") == rule_fingerprint(rule)
+    )
+
+
+def _lacks_shifts(ir: dict, shift_names: list[str] | None) -> bool:
+    # Rules saved through routers/rules.py are compiled without the shifts of
+    # a request, so their prefer/avoid IRs name no shifts; match them again
+    return (
+        bool(shift_names)
+        and ir.get("kind") in (RULE_PREFER_SHIFTS, RULE_AVOID_SHIFTS)
+        and not ir.get("shifts")
+    )
+
+
+def compiled_rule(rule: dict, shift_names: list[str] | None = None) -> dict:
+    """
+    IR of a rule in solver format: the stored IR if still valid, else compiled.
+
+    Args:
+        rule: Rule in solver format, optionally with parameters["compiled"]
+        shift_names: Known shift names, used when compiling from text
+    """
+    fingerprint = rule_fingerprint(rule)
+    stored = (rule.get("parameters") or {}).get("compiled")
+    if _is_valid(stored, rule) and not _lacks_shifts(stored, shift_names):
+        return stored
+
+    key = (rule.get("id"), fingerprint, tuple(shift_names or ()))
+    ir = _cache.get(key)
+    if ir is None:
+        if len(_cache) >= _CACHE_SIZE:
+            _cache.clear()
+        ir = _cache[key] = compile_rule(rule, shift_names)
+    return ir
+
+
+def resolve_employees(ir: dict, employees: list[dict], resolver) -> list[dict]:
+    """
+    Employees an IR applies to, in employee order.
+
+    References are resolved with resolver (solver/resolver.py); an ambiguous
+    reference applies to all of its candidates.
+    """
+    refs = ir.get("employees", "all")
+    if refs == "all":
+        return list(employees)
+    selected = {emp["initials"] for emp in resolver.employees_for(refs)}
+    return [emp for emp in employees if emp["initials"] in selected]
@@ -2,17 +2,57 @@
 
 from ortools.sat.python import cp_model
 
+from .calendar_index import calendar_for
+from .qualifications import eligibility_matrix
+from .transitions import find_rest_violations
+
+
+def coverage_shortages(analysis: dict, days=None) -> dict[tuple[str, str], int]:
+    """
+    Soft coverage shortages of an analysed (sub)result: (day, shift) -> missing staff.
+
+    Used to carry the shortages of windows or weeks into the analysis of a
+    combined plan (coverage_slacks of SolutionAnalyzer).
+
+    Args:
+        analysis: result["analysis"] of RosterSolver.solve()
+        days: Only these days (default: all)
+    """
+    days = None if days is None else {str(day) for day in days}
+    return {
+        (day, shift_name): entry["shortage"]
+        for day, shifts in analysis["coverage_stats"].items()
+        if days is None or day in days
+        for shift_name, entry in shifts.items()
+        if "shortage" in entry
+    }
+
 
 class SolutionAnalyzer:
     """Analyzes and extracts solution from solver."""
 
-    def __init__(self, solver: cp_model.CpSolver, shift_vars: dict, data: dict):
+    def __init__(
+        self,
+        solver: cp_model.CpSolver,
+        shift_vars: dict,
+        data: dict,
+        coverage_slacks: dict | None = None,
+        assigned: set[tuple[str, str, str]] | None = None,
+    ):
         self.solver = solver
         self.shift_vars = shift_vars
+        # Precomputed (initials, day, shift) assignments, e.g. from disaggregation;
+        # used instead of reading shift_vars from the solver
+        self.assigned = assigned
         self.data = data
+        # (day, shift) -> shortage slack variable, or the shortage itself
+        # when combining subresults (see coverage_shortages)
+        self.coverage_slacks = coverage_slacks or {}
         self.employees = data.get("employees", [])
         self.shifts = data.get("shifts", [])
         self.days = data.get("days", [])
+        self.calendar = calendar_for(data)
+        self.eligibility = eligibility_matrix(self.employees, self.shifts)
 
     def extract_solution(self):
         """Extract the solution as a schedule."""
@@ -21,8 +61,7 @@ class SolutionAnalyzer:
         for emp in self.employees:
             for day in self.days:
                 for shift in self.shifts:
-                    var = self.shift_vars.get((emp["initials"], str(day), shift["name"]), None)
-                    if var is not None and self.solver.value(var) == 1:
+                    if self._is_assigned((emp["initials"], str(day), shift["name"])):
                         assignments.append(
                             {
                                 "employee": emp["initials"],
@@ -34,12 +73,20 @@ class SolutionAnalyzer:
 
         return {"assignments": assignments, "schedule": self._build_schedule_structure(assignments)}
 
+    def _is_assigned(self, key):
+        """Check whether the solution assigns the (initials, day, shift) key."""
+        if self.assigned is not None:
+            return key in self.assigned
+        var = self.shift_vars.get(key, None)
+        return var is not None and self.solver.value(var) == 1
+
     def analyze_solution(self):
         """Provide detailed analysis of the solution."""
         assignments = self.extract_solution()["assignments"]
 
         return {
             "coverage_stats": self._analyze_coverage(assignments),
+            "understaffing": self._get_understaffing(),
             "fairness_metrics": self._analyze_fairness(assignments),
             "employee_workload": self._analyze_workload(assignments),
             "constraint_summary": self._summarize_constraints(assignments),
@@ -68,8 +115,29 @@ class SolutionAnalyzer:
                 schedule[emp_initials][day]["shift"] = assignment["shift"]
                 schedule[emp_initials][day]["station"] = assignment["station"]
 
+        # Flag shifts that start less than 11h after the previous day's shift
+        for violation in find_rest_violations(schedule, self.shifts, self.days):
+            schedule[violation["employee"]][violation["day"]]["violation"] = True
+
+        # Flag shifts the employee lacks qualifications for
+        for violation in self._find_qualification_violations(assignments):
+            schedule[violation["employee"]][violation["day"]]["violation"] = True
+
         return schedule
 
+    def _find_qualification_violations(self, assignments):
+        """Assignments of employees to shifts they lack qualifications for."""
+        return [
+            {
+                "employee": a["employee"],
+                "day": a["day"],
+                "shift": a["shift"],
+                "missing": self.eligibility.missing(a["employee"], a["shift"]),
+            }
+            for a in assignments
+            if not self.eligibility.is_eligible(a["employee"], a["shift"])
+        ]
+
     def _analyze_coverage(self, assignments):
         """Analyze shift coverage."""
         coverage = {}
@@ -91,8 +159,28 @@ class SolutionAnalyzer:
                     "status": "ok" if count >= required else "understaffed",
                 }
 
+                # Soft coverage: report the solver's shortage slack directly
+                slack = self.coverage_slacks.get((str(day), shift["name"]))
+                if slack is not None:
+                    shortage = self._shortage(slack)
+                    coverage[str(day)][shift["name"]]["shortage"] = shortage
+                    if shortage > 0:
+                        coverage[str(day)][shift["name"]]["status"] = "understaffed"
+
         return coverage
 
+    def _get_understaffing(self):
+        """Map of day -> shift -> missing staff for all understaffed shifts."""
+        understaffing: dict[str, dict[str, int]] = {}
+        for (day, shift_name), slack in self.coverage_slacks.items():
+            shortage = self._shortage(slack)
+            if shortage > 0:
+                understaffing.setdefault(day, {})[shift_name] = shortage
+        return understaffing
+
+    def _shortage(self, slack) -> int:
+        return slack if isinstance(slack, int) else self.solver.value(slack)
+
     def _analyze_fairness(self, assignments):
         """Analyze fairness metrics."""
         # Weekend distribution
@@ -148,10 +236,15 @@ class SolutionAnalyzer:
 
         return workload
 
-    def _summarize_constraints(self, _assignments):
+    def _summarize_constraints(self, assignments):
         """Summarize constraint satisfaction."""
+        schedule = self._build_schedule_structure(assignments)
+        rest_violations = find_rest_violations(schedule, self.shifts, self.days)
+        qualification_violations = self._find_qualification_violations(assignments)
         return {
-            "hard_constraints_satisfied": True,  # If we have a solution, hard constraints are met
+            "hard_constraints_satisfied": not rest_violations and not qualification_violations,
+            "rest_violations": rest_violations,
+            "qualification_violations": qualification_violations,
             "objective_value": self.solver.objective_value
             if hasattr(self.solver, "objective_value")
             else 0,
@@ -175,12 +268,8 @@ class SolutionAnalyzer:
         return 1
 
     def _is_weekend_day(self, day):
-        """Check if day is a weekend."""
-        try:
-            day_num = int(day)
-            return day_num % 7 in [0, 6]  # Simplified
-        except ValueError:
-            return False
+        """Check if day is a weekend or public holiday."""
+        return self.calendar.is_weekend(day)
 
     def _is_night_shift_by_name(self, shift_name):
         """Check if shift is a night shift by name."""
@@ -0,0 +1,140 @@
+"""Symmetry breaking for interchangeable employees.
+
+Employees with identical qualifications, contract, hours and availability
+that no personal rule, fixed assignment, boundary state or quota refers to
+are interchangeable:
+swapping their complete schedules yields another plan with the same
+objective. CP-SAT would otherwise explore all these permutations.
+
+Two orderings inside each class are available:
+    - "count": non-increasing number of assigned shifts. One linear
+      constraint per neighbouring pair; cheap and friendly to the solver's
+      heuristics, but keeps permutations of employees with equal counts.
+    - "lexicographic": complete schedules ordered lexicographically. Keeps
+      exactly one representative of every permutation, at the cost of one
+      auxiliary literal per position and pair.
+"""
+
+from ortools.sat.python import cp_model
+
+from .resolver import resolver_for
+
+ORDER_COUNT = "count"
+ORDER_LEXICOGRAPHIC = "lexicographic"
+
+
+def find_equivalence_classes(data: dict, exclude: set[str] | None = None) -> list[list[str]]:
+    """
+    Group interchangeable employees.
+
+    Args:
+        data: Solver input data (employees, availability, rules,
+            fixed_assignments, boundary_state, quotas)
+        exclude: Initials of employees that must not be grouped
+
+    Returns:
+        List of classes (lists of initials in input order) with at least two
+        members each
+    """
+    exclude = set(exclude or ())
+    employees = data.get("employees", [])
+    availability = data.get("availability", {})
+
+    # Employees singled out by fixed assignments, carried-over state, quotas
+    # or personal rules
+    exclude.update(a.get("employee") for a in data.get("fixed_assignments", []))
+    exclude.update(data.get("boundary_state") or {})
+    exclude.update(data.get("quotas") or {})
+    resolver = resolver_for(employees, data.get("shifts", []))
+    for rule in data.get("rules", []):
+        applies_to = rule.get("appliesTo") or "all"
+        if applies_to == "all" or not rule.get("isActive", True):
+            continue
+        for reference in applies_to.split(","):
+            exclude.update(emp["initials"] for emp in resolver.employee(reference).items)
+
+    classes: dict[tuple, list[str]] = {}
+    for emp in employees:
+        initials = emp["initials"]
+        if initials in exclude:
+            continue
+        key = (
+            tuple(sorted(emp.get("qualifications", []))),
+            emp.get("contract"),
+            emp.get("hours"),
+            tuple(sorted(availability.get(initials, {}).items())),
+        )
+        classes.setdefault(key, []).append(initials)
+
+    return [members for members in classes.values() if len(members) >= 2]
+
+
+def add_lexicographic_order(
+    model: cp_model.CpModel, first: list, second: list, name: str = "lex"
+) -> None:
+    """
+    Require the 0/1 vector first to be lexicographically >= second.
+
+    eq_i is true only while both vectors agree on all positions before i;
+    as long as they agree, first[i] >= second[i] must hold.
+    """
+    prefix_equal = None
+    for i, (x, y) in enumerate(zip(first, second, strict=True)):
+        if prefix_equal is None:
+            model.add(x >= y)
+        else:
+            model.add(x >= y).only_enforce_if(prefix_equal)
+
+        if i == len(first) - 1:
+            break
+
+        equal = model.new_bool_var(f"{name}_eq_{i}")
+        model.add(x == y).only_enforce_if(equal)
+        guards = []
+        if prefix_equal is not None:
+            model.add_implication(equal, prefix_equal)
+            guards.append(prefix_equal.Not())
+        # Agreement (both 1 or both 0) keeps the prefix equal
+        model.add_bool_or([*guards, x.Not(), y.Not(), equal])
+        model.add_bool_or([*guards, x, y, equal])
+        prefix_equal = equal
+
+
+def add_symmetry_breaking(
+    model: cp_model.CpModel,
+    shift_vars: dict,
+    data: dict,
+    exclude: set[str] | None = None,
+    order: str = ORDER_COUNT,
+) -> list[list[str]]:
+    """
+    Order the schedules of interchangeable employees.
+
+    Args:
+        order: ORDER_COUNT or ORDER_LEXICOGRAPHIC (see module docstring)
+
+    Returns:
+        The equivalence classes that were broken
+    """
+    days = [str(d) for d in data.get("days", [])]
+    shift_names = [s["name"] for s in data.get("shifts", [])]
+    classes = find_equivalence_classes(data, exclude)
+
+    for members in classes:
+        # Members share their qualifications, hence the same variables
+        rows = [
+            [
+                shift_vars[(initials, day, shift)]
+                for day in days
+                for shift in shift_names
+                if (members[0], day, shift) in shift_vars
+            ]
+            for initials in members
+        ]
+        for i in range(len(rows) - 1):
+            if order == ORDER_LEXICOGRAPHIC:
+                add_lexicographic_order(model, rows[i], rows[i + 1], f"sym_{members[i]}")
+            else:
+                model.add(sum(rows[i]) >= sum(rows[i + 1]))
+
+    return classes
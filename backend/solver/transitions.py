@@ -0,0 +1,120 @@
+"""Shift transition matrix for the 11-hour rest rule.
+
+Computed once per set of shifts from their "HH:MM-HH:MM" times: for every
+pair (a, b), whether working a on one day and b on the next day leaves less
+than MIN_REST_MINUTES between the end of a and the start of b. Shifts whose
+end time is not after their start time end on the following day (night
+shifts). Shifts without parseable times never conflict.
+
+The matrix is shared by the CP-SAT constraints (one clause per forbidden
+pair), the aggregated model, the solution validator and the replacement
+ranking.
+"""
+
+from functools import lru_cache
+from itertools import pairwise
+
+MIN_REST_MINUTES = 11 * 60
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_shift_times(shift: dict) -> tuple[int, int] | None:
+    """
+    Parse a shift's start and end in minutes after midnight of its day.
+
+    Returns:
+        (start, end) with end > start (end beyond MINUTES_PER_DAY for shifts
+        ending the next day), or None if the time is missing or invalid
+    """
+    try:
+        start_str, end_str = shift.get("time", "").split("-")
+        start_hour, start_minute = (int(part) for part in start_str.strip().split(":"))
+        end_hour, end_minute = (int(part) for part in end_str.strip().split(":"))
+    except ValueError:
+        return None
+    start = start_hour * 60 + start_minute
+    end = end_hour * 60 + end_minute
+    if end <= start:
+        end += MINUTES_PER_DAY
+    return start, end
+
+
+def rest_minutes(first: dict, second: dict) -> int | None:
+    """Rest between first on one day and second on the next day (None if unknown)."""
+    first_times = parse_shift_times(first)
+    second_times = parse_shift_times(second)
+    if first_times is None or second_times is None:
+        return None
+    return MINUTES_PER_DAY + second_times[0] - first_times[1]
+
+
+class TransitionMatrix:
+    """Forbidden consecutive-day shift pairs of a set of shifts."""
+
+    def __init__(self, shifts: list[dict], min_rest_minutes: int = MIN_REST_MINUTES):
+        self.names = [shift["name"] for shift in shifts]
+        # Shift name -> names of shifts that may not follow on the next day
+        self.forbidden_after: dict[str, frozenset[str]] = {}
+        for first in shifts:
+            self.forbidden_after[first["name"]] = frozenset(
+                second["name"]
+                for second in shifts
+                if (rest := rest_minutes(first, second)) is not None and rest < min_rest_minutes
+            )
+        # (first, second) name pairs, in shift order
+        self.forbidden_pairs = [
+            (first, second)
+            for first in self.names
+            for second in self.names
+            if second in self.forbidden_after[first]
+        ]
+
+    def is_forbidden(self, first: str | None, second: str | None) -> bool:
+        """Whether shift second on the day after shift first violates the rest rule."""
+        if first is None or second is None:
+            return False
+        return second in self.forbidden_after.get(first, ())
+
+
+@lru_cache(maxsize=32)
+def _cached_matrix(shift_times: tuple[tuple[str, str], ...]) -> TransitionMatrix:
+    return TransitionMatrix([{"name": name, "time": time} for name, time in shift_times])
+
+
+def transition_matrix(shifts: list[dict]) -> TransitionMatrix:
+    """Transition matrix of shifts (cached by shift names and times)."""
+    return _cached_matrix(tuple((shift["name"], shift.get("time", "")) for shift in shifts))
+
+
+def find_rest_violations(schedule: dict, shifts: list[dict], days: list) -> list[dict]:
+    """
+    Find consecutive-day assignments that violate the rest rule.
+
+    Args:
+        schedule: initials -> day -> {"shift": name or None, ...}
+        shifts: Shift definitions (name, time)
+        days: Planning days in order
+
+    Returns:
+        List of {"employee", "day", "shift", "previous_shift", "rest_minutes"}
+    """
+    matrix = transition_matrix(shifts)
+    by_name = {shift["name"]: shift for shift in shifts}
+    days = [str(day) for day in days]
+
+    violations = []
+    for initials, emp_schedule in schedule.items():
+        for previous_day, day in pairwise(days):
+            previous = (emp_schedule.get(previous_day) or {}).get("shift")
+            current = (emp_schedule.get(day) or {}).get("shift")
+            if matrix.is_forbidden(previous, current):
+                violations.append(
+                    {
+                        "employee": initials,
+                        "day": day,
+                        "shift": current,
+                        "previous_shift": previous,
+                        "rest_minutes": rest_minutes(by_name[previous], by_name[current]),
+                    }
+                )
+    return violations
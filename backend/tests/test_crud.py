@@ -0,0 +1,116 @@
+"""CRUD router tests against an aiosqlite database."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from database import Base, async_session_factory, get_async_db, get_async_engine
+from main import app
+
+EMPLOYEE = {"name": "Anna Muster", "initials": "AM", "contract_type": "Vollzeit"}
+SHIFT = {"name": "Frühdienst", "category": "Dienst", "station": "Ambulanz"}
+
+
+@pytest.fixture
+def client_session(tmp_path):
+    """Run a coroutine taking an httpx client against the app on a fresh SQLite file."""
+    url = f"sqlite:///{tmp_path / 'roster.db'}"
+
+    async def override():
+        async with async_session_factory(url)() as db:
+            yield db
+
+    async def run(scenario):
+        async with get_async_engine(url).begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+        finally:
+            await get_async_engine(url).dispose()
+
+    app.dependency_overrides[get_async_db] = override
+    yield lambda scenario: asyncio.run(run(scenario))
+    app.dependency_overrides.pop(get_async_db, None)
+
+
+def test_employee_crud(client_session):
+    """Test create, duplicate initials, update, list and deactivation of employees."""
+
+    async def scenario(client):
+        created = await client.post("/employees/", json={**EMPLOYEE, "qualifications": ["OP"]})
+        duplicate = await client.post("/employees/", json=EMPLOYEE)
+        employee_id = created.json()["id"]
+        updated = await client.put(f"/employees/{employee_id}", json={"weekly_hours": 30})
+        listed = await client.get("/employees/")
+        deleted = await client.delete(f"/employees/{employee_id}")
+        after_delete = await client.get("/employees/")
+        missing = await client.get("/employees/00000000-0000-0000-0000-000000000000")
+        return created, duplicate, updated, listed, deleted, after_delete, missing
+
+    created, duplicate, updated, listed, deleted, after_delete, missing = client_session(scenario)
+
+    assert created.status_code == 200
+    assert created.json()["qualifications"] == ["OP"]
+    assert duplicate.status_code == 409
+    assert updated.json()["weekly_hours"] == 30
+    assert [e["initials"] for e in listed.json()] == ["AM"]
+    assert deleted.status_code == 200
+    assert after_delete.json() == []
+    assert missing.status_code == 404
+
+
+def test_assignments_reject_double_booking(client_session):
+    """Test that a second assignment of an employee on the same day is rejected."""
+
+    async def scenario(client):
+        employee = (await client.post("/employees/", json=EMPLOYEE)).json()
+        shift = (await client.post("/shifts/", json=SHIFT)).json()
+        assignment = {
+            "employee_id": employee["id"],
+            "shift_id": shift["id"],
+            "assignment_date": "2026-03-02",
+            "station": "Ambulanz",
+        }
+        first = await client.post("/assignments/", json=assignment)
+        second = await client.post("/assignments/", json=assignment)
+        listed = await client.get(
+            "/assignments/", params={"start_date": "2026-03-01", "end_date": "2026-03-31"}
+        )
+        return first, second, listed
+
+    first, second, listed = client_session(scenario)
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert [a["id"] for a in listed.json()] == [first.json()["id"]]
+
+
+def test_rules_plans_and_availabilities(client_session):
+    """Test that rules store their compiled IR and plans and availabilities round-trip."""
+
+    async def scenario(client):
+        rule = await client.post(
+            "/rules/",
+            json={"rule_type": "hard", "rule_text": "AM hat sonntags frei", "category": "Frei"},
+        )
+        first = (await client.post("/plans/", json={"name": "A", "month": "2026-03"})).json()
+        second = (await client.post("/plans/", json={"name": "B", "month": "2026-03"})).json()
+        await client.post(f"/plans/{first['id']}/activate")
+        await client.post(f"/plans/{second['id']}/activate")
+        plans = await client.get("/plans/month/2026-03")
+        availability = await client.put(
+            "/availabilities/month/2026-03", json={"availability_data": {"AM": ["2026-03-02"]}}
+        )
+        duplicate = await client.post("/availabilities/", json={"month": "2026-03"})
+        return rule, plans, availability, duplicate
+
+    rule, plans, availability, duplicate = client_session(scenario)
+
+    assert rule.status_code == 200
+    assert "compiled" in rule.json()["parameters"]
+    assert {p["name"]: p["status"] for p in plans.json()} == {"A": "draft", "B": "active"}
+    assert availability.json()["availability_data"] == {"AM": ["2026-03-02"]}
+    assert duplicate.status_code == 400
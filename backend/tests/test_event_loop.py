@@ -0,0 +1,80 @@
+"""Event loop tests: CPU-bound work must not stall other requests."""
+
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+import httpx
+
+from api.routes import jobs, run_solver_task
+from api.schemas import JobStatus, JobStatusResponse
+from benchmarks.instances import assistant_pool_instance
+from main import app
+from services.loop_watchdog import LoopLagWatchdog
+
+# Generous enough for a loaded CI machine; building or solving this instance on the
+# loop itself blocks it for longer than that
+STALL_THRESHOLD_SECONDS = 1.0
+
+
+def test_health_stays_fast_while_a_large_model_is_built():
+    """Test that the loop never stalls while a 200-employee model is built and solved."""
+    data = {
+        **assistant_pool_instance(num_assistants=194, num_days=14),
+        "model_mode": "per_person",
+    }
+    job_id = "event-loop-test"
+    jobs[job_id] = JobStatusResponse(
+        job_id=job_id, status=JobStatus.PENDING, progress=0.0, created_at=datetime.now().isoformat()
+    )
+
+    async def scenario():
+        watchdog = LoopLagWatchdog(threshold=STALL_THRESHOLD_SECONDS)
+        watchdog.start()
+        latencies = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            job = asyncio.create_task(run_solver_task(job_id, data, time_limit=1))
+            while not job.done():
+                start = time.perf_counter()
+                response = await client.get("/health")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                await asyncio.sleep(0.01)
+            await job
+        await watchdog.stop()
+        return latencies, watchdog
+
+    try:
+        latencies, watchdog = asyncio.run(scenario())
+    finally:
+        job = jobs.pop(job_id)
+
+    assert "build" in job.timings
+    assert list(watchdog.stalls) == []
+    assert len(latencies) > 10
+    assert statistics.median(latencies) < STALL_THRESHOLD_SECONDS / 10
+
+
+def test_watchdog_records_stalls_with_the_blocking_stack():
+    """Test that a blocked loop is recorded with the stack of the blocking code."""
+
+    def block_the_loop():
+        time.sleep(0.3)
+
+    async def scenario():
+        watchdog = LoopLagWatchdog(threshold=0.1)
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        block_the_loop()
+        await asyncio.sleep(0.1)
+        await watchdog.stop()
+        return watchdog
+
+    watchdog = asyncio.run(scenario())
+
+    assert len(watchdog.stalls) == 1
+    assert 0.2 < watchdog.stalls[0]["duration"] < 0.5
+    assert "block_the_loop" in watchdog.stalls[0]["stack"]
+    assert watchdog.max_lag > 0.2
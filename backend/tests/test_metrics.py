@@ -0,0 +1,85 @@
+"""Metrics tests: registry, Prometheus text exposition and the /metrics endpoint."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from main import app
+from services.metrics import MetricsRegistry
+
+
+def test_counters_and_histograms_render_with_labels():
+    """Test the text exposition of labelled counters and cumulative histogram buckets."""
+    registry = MetricsRegistry()
+    jobs = registry.counter("jobs_total", "Jobs by status", ["status"])
+    duration = registry.histogram("solve_seconds", "Solve time", ["mode"], buckets=(1, 5))
+    jobs.inc(status="completed")
+    jobs.inc(2, status="failed")
+    jobs.inc(status="completed")
+    duration.observe(0.5, mode="quick")
+    duration.observe(3, mode="quick")
+    duration.observe(7.25, mode="quick")
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs by status",
+        "# TYPE jobs_total counter",
+        'jobs_total{status="completed"} 2',
+        'jobs_total{status="failed"} 2',
+        "# HELP solve_seconds Solve time",
+        "# TYPE solve_seconds histogram",
+        'solve_seconds_bucket{mode="quick",le="1"} 1',
+        'solve_seconds_bucket{mode="quick",le="5"} 2',
+        'solve_seconds_bucket{mode="quick",le="+Inf"} 3',
+        'solve_seconds_sum{mode="quick"} 10.75',
+        'solve_seconds_count{mode="quick"} 3',
+    ]
+    # Registering a name again returns the existing metric
+    assert registry.counter("jobs_total", "Jobs by status", ["status"]) is jobs
+
+
+def test_label_values_are_escaped():
+    """Test that quotes, backslashes and newlines in label values are escaped."""
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors", ["message"]).inc(message='a "b"\\c\nd')
+
+    assert registry.render().splitlines()[-1] == 'errors_total{message="a \\"b\\"\\\\c\\nd"} 1'
+
+
+def test_label_set_mismatch_raises():
+    """Test that missing or unknown labels are rejected."""
+    registry = MetricsRegistry()
+    jobs = registry.counter("jobs_total", "Jobs by status", ["status"])
+    duration = registry.histogram("solve_seconds", "Solve time", ["mode"])
+
+    with pytest.raises(ValueError, match="expects labels"):
+        jobs.inc()
+    with pytest.raises(ValueError, match="expects labels"):
+        jobs.inc(status="failed", mode="quick")
+    with pytest.raises(ValueError, match="expects labels"):
+        duration.observe(1.0, status="failed")
+
+
+def test_metrics_endpoint_labels_requests_by_route_template():
+    """Test that /metrics reports API calls under their route template, not the raw path."""
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/api/job-status/metrics-test-job")
+            await client.get("/api/job-status/health")
+            await client.get("/.env")
+            return await client.get("/metrics")
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    count_lines = [
+        line
+        for line in response.text.splitlines()
+        if line.startswith("roster_http_request_duration_seconds_count")
+    ]
+    assert any('route="/api/job-status/{job_id}",status="404"' in line for line in count_lines)
+    assert any('route="unmatched",status="404"' in line for line in count_lines)
+    assert not any("metrics-test-job" in line or "/.env" in line for line in count_lines)
@@ -0,0 +1,315 @@
+"""Tests for the LLM rule parser against a local fake Anthropic endpoint."""
+
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from config import settings
+from services import rule_parser
+from services.llm_logging import shutdown_llm_logging
+from services.parse_cache import RuleParseCache
+from services.rule_parser import (
+    OUTPUT_TOKENS_PER_RULE,
+    RuleParserContext,
+    estimate_tokens,
+    parse_rules_with_llm_async,
+)
+
+
+class FakeAnthropic(ThreadingHTTPServer):
+    """Messages endpoint answering every rule with a fixed structured rule.
+
+    Rule texts control the behaviour: "langsam" delays the answer, "hängt"
+    never answers in time and "fehler" fails with a server error once. Rules
+    with "alle" apply to all employees, the others to AM. Batch requests are
+    answered with an array that leaves out rules containing "kaputt".
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls: list[str] = []
+        self.batches: list[list[str]] = []
+        self.system_prompts: list = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        content = body["messages"][0]["content"]
+        with server.lock:
+            server.system_prompts.append(body["system"])
+        if "Dienstplanregeln:" in content:
+            self._answer_batch(body, re.findall(r'^\d+\. "(.*)"$', content, re.MULTILINE))
+            return
+        rule_text = content.split('"')[1]
+
+        with server.lock:
+            failed_before = rule_text in server.calls
+            server.calls.append(rule_text)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(0.05)
+            if "langsam" in rule_text:
+                time.sleep(0.3)
+            if "hängt" in rule_text:
+                time.sleep(1.0)
+            if "fehler" in rule_text and not failed_before:
+                self._send(500, {"type": "error", "error": {"type": "api_error", "message": "x"}})
+                return
+            self._send_message(body, parsed_rule(rule_text))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _answer_batch(self, body, rule_texts):
+        with self.server.lock:
+            self.server.batches.append(rule_texts)
+        answer = [
+            {"index": index, **parsed_rule(rule_text)}
+            for index, rule_text in enumerate(rule_texts, 1)
+            if "kaputt" not in rule_text
+        ]
+        self._send_message(body, answer)
+
+    def _send_message(self, body, answer):
+        self._send(
+            200,
+            {
+                "id": "msg_fake",
+                "type": "message",
+                "role": "assistant",
+                "model": body["model"],
+                "content": [{"type": "text", "text": json.dumps(answer)}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 1, "output_tokens": 1},
+            },
+        )
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout)
+            pass
+
+
+def parsed_rule(rule_text):
+    for_all = "alle" in rule_text
+    return {
+        "rule_hardness": "hard",
+        "category": "Verfügbarkeit",
+        "scope": "all" if for_all else "specific_employee",
+        "employee_initials": None if for_all else ["AM"],
+        "time_frame": {"specific_weekdays": ["sunday"], "is_permanent": True},
+        "constraint": {"constraint_type": "unavailable", "description": rule_text},
+        "confidence": 0.9,
+    }
+
+
+@pytest.fixture
+def fake_api(monkeypatch, tmp_path):
+    monkeypatch.setattr(rule_parser, "RETRY_BASE_DELAY_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "RULE_PARSE_CACHE_PATH", None)
+    monkeypatch.setattr(settings, "LLM_LOG_FILE", str(tmp_path / "llm.log"))
+    server = FakeAnthropic()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    shutdown_llm_logging()
+
+
+def create_context(employees=None):
+    return RuleParserContext(
+        employees=employees or [{"name": "Dr. Anna Müller", "initials": "AM"}],
+        shifts=[{"name": "Früh", "time": "08:00-16:00"}],
+        availability_codes={"U": "Urlaub"},
+    )
+
+
+def parse(fake_api, rule_texts, context=None, **options):
+    return asyncio.run(
+        parse_rules_with_llm_async(
+            rule_texts,
+            context or create_context(),
+            api_key="test",
+            base_url=fake_api.url,
+            **options,
+        )
+    )
+
+
+def test_rules_are_parsed_concurrently_in_input_order(fake_api):
+    """Test that the concurrency limit holds and results keep the input order."""
+    rule_texts = ["Regel langsam"] + [f"Regel {i}" for i in range(7)]
+
+    parsed = parse(fake_api, rule_texts, max_concurrency=3)
+
+    assert [rule.constraint_description for rule in parsed] == rule_texts
+    assert fake_api.max_in_flight == 3
+    assert parsed[0].rule_type == "hard"
+    assert parsed[0].compiled["kind"] == "no_work"
+
+
+def test_server_errors_are_retried(fake_api):
+    """Test that a failed call is retried with backoff."""
+    parsed = parse(fake_api, ["Regel fehler"], max_retries=2)
+
+    assert fake_api.calls == ["Regel fehler", "Regel fehler"]
+    assert parsed[0].confidence == 0.9
+
+
+def test_timeouts_fail_only_the_affected_rule(fake_api):
+    """Test that a rule whose calls time out gets a warning, the others still parse."""
+    parsed = parse(fake_api, ["Regel hängt", "Regel ok"], timeout=0.5, max_retries=1)
+
+    assert fake_api.calls.count("Regel hängt") == 2
+    assert parsed[0].confidence == 0.0
+    assert "Zeitüberschreitung" in parsed[0].warnings[0]
+    assert parsed[1].constraint_description == "Regel ok"
+
+
+def test_cached_rules_skip_the_llm(fake_api, tmp_path):
+    """Test that a rule parsed before is answered from the cache, whatever its spelling."""
+    cache = RuleParseCache(tmp_path / "cache.sqlite3")
+    first = parse(fake_api, ["AM hat sonntags frei"], cache=cache)
+
+    second = parse(fake_api, ["  am HAT sonntags frei"], cache=cache)
+
+    assert fake_api.calls == ["AM hat sonntags frei"]
+    assert second[0].original_text == "  am HAT sonntags frei"
+    assert second[0].compiled["kind"] == first[0].compiled["kind"] == "no_work"
+
+
+def test_new_employee_invalidates_only_employee_rules(fake_api, tmp_path):
+    """Test that context changes only invalidate the rules depending on them."""
+    cache = RuleParseCache(tmp_path / "cache.sqlite3")
+    rule_texts = ["AM hat sonntags frei", "Sonntags arbeiten alle höchstens einmal"]
+    parse(fake_api, rule_texts, cache=cache)
+
+    employees = [
+        {"name": "Dr. Anna Müller", "initials": "AM"},
+        {"name": "Dr. Peter Schmidt", "initials": "PS"},
+    ]
+    parse(fake_api, rule_texts, context=create_context(employees), cache=cache)
+
+    assert fake_api.calls.count(rule_texts[0]) == 2
+    assert fake_api.calls.count(rule_texts[1]) == 1
+
+
+def test_formulaic_rules_skip_the_llm(fake_api):
+    """Test that the fast path parses common patterns locally and reports its hit rate."""
+    rule_texts = [
+        "Müller arbeitet nicht am Sonntag.",
+        "AM kann montags und freitags nicht arbeiten",
+        "Maximal 6 aufeinanderfolgende Arbeitstage",
+        "Anna Müller möchte Frühdienst vermeiden",
+        "AM hat sonntags frei",
+    ]
+    statistics = {}
+
+    parsed = parse(fake_api, rule_texts, statistics=statistics)
+
+    assert fake_api.calls == ["AM hat sonntags frei"]
+    assert parsed[0].applies_to == "AM"
+    assert parsed[0].compiled["kind"] == "no_work"
+    assert parsed[0].compiled["days"] == [6]
+    assert parsed[1].compiled["days"] == [0, 4]
+    assert parsed[2].compiled["kind"] == "max_consecutive_days"
+    assert parsed[2].compiled["limit"] == 6
+    assert parsed[3].rule_type == "soft"
+    assert parsed[3].compiled["shifts"] == ["Früh"]
+    assert statistics["fast_path_hits"] == 4
+    assert statistics["fast_path_hit_rate"] == 0.8
+    assert statistics["llm_calls"] == 1
+
+
+def test_unclear_references_fall_through_to_the_llm(fake_api):
+    """Test that misspelled or ambiguous names are left to the LLM."""
+    employees = [
+        {"name": "Dr. Anna Müller", "initials": "AM"},
+        {"name": "Dr. Anton Müller", "initials": "TM"},
+    ]
+    rule_texts = ["Müller arbeitet nicht am Sonntag", "Mueler arbeitet nicht am Sonntag"]
+
+    parse(fake_api, rule_texts, context=create_context(employees))
+
+    assert sorted(fake_api.calls) == sorted(rule_texts)
+
+
+def test_batched_rules_share_one_request(fake_api):
+    """Test that batch mode sends the rules together with a cacheable system prompt."""
+    rule_texts = [f"Regel {i}" for i in range(5)]
+
+    parsed = parse(fake_api, rule_texts, batch=True)
+
+    assert fake_api.batches == [rule_texts]
+    assert fake_api.calls == []
+    assert [rule.constraint_description for rule in parsed] == rule_texts
+    assert fake_api.system_prompts[0][0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_batches_are_chunked_by_token_budget(fake_api):
+    """Test that batches stay within the token budget and keep the input order."""
+    rule_texts = [f"Regel {i}" for i in range(5)]
+    budget = 2 * (estimate_tokens("Regel 0") + OUTPUT_TOKENS_PER_RULE)
+
+    parsed = parse(fake_api, rule_texts, batch=True, batch_token_budget=budget)
+
+    assert fake_api.batches == [rule_texts[:2], rule_texts[2:4], rule_texts[4:]]
+    assert [rule.constraint_description for rule in parsed] == rule_texts
+
+
+def test_rules_missing_from_a_batch_are_parsed_alone(fake_api):
+    """Test the per-rule fallback for rules the batch answer leaves out."""
+    rule_texts = ["Regel 1", "Regel kaputt", "Regel 3"]
+
+    parsed = parse(fake_api, rule_texts, batch=True)
+
+    assert fake_api.batches == [rule_texts]
+    assert fake_api.calls == ["Regel kaputt"]
+    assert [rule.constraint_description for rule in parsed] == rule_texts
+
+
+def test_llm_log_redacts_payloads_unless_configured(fake_api, monkeypatch, tmp_path):
+    """Test that rule texts and responses only reach the log file in full payload mode."""
+    parse(fake_api, ["Regel geheim"])
+    shutdown_llm_logging()
+    redacted = (tmp_path / "llm.log").read_text(encoding="utf-8")
+
+    monkeypatch.setattr(settings, "LLM_LOG_PAYLOADS", "full")
+    monkeypatch.setattr(settings, "LLM_LOG_LEVEL", "DEBUG")
+    parse(fake_api, ["Regel geheim"])
+    shutdown_llm_logging()
+    full = (tmp_path / "llm.log").read_text(encoding="utf-8")[len(redacted) :]
+
+    assert "PARSING RULE 1/1: <12 Zeichen>" in redacted
+    assert "geheim" not in redacted
+    assert "PARSING RULE 1/1: Regel geheim" in full
+    assert "Raw LLM response" in full
@@ -1,6 +1,26 @@
 """Tests for the roster solver."""
 
+from ortools.sat.python import cp_model
+
+from solver.aggregate import should_aggregate
+from solver.calendar_index import CalendarIndex
+from solver.capture import load_capture, scrub_request, write_capture
+from solver.constraints import get_shift_duration
+from solver.decomposition import QUOTA_TOLERANCE, solve_weekly_decomposition
+from solver.horizon import compute_boundary_state, solve_rolling_horizon
 from solver.model import RosterSolver, validate_input_data
+from solver.precheck import check_capacity, has_errors
+from solver.qualifications import eligibility_matrix
+from solver.resolver import MATCH_CODE, MATCH_FUZZY, MATCH_TOKEN, resolver_for
+from solver.rule_ir import (
+    RULE_NO_WORK,
+    compile_rule,
+    compile_rule_parameters,
+    compiled_rule,
+)
+from solver.solution import SolutionAnalyzer
+from solver.symmetry import find_equivalence_classes
+from solver.transitions import rest_minutes, transition_matrix
 
 
 def create_test_data():
@@ -119,12 +139,14 @@ def test_validate_missing_employees():
 
 
 def test_solver_creates_variables():
-    """Test that solver creates correct number of variables."""
+    """Test that solver creates variables for qualified employee-shift pairs only."""
     data = create_test_data()
     solver = RosterSolver(data)
 
-    expected_vars = len(data["employees"]) * len(data["days"]) * len(data["shifts"])
+    # Lisa Weber is no Facharzt and gets no night shift variables
+    expected_vars = (len(data["employees"]) * len(data["shifts"]) - 1) * len(data["days"])
     assert len(solver.shift_vars) == expected_vars
+    assert ("LW", "1", "Nacht") not in solver.shift_vars
 
 
 def test_solver_basic_solution():
@@ -202,6 +224,7 @@ def test_solver_statistics():
     assert "statistics" in result
     assert "wall_time" in result["statistics"]
     assert "num_conflicts" in result["statistics"]
+    assert result["statistics"]["num_solutions"] >= 1
 
 
 def test_solver_with_fixed_assignments():
@@ -221,6 +244,639 @@ def test_solver_with_fixed_assignments():
         assert am_day1[0]["shift"] == "Früh"
 
 
+def test_solver_records_phase_timings():
+    """Test that the solver records build, solve and analysis timings."""
+    data = create_test_data()
+    solver = RosterSolver(data)
+    solver.solve(time_limit_seconds=10)
+
+    assert solver.timings["build"] > 0
+    assert solver.timings["solve"] > 0
+    assert "analyze" in solver.timings
+
+
+def test_scrub_request_removes_names():
+    """Test that captures replace employee names and initials consistently."""
+    data = create_test_data()
+    data["rules"].append(
+        {
+            "id": 4,
+            "type": "hard",
+            "text": "Dr. Lisa Weber arbeitet nicht am Sonntag",
+            "appliesTo": "LW",
+        }
+    )
+    scrubbed, mapping = scrub_request(data)
+
+    serialized = str(scrubbed)
+    for emp in data["employees"]:
+        assert emp["name"] not in serialized
+    assert "Weber" not in serialized
+    assert mapping["LW"] in scrubbed["availability"]
+    assert scrubbed["rules"][-1]["appliesTo"] == mapping["LW"]
+
+
+def test_capture_roundtrip(tmp_path):
+    """Test that a captured model can be reloaded and solved again."""
+    data = create_test_data()
+    solver = RosterSolver(data)
+    result = solver.solve(time_limit_seconds=10)
+
+    path = write_capture(tmp_path, data, solver.model, {"num_workers": 4}, result)
+    capture = load_capture(path)
+
+    assert capture["result"]["status"] == result["status"]
+    replay = cp_model.CpSolver()
+    replay.parameters.max_time_in_seconds = 10
+    assert replay.solve(capture["model"]) in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+def test_capacity_check_passes_feasible_data():
+    """Test that the capacity pre-check reports no errors for solvable data."""
+    shortages = check_capacity(create_test_data())
+    assert not has_errors(shortages)
+
+
+def test_capacity_check_reports_qualification_shortage():
+    """Test that the pre-check finds days without enough qualified staff."""
+    data = create_test_data()
+    # Only MB (Facharzt) is left on day 3, but two shifts need a Facharzt
+    data["shifts"][0]["requirements"] = ["Min. 1 Person", "Facharzt"]
+    data["availability"] = {"AM": {"3": "U"}, "PS": {"3": "K"}}
+
+    shortages = check_capacity(data)
+
+    assert has_errors(shortages)
+    facharzt = [s for s in shortages if s.get("qualification") == "Facharzt"]
+    assert facharzt == [
+        {
+            "type": "qualification",
+            "severity": "error",
+            "day": "3",
+            "qualification": "Facharzt",
+            "required": 2,
+            "available": 1,
+            "message": "Day 3: 2 x Facharzt required, only 1 available",
+        }
+    ]
+
+
+def test_soft_coverage_reports_understaffing():
+    """Test that soft coverage returns a plan with an understaffing map."""
+    data = create_test_data()
+    # Only MB is available on day 7, three shifts need one person each
+    data["availability"]["AM"] = {"7": "U"}
+    data["availability"]["PS"] = {"7": "K"}
+
+    assert RosterSolver(data).solve(time_limit_seconds=10)["status"] == "INFEASIBLE"
+
+    data["soft_coverage"] = True
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    understaffing = result["analysis"]["understaffing"]
+    assert sum(understaffing["7"].values()) == 2
+    assert set(understaffing) == {"7"}
+
+
+def test_lexicographic_strategy_reports_stages():
+    """Test that lexicographic optimisation runs the stages in priority order."""
+    data = create_test_data()
+    data["objective_strategy"] = "lexicographic"
+    data["stage_time_split"] = {"priority": 0.2, "fairness": 0.8}
+
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    stages = result["statistics"]["stages"]
+    assert [s["stage"] for s in stages] == ["priority", "fairness"]
+    assert stages[0]["time_limit"] == 2.0
+    assert stages[0]["objective_value"] == 0
+    assert result["statistics"]["wall_time"] <= 10 + 1
+
+    # Coverage is never traded away for fairness
+    for day_coverage in result["analysis"]["coverage_stats"].values():
+        assert all(c["status"] == "ok" for c in day_coverage.values())
+
+
+def test_alternatives_are_diverse():
+    """Test that alternative plans differ from each other by the minimum distance."""
+    data = create_test_data()
+    data["num_alternatives"] = 3
+    data["min_hamming_distance"] = 6
+
+    result = RosterSolver(data).solve(time_limit_seconds=15)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    plans = [result["solution"]] + [alt["solution"] for alt in result["alternatives"]]
+    assert len(plans) == 3
+
+    def cells(solution):
+        return {(a["employee"], a["day"], a["shift"]) for a in solution["assignments"]}
+
+    for i in range(len(plans)):
+        for j in range(i + 1, len(plans)):
+            assert len(cells(plans[i]) ^ cells(plans[j])) >= 6
+    for alt in result["alternatives"]:
+        assert alt["analysis"]["coverage_stats"]
+        assert alt["objective_value"] <= result["statistics"]["objective_value"] * 1.1 + 1
+
+
+def test_equivalence_classes_exclude_personal_rules():
+    """Test that only fully interchangeable employees share a class."""
+    data = create_test_data()
+    data["employees"].append(
+        {
+            "name": "Dr. Eva Klein",
+            "initials": "EK",
+            "contract": "Facharzt",
+            "hours": 40,
+            "qualifications": ["Notfallzertifizierung", "Facharzt"],
+        }
+    )
+
+    assert find_equivalence_classes(data) == [["MB", "EK"]]
+
+    data["rules"].append({"type": "soft", "text": "Klein bevorzugt Früh", "appliesTo": "Klein"})
+    assert find_equivalence_classes(data) == []
+
+
+def test_symmetry_breaking_ignores_employees_with_carried_over_state():
+    """Test that employees with boundary state or quotas are not treated as interchangeable."""
+
+    def employee(initials):
+        return {
+            "name": initials,
+            "initials": initials,
+            "contract": "Facharzt",
+            "hours": 40,
+            "qualifications": ["Facharzt"],
+        }
+
+    def shift(name, requirement, time):
+        return {
+            "name": name,
+            "category": "Dienst",
+            "requirements": [requirement],
+            "rules": [],
+            "station": "A",
+            "time": time,
+        }
+
+    data = {
+        "employees": [employee("AA"), employee("BB")],
+        "shifts": [
+            shift("Früh", "Min. 1 Person", "06:00-14:00"),
+            shift("Nacht", "Min. 0 Person", "22:00-06:00"),
+        ],
+        "days": [1, 2, 3],
+        "rules": [],
+        "availability": {},
+        "fixed_assignments": [],
+        "boundary_state": {"AA": {"last_shift": "Nacht"}},
+    }
+    assert find_equivalence_classes(data) == []
+    assert find_equivalence_classes({**data, "boundary_state": {}, "quotas": {"BB": {}}}) == []
+
+    objectives = set()
+    for order in (None, "count", "lexicographic"):
+        result = RosterSolver({**data, "symmetry_breaking": order}).solve(time_limit_seconds=10)
+        assert result["status"] == "OPTIMAL"
+        objectives.add(result["statistics"]["objective_value"])
+    assert objectives == {5}
+
+
+def test_symmetry_breaking_keeps_objective():
+    """Test that ordering interchangeable employees does not cut optimal plans."""
+    data = create_test_data()
+    for i in range(3):
+        data["employees"].append(
+            {
+                "name": f"Assistenzarzt {i}",
+                "initials": f"A{i}",
+                "contract": "Assistenzarzt",
+                "hours": 40,
+                "qualifications": ["Assistenzarzt"],
+            }
+        )
+
+    plain = RosterSolver({**data, "symmetry_breaking": False}).solve(time_limit_seconds=20)
+    assert plain["status"] == "OPTIMAL"
+
+    for order in ("count", "lexicographic"):
+        solver = RosterSolver({**data, "symmetry_breaking": order})
+        broken = solver.solve(time_limit_seconds=20)
+
+        assert solver.equivalence_classes == [["A0", "A1", "A2"]]
+        assert broken["status"] == "OPTIMAL"
+        assert broken["statistics"]["objective_value"] == plain["statistics"]["objective_value"]
+
+
+def create_pool_data(num_assistants):
+    """Create a ward with many identical assistants and two specialists."""
+    data = create_test_data()
+    data["employees"] = data["employees"][:2] + [
+        {
+            "name": f"Assistenzarzt {i:03d}",
+            "initials": f"A{i:03d}",
+            "contract": "Assistenzarzt",
+            "hours": 40,
+            "qualifications": ["Assistenzarzt"],
+        }
+        for i in range(num_assistants)
+    ]
+    data["availability"] = {"A000": {"1": "U", "2": "U"}}
+    for shift in data["shifts"][:2]:
+        shift["requirements"] = [f"Min. {num_assistants // 4} Personen"]
+    return data
+
+
+def test_aggregation_is_selected_for_large_pools():
+    """Test that only large pools without personal rules use the aggregated model."""
+    assert not should_aggregate(create_test_data())
+    assert should_aggregate(create_pool_data(120))
+
+    data = create_pool_data(120)
+    data["rules"].append({"type": "soft", "text": "Müller bevorzugt Früh", "appliesTo": "Müller"})
+    assert not should_aggregate(data)
+    assert not should_aggregate({**create_pool_data(120), "model_mode": "per_person"})
+
+
+def test_aggregated_model_disaggregates_valid_plan():
+    """Test that the disaggregated plan respects the per-person hard constraints."""
+    data = create_pool_data(40)
+    data["model_mode"] = "aggregate"
+
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    assert result["statistics"]["model"] == "aggregate"
+    for day_coverage in result["analysis"]["coverage_stats"].values():
+        assert all(c["status"] == "ok" for c in day_coverage.values())
+
+    worked = {}
+    for a in result["solution"]["assignments"]:
+        key = (a["employee"], a["day"])
+        assert key not in worked
+        worked[key] = a["shift"]
+        if a["shift"] == "Nacht":
+            assert a["employee"] in ("AM", "PS")
+    assert ("A000", "1") not in worked and ("A000", "2") not in worked
+    for (emp, day), shift in worked.items():
+        if shift in ("Spät", "Nacht"):
+            assert worked.get((emp, str(int(day) + 1))) != "Früh"
+
+
+def test_forced_aggregation_with_alternatives_warns():
+    """Test that alternatives are not dropped when model_mode forces aggregation."""
+    data = {**create_pool_data(40), "model_mode": "aggregate", "num_alternatives": 2}
+
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    assert result["statistics"]["model"] == "per_person"
+    assert "alternative plans" in result["statistics"]["warnings"][0]
+    assert "alternatives" in result
+
+
+def test_transition_matrix_forbids_short_rest():
+    """Test minute-accurate rest between shifts on consecutive days."""
+    shifts = create_test_data()["shifts"]
+    shifts.append({"name": "Frei", "time": ""})
+    by_name = {shift["name"]: shift for shift in shifts}
+
+    matrix = transition_matrix(shifts)
+
+    assert rest_minutes(by_name["Spät"], by_name["Früh"]) == 10 * 60
+    assert rest_minutes(by_name["Nacht"], by_name["Spät"]) == 6 * 60
+    assert matrix.forbidden_after["Spät"] == {"Früh"}
+    assert matrix.forbidden_after["Nacht"] == {"Früh", "Spät"}
+    assert matrix.forbidden_after["Früh"] == set()
+    assert not matrix.is_forbidden("Frei", "Früh")
+
+
+def test_analysis_flags_rest_violations():
+    """Test that the solution validator reports shifts without 11h rest."""
+    data = create_test_data()
+    assigned = {("AM", "1", "Nacht"), ("AM", "2", "Spät"), ("PS", "1", "Früh"), ("PS", "2", "Früh")}
+
+    analyzer = SolutionAnalyzer(None, {}, data, assigned=assigned)
+    schedule = analyzer.extract_solution()["schedule"]
+    summary = analyzer.analyze_solution()["constraint_summary"]
+
+    assert schedule["AM"]["2"]["violation"] is True
+    assert schedule["PS"]["2"]["violation"] is False
+    assert summary["hard_constraints_satisfied"] is False
+    assert summary["rest_violations"] == [
+        {
+            "employee": "AM",
+            "day": "2",
+            "shift": "Spät",
+            "previous_shift": "Nacht",
+            "rest_minutes": 360,
+        }
+    ]
+
+
+def test_eligibility_matrix_and_qualification_violations():
+    """Test that qualification masks decide eligibility and flag violations."""
+    data = create_test_data()
+    data["shifts"][0]["requirements"].append("Facharzt mit Notfallzertifizierung")
+    eligibility = eligibility_matrix(data["employees"], data["shifts"])
+
+    assert eligibility.eligible_employees("Früh") == ["AM", "MB"]
+    assert eligibility.eligible_employees("Spät") == ["AM", "PS", "LW", "MB"]
+    assert eligibility.missing("PS", "Früh") == ["Notfallzertifizierung"]
+    assert eligibility.match_ratio("PS", "Früh") == 0.5
+
+    analyzer = SolutionAnalyzer(None, {}, data, assigned={("LW", "3", "Nacht")})
+    summary = analyzer.analyze_solution()["constraint_summary"]
+    assert summary["hard_constraints_satisfied"] is False
+    assert summary["qualification_violations"] == [
+        {"employee": "LW", "day": "3", "shift": "Nacht", "missing": ["Facharzt"]}
+    ]
+
+
+def test_calendar_index_resolves_dates_and_holidays():
+    """Test weekdays, ISO weeks and public holidays of real dates."""
+    calendar = CalendarIndex([str(d) for d in range(1, 31)], month="2025-04", holiday_region="BY")
+
+    assert calendar.saturdays == ["5", "12", "19", "26"]
+    assert calendar.holidays == {"18": "Karfreitag", "21": "Ostermontag"}
+    assert calendar.weeks[0] == ["1", "2", "3", "4", "5", "6"]
+    assert calendar.ends_week("6") and not calendar.ends_week("7")
+    assert calendar.is_weekend("18") and not calendar.is_weekend("17")
+
+    iso = CalendarIndex(["2025-10-31", "2025-11-01"], holiday_region="BY")
+    assert iso.holiday_days == ["2025-11-01"]
+
+    legacy = CalendarIndex([str(d) for d in range(1, 15)])
+    assert legacy.weekends == ["6", "7", "13", "14"]
+
+
+def test_solver_uses_real_calendar():
+    """Test that weekday rules and weekly hours follow the real calendar."""
+    data = create_test_data()
+    data["month"] = "2025-03"  # 1 March 2025 is a Saturday
+    data["rules"].append(
+        {"type": "hard", "text": "Arbeitet nicht am Sonntag", "appliesTo": "Dr. Anna Müller"}
+    )
+    data["availability"] = {}
+
+    solver = RosterSolver(data)
+    result = solver.solve(time_limit_seconds=10)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    assert result["solution"]["schedule"]["AM"]["2"]["shift"] is None
+    assert solver.calendar.weeks == [["1", "2"], ["3", "4", "5", "6", "7"]]
+    weekend_counts = result["analysis"]["fairness_metrics"]["weekend_distribution"]
+    schedule = result["solution"]["schedule"]
+    for emp, count in weekend_counts.items():
+        assert count == sum(1 for day in ("1", "2") if schedule[emp][day]["shift"])
+
+
+def test_rule_ir_is_stored_and_invalidated():
+    """Test that rules compile once into an IR that is dropped when the rule changes."""
+    rule = {
+        "type": "hard",
+        "text": "Arbeitet nicht am Wochenende",
+        "appliesTo": "AM",
+        "category": "Verfügbarkeit",
+    }
+    ir = compile_rule(rule)
+    assert ir["kind"] == RULE_NO_WORK
+    assert ir["days"] == "weekend"
+    assert ir["employees"] == ["AM"]
+
+    parameters = compile_rule_parameters(
+        {"note": "x"}, "hard", rule["text"], rule["category"], "AM"
+    )
+    assert parameters["note"] == "x"
+    assert compiled_rule({**rule, "parameters": parameters}) == parameters["compiled"]
+
+    # Edited text: the stored IR no longer matches and is recompiled
+    edited = {**rule, "text": "Arbeitet nicht am Sonntag", "parameters": parameters}
+    assert compiled_rule(edited)["days"] == "sunday"
+
+
+def test_solver_dispatches_on_stored_rule_ir():
+    """Test that the solver applies a stored IR without matching the rule text."""
+    data = create_test_data()
+    # Only PS, LW and MB can cover the three shifts on day 2 (a Tuesday without dates)
+    data["availability"] = {"AM": {"2": "uw"}}
+    rule = {"id": 9, "type": "hard", "text": "Keine Dienste dienstags", "appliesTo": "LW"}
+    assert RosterSolver({**data, "rules": [rule]}).solve(time_limit_seconds=10)["solution"]
+
+    ir = {**compile_rule(rule), "kind": RULE_NO_WORK, "days": [1]}
+    data["rules"] = [{**rule, "parameters": {"compiled": ir}}]
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] == "INFEASIBLE"
+
+
+def test_stored_avoidance_rule_is_matched_against_the_shifts():
+    """Test that a soft rule saved without shift names still penalises the named shift."""
+    data = create_test_data()
+    text = "AM möchte Nacht vermeiden"
+    parameters = compile_rule_parameters({}, "soft", text, "Präferenz", "AM")
+    assert parameters["compiled"]["shifts"] == []
+
+    rule = {
+        "id": 7,
+        "type": "soft",
+        "text": text,
+        "appliesTo": "AM",
+        "category": "Präferenz",
+        "parameters": parameters,
+    }
+    data["rules"] = [rule]
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert compiled_rule(rule, ["Früh", "Spät", "Nacht"])["shifts"] == ["Nacht"]
+    assert result["solution"]
+    assert not [
+        a
+        for a in result["solution"]["assignments"]
+        if a["employee"] == "AM" and a["shift"] == "Nacht"
+    ]
+
+
+def test_resolver_matches_partial_and_misspelled_names():
+    """Test that employee and shift references resolve by initials, tokens and typos."""
+    data = create_test_data()
+    data["employees"].append({"name": "Dr. Tom Müller", "initials": "TM"})
+    resolver = resolver_for(data["employees"], data["shifts"])
+
+    assert resolver.employee("am").method == MATCH_CODE
+    assert resolver.employee("Anna Mueller").names == ["Dr. Anna Müller"]
+    assert resolver.employee("Dr. Petr Schmidt").method == MATCH_FUZZY
+    muller = resolver.employee("Müller")
+    assert muller.method == MATCH_TOKEN and muller.ambiguous
+    assert not resolver.employee("Dr. Unbekannt").found
+    assert resolver.shift_names(["Spätdienst", "nacht"]) == ["Spät", "Nacht"]
+
+
+def test_boundary_state_constrains_first_days():
+    """Test that context from the previous period applies to the first days."""
+    data = create_test_data()
+    data["rules"].append(
+        {"type": "hard", "text": "Maximal 5 aufeinanderfolgende Arbeitstage", "appliesTo": "all"}
+    )
+    data["boundary_state"] = {
+        "AM": {"last_shift": "Nacht", "consecutive_days": 0, "week_hours": 0},
+        "PS": {"last_shift": None, "consecutive_days": 5, "week_hours": 0},
+        "MB": {"last_shift": None, "consecutive_days": 0, "week_hours": 40},
+    }
+    data["week_start_offset"] = 4
+
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    schedule = result["solution"]["schedule"]
+    assert schedule["AM"]["1"]["shift"] != "Früh"
+    assert schedule["PS"]["1"]["shift"] is None
+    # Days 1-3 complete MB's week, in which 40 hours are already worked
+    hours = {shift["name"]: get_shift_duration(shift) for shift in data["shifts"]}
+    mb_hours = sum(
+        hours[schedule["MB"][day]["shift"]]
+        for day in ("1", "2", "3")
+        if schedule["MB"][day]["shift"]
+    )
+    assert mb_hours <= 8
+
+
+def test_compute_boundary_state():
+    """Test that the boundary state summarises the end of a planned period."""
+    data = create_test_data()
+    assigned = {("AM", "5", "Früh"), ("AM", "6", "Spät"), ("AM", "7", "Nacht"), ("PS", "6", "Früh")}
+
+    data["week_start_offset"] = 4
+    state = compute_boundary_state(data, assigned, [str(d) for d in range(1, 8)])
+
+    assert state["AM"] == {"last_shift": "Nacht", "consecutive_days": 3, "week_hours": 26}
+    assert state["PS"] == {"last_shift": None, "consecutive_days": 0, "week_hours": 8}
+
+
+def test_rolling_horizon_respects_window_boundaries():
+    """Test that a rolling-horizon plan keeps rest time across windows."""
+    data = create_test_data()
+    data["days"] = [str(d) for d in range(1, 22)]
+
+    result = solve_rolling_horizon(data, time_limit_seconds=15, window_days=14, step_days=7)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    assert [w["days"] for w in result["statistics"]["windows"]] == [["1", "14"], ["8", "21"]]
+    schedule = result["solution"]["schedule"]
+    for emp, days in schedule.items():
+        for day in range(1, 21):
+            if days[str(day)]["shift"] in ("Spät", "Nacht"):
+                assert days[str(day + 1)]["shift"] != "Früh", (emp, day)
+    for day_coverage in result["analysis"]["coverage_stats"].values():
+        assert all(c["status"] == "ok" for c in day_coverage.values())
+    assert set(result["boundary_state"]) == {"AM", "PS", "LW", "MB"}
+
+
+def test_soft_coverage_shortages_survive_horizon_and_decomposition():
+    """Test that rolling-horizon and decomposed plans report the shortages of their parts."""
+    data = create_test_data()
+    data["days"] = [str(d) for d in range(1, 15)]
+    # Only LW and MB are available on day 10, three shifts need one person each
+    data["availability"]["AM"] = {"10": "U"}
+    data["availability"]["PS"] = {"10": "K"}
+    data["soft_coverage"] = True
+
+    horizon = solve_rolling_horizon(data, time_limit_seconds=15, window_days=7, step_days=7)
+    decomposed = solve_weekly_decomposition(data, time_limit_seconds=20, processes=1)
+
+    for result in (horizon, decomposed):
+        assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+        understaffing = result["analysis"]["understaffing"]
+        assert set(understaffing) == {"10"}
+        assert sum(understaffing["10"].values()) == 1
+        day_coverage = result["analysis"]["coverage_stats"]["10"]
+        assert sum(c["shortage"] for c in day_coverage.values()) == 1
+
+
+def test_quotas_limit_shifts_per_employee():
+    """Test that quotas bound total, night and weekend shifts."""
+    data = create_test_data()
+    data["availability"] = {}
+    data["quotas"] = {"AM": {"shifts": 5, "nights": 2}, "LW": {"weekends": 1}}
+
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    schedule = result["solution"]["schedule"]
+    am_shifts = [entry["shift"] for entry in schedule["AM"].values() if entry["shift"]]
+    assert len(am_shifts) <= 5
+    assert am_shifts.count("Nacht") <= 2
+    assert not (schedule["LW"]["6"]["shift"] and schedule["LW"]["7"]["shift"])
+
+
+def test_weekly_decomposition_honours_quotas():
+    """Test that week subproblems solved in parallel respect the coarse quotas."""
+    data = create_test_data()
+    data["days"] = [str(d) for d in range(1, 22)]
+
+    result = solve_weekly_decomposition(data, time_limit_seconds=20, processes=2)
+
+    assert result["status"] in ["OPTIMAL", "FEASIBLE"]
+    assert len(result["statistics"]["weeks"]) == 3
+    schedule = result["solution"]["schedule"]
+    for week, week_stats in enumerate(result["statistics"]["weeks"]):
+        if week_stats["quotas_relaxed"]:
+            continue
+        week_days = [str(d) for d in range(week * 7 + 1, week * 7 + 8)]
+        for emp, quota in result["quotas"][week].items():
+            worked = [schedule[emp][day]["shift"] for day in week_days]
+            assert sum(1 for shift in worked if shift) <= quota["shifts"] + QUOTA_TOLERANCE
+            assert worked.count("Nacht") <= quota["nights"] + QUOTA_TOLERANCE
+    for emp, days in schedule.items():
+        for day in range(1, 21):
+            if days[str(day)]["shift"] in ("Spät", "Nacht"):
+                assert days[str(day + 1)]["shift"] != "Früh", (emp, day)
+    for day_coverage in result["analysis"]["coverage_stats"].values():
+        assert all(c["status"] == "ok" for c in day_coverage.values())
+
+
+def test_infeasible_result_explains_conflict():
+    """Test that an infeasible request names the conflicting constraints."""
+    data = create_test_data()
+    data["rules"].append(
+        {
+            "id": 99,
+            "type": "hard",
+            "text": "Dr. Anna Müller arbeitet nicht am Sonntag",
+            "appliesTo": "Müller",
+        }
+    )
+
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] == "INFEASIBLE"
+    explanation = result["infeasibility_explanation"]
+    families = {entry["family"] for entry in explanation}
+    assert {"coverage", "availability", "rule"} <= families
+    assert {"rule_id": 99, "employee": "AM"}.items() <= next(
+        entry for entry in explanation if entry["family"] == "rule"
+    ).items()
+    assert all(entry["description"] for entry in explanation)
+
+
+def test_coverage_without_eligible_employees_is_infeasible():
+    """Test that pruned variables do not drop the coverage of a shift nobody may work."""
+    data = create_test_data()
+    data["employees"] = [e for e in data["employees"] if e["initials"] == "LW"]
+    data["employees"].append({**data["employees"][0], "name": "Dr. Eva Kurz", "initials": "EK"})
+    data["shifts"] = [{**data["shifts"][0], "requirements": ["Min. 1 Oberarzt"]}]
+    data["availability"] = {}
+
+    result = RosterSolver(data).solve(time_limit_seconds=10)
+
+    assert result["status"] == "INFEASIBLE"
+    assert "coverage" in {entry["family"] for entry in result["infeasibility_explanation"]}
+
+
 if __name__ == "__main__":
     # Run a quick test
     data = create_test_data()
@@ -0,0 +1,16 @@
+"""Startup tests: the app must answer /health without loading the solver stack."""
+
+from benchmarks.startup import loaded_heavy_modules, time_to_first_healthcheck
+
+# Generous limit for slow CI machines; benchmarks/startup.py reports the figures
+MAX_SECONDS_TO_FIRST_HEALTHCHECK = 5.0
+
+
+def test_main_does_not_import_heavy_modules():
+    """Test that OR-Tools, NumPy and the Anthropic client are loaded on first use only."""
+    assert loaded_heavy_modules("main") == []
+
+
+def test_time_to_first_healthcheck():
+    """Test that a fresh server answers /health within the startup budget."""
+    assert time_to_first_healthcheck() < MAX_SECONDS_TO_FIRST_HEALTHCHECK
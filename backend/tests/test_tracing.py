@@ -0,0 +1,158 @@
+"""Tracing tests: span nesting, exporters, the request middleware and job timings."""
+
+import asyncio
+import io
+import json
+import logging
+from datetime import datetime
+
+import httpx
+import pytest
+
+from api.routes import jobs, run_solver_task
+from api.schemas import JobStatus, JobStatusResponse
+from config import settings
+from main import app
+from services import tracing
+from services.tracing import (
+    ConsoleSpanExporter,
+    FileSpanExporter,
+    SpanKind,
+    StatusCode,
+    Tracer,
+    get_current_span,
+    tracer,
+)
+from tests.test_solver import create_test_data
+
+
+class CollectingExporter:
+    """Keeps finished spans in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+class FailingExporter:
+    """Fails like an exporter writing to a full disk."""
+
+    def export(self, span):
+        raise OSError("disk full")
+
+
+def test_spans_nest_and_share_the_trace():
+    """Test that child spans reference their parent and end before it."""
+    exporter = CollectingExporter()
+    local_tracer = Tracer([exporter])
+
+    with local_tracer.start_as_current_span("job", attributes={"job.id": "1"}) as parent:
+        with local_tracer.start_as_current_span("build") as child:
+            assert get_current_span() is child
+        assert get_current_span() is parent
+    assert get_current_span() is None
+
+    assert [span.name for span in exporter.spans] == ["build", "job"]
+    assert child.trace_id == parent.trace_id
+    assert child.parent_span_id == parent.span_id
+    assert parent.parent_span_id is None
+    assert parent.to_dict()["attributes"] == [{"key": "job.id", "value": {"stringValue": "1"}}]
+
+
+def test_exceptions_mark_the_span_as_failed():
+    """Test that an exception inside a span sets the error status and propagates."""
+    exporter = CollectingExporter()
+
+    with pytest.raises(ValueError), Tracer([exporter]).start_as_current_span("solve"):
+        raise ValueError("kaputt")
+
+    (span,) = exporter.spans
+    assert span.status_code == StatusCode.ERROR
+    assert span.status_message == "kaputt"
+    assert span.end_time_unix_nano >= span.start_time_unix_nano
+
+
+def test_exporter_failures_do_not_break_the_operation(caplog):
+    """Test that a failing exporter is logged and later exporters still run."""
+    exporter = CollectingExporter()
+    local_tracer = Tracer([FailingExporter(), exporter])
+
+    with (
+        caplog.at_level(logging.DEBUG, logger=tracing.__name__),
+        local_tracer.start_as_current_span("solve"),
+    ):
+        pass
+
+    assert [span.name for span in exporter.spans] == ["solve"]
+    assert "FailingExporter failed: disk full" in caplog.text
+
+
+def test_exporters_are_selected_from_settings(monkeypatch, tmp_path):
+    """Test the console and file exporters and their JSON lines."""
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", None)
+    assert tracing._build_exporters() == []
+
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "console")
+    assert isinstance(tracing._build_exporters()[0], ConsoleSpanExporter)
+
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACING_FILE", str(tmp_path / "traces" / "spans.jsonl"))
+    (exporter,) = tracing._build_exporters()
+    assert isinstance(exporter, FileSpanExporter)
+
+    stream = io.StringIO()
+    with Tracer([exporter, ConsoleSpanExporter(stream)]).start_as_current_span("solve"):
+        pass
+    (line,) = (tmp_path / "traces" / "spans.jsonl").read_text().splitlines()
+    assert json.loads(line)["name"] == "solve"
+    assert json.loads(stream.getvalue()) == json.loads(line)
+
+
+def test_requests_are_traced_with_their_route_template(monkeypatch):
+    """Test that the middleware opens a server span named after the matched route."""
+    exporter = CollectingExporter()
+    monkeypatch.setattr(tracer, "exporters", [exporter])
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/api/job-status/health")
+            await client.get("/wp-login.php")
+
+    asyncio.run(scenario())
+
+    server_spans = [span for span in exporter.spans if span.kind == SpanKind.SERVER]
+    assert [span.name for span in server_spans] == [
+        "GET /api/job-status/{job_id}",
+        "GET unmatched",
+    ]
+    assert server_spans[0].attributes["http.status_code"] == 404
+    assert server_spans[0].attributes["http.target"] == "/api/job-status/health"
+
+
+@pytest.mark.parametrize("failure", ["validation", "capacity"])
+def test_failed_jobs_report_their_total_time(failure):
+    """Test that jobs failing validation or the capacity check still record a total."""
+    data = create_test_data()
+    if failure == "validation":
+        data["employees"] = []
+    else:
+        # Only MB (Facharzt) is left on day 3, but two shifts need a Facharzt
+        data["shifts"][0]["requirements"] = ["Min. 1 Person", "Facharzt"]
+        data["availability"] = {"AM": {"3": "U"}, "PS": {"3": "K"}}
+    job_id = f"tracing-{failure}"
+    jobs[job_id] = JobStatusResponse(
+        job_id=job_id, status=JobStatus.PENDING, progress=0.0, created_at=datetime.now().isoformat()
+    )
+
+    try:
+        asyncio.run(run_solver_task(job_id, data, time_limit=5))
+    finally:
+        job = jobs.pop(job_id)
+
+    assert job.status == JobStatus.FAILED
+    assert job.completed_at
+    assert job.timings["total"] >= job.timings["validate"]
+    assert ("precheck" in job.timings) == (failure == "capacity")